@@ -0,0 +1,253 @@
+"""
+Runs the configured checks on a batch of scene files, outside of Maya's UI, spreading the files over a pool of worker
+processes. A JSON line is written for each file as soon as it's done.
+
+	python -m rigchecker.batch <directory or manifest>... [--jobs N] [--output results.jsonl]
+
+Maya ASCII files are read by the streaming reader and need no Maya. Maya binary files are opened through
+maya.standalone, so they are only supported when it's available.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+SCENE_EXTENSIONS = (".ma", ".mb")
+
+# Set once per worker process by _init_worker
+WORKER = {}
+
+
+# ##############################
+#
+# Files
+#
+# ##############################
+
+
+def read_manifest(manifest_path):
+	"""
+	Returns the scene files listed in the manifest received as argument: a text file with one path per line, relative
+	paths being relative to the manifest. Empty lines and lines starting with # are ignored.
+
+	@return: [str,...]
+	@rtype: list
+	"""
+
+	manifest_dir_path = os.path.dirname(os.path.abspath(manifest_path))
+	file_paths = []
+
+	with open(manifest_path, "r") as manifest_file:
+		for line in manifest_file:
+			line = line.strip()
+
+			if line and not line.startswith("#"):
+				file_paths.append(os.path.join(manifest_dir_path, line))
+
+	return file_paths
+
+
+def collect_scene_files(paths, recursive=True):
+	"""
+	Returns every scene file found in the directories received as argument, along with those listed by manifests.
+
+	@return: [str,...]
+	@rtype: list
+	"""
+
+	file_paths = []
+
+	for path in paths:
+		if os.path.isdir(path):
+			for dir_path, dir_names, file_names in os.walk(path):
+				dir_names.sort()
+
+				file_paths.extend(
+					os.path.join(dir_path, f) for f in sorted(file_names) if f.lower().endswith(SCENE_EXTENSIONS)
+				)
+
+				if recursive is False:
+					break
+		elif path.lower().endswith(SCENE_EXTENSIONS):
+			file_paths.append(path)
+		else:
+			file_paths.extend(read_manifest(path))
+
+	return file_paths
+
+
+# ##############################
+#
+# Workers
+#
+# ##############################
+
+
+def _init_worker():
+	"""
+	Loads everything the checks need once per worker process: the configuration, the discovery plans and, when
+	available, Maya itself.
+	"""
+
+	from rigchecker import getconf
+	from rigchecker.utils import inspect, inspectutils, validations
+
+	# Results are streamed by the parent process. Anything printed by the checks goes to stderr instead
+	sys.stdout = sys.stderr
+
+	getconf.get_conf()
+
+	for title in inspect.get_discovery_specs():
+		inspect.get_discovery_plan(title)
+
+	WORKER["inspectutils"] = inspectutils
+	WORKER["validation_plan"] = validations.get_validation_plan()
+
+	try:
+		import maya.standalone
+		maya.standalone.initialize(name="python")
+	except ImportError:
+		WORKER["maya"] = False
+	else:
+		WORKER["maya"] = True
+
+
+def _open_scene(file_path):
+	from rigchecker.utils import backend, mareader
+
+	if file_path.lower().endswith(".ma"):
+		return mareader.read_ma(file_path)
+
+	try:
+		assert WORKER.get("maya") is True
+	except AssertionError:
+		raise RuntimeError("Maya binary files can only be checked when maya.standalone is available.")
+
+	import maya.cmds as cmds
+
+	cmds.file(file_path, open=True, force=True, loadReferenceDepth="all")
+
+	return backend.MayaBackend()
+
+
+def check_scene_file(file_path):
+	"""
+	Runs every check on the scene file received as argument.
+
+	@return: The file's path, the result of each check and validation, whether all of them passed and the time it
+		took. Or, the error raised while reading or checking the scene, and for any other exception, which can only be
+		a bug in the checks, the internal error raised along with its traceback
+	@rtype: dict
+	"""
+
+	from rigchecker.utils import backend, scenesnapshot
+
+	if not WORKER:
+		_init_worker()
+
+	start = time.time()
+	result = {"file": file_path}
+
+	try:
+		backend.set_backend(_open_scene(file_path))
+
+		# Checks and validations share the same snapshot, so the scene is traversed only once
+		snapshot = scenesnapshot.take_snapshot()
+		checks = WORKER["inspectutils"].run_all_checks(snapshot)
+		validation_results = WORKER["validation_plan"].run(snapshot)
+	except(IOError, OSError, RuntimeError, backend.AmbiguousNameError) as e:
+		# The file can't be read, or the scene can't be checked
+		result["error"] = "%s: %s" % (type(e).__name__, e)
+		result["passed"] = False
+	except Exception as e:
+		# Not the scene's fault. Therefore, it's reported apart, so a bug in the checks isn't taken for a broken file
+		result["internal_error"] = "%s: %s" % (type(e).__name__, e)
+		result["traceback"] = traceback.format_exc()
+		result["passed"] = False
+	else:
+		result["checks"] = checks
+		result["validations"] = validation_results
+
+		# Checks either return a bool or the list of the nodes failing them
+		result["passed"] = (
+			all(r is True or r == [] for r in checks.values()) and all(r == [] for r in validation_results.values())
+		)
+	finally:
+		# Don't keep the scene alive until the next file is read
+		backend.set_backend(None)
+
+	result["seconds"] = round(time.time() - start, 3)
+
+	return result
+
+
+# ##############################
+#
+# Batch
+#
+# ##############################
+
+
+def run_batch(file_paths, output=sys.stdout, jobs=None):
+	"""
+	Checks the scene files received as argument in a pool of worker processes, one per core unless jobs says
+	otherwise, writing each file's result to output as a JSON line as soon as it's done.
+
+	@return: The number of files which failed a check or couldn't be checked, and the number of files among them
+		which raised an internal error
+	@rtype: tuple
+	"""
+
+	failed = 0
+	internal_errors = 0
+
+	with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as executor:
+		futures = [executor.submit(check_scene_file, f) for f in file_paths]
+
+		for future in as_completed(futures):
+			result = future.result()
+
+			if result["passed"] is False:
+				failed += 1
+
+			if "internal_error" in result:
+				internal_errors += 1
+
+			output.write(json.dumps(result, default=str) + "\n")
+			output.flush()
+
+	return failed, internal_errors
+
+
+def main(args=None):
+	parser = argparse.ArgumentParser(prog="python -m rigchecker.batch", description=__doc__.strip().split("\n")[0])
+	parser.add_argument("paths", nargs="+", help="Directories of scene files, scene files or manifests")
+	parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes. Defaults to one per core")
+	parser.add_argument("-o", "--output", default=None, help="JSON lines file results are written to")
+	parser.add_argument("--no-recursive", action="store_true", help="Don't look for scene files in subdirectories")
+	args = parser.parse_args(args)
+
+	file_paths = collect_scene_files(args.paths, recursive=not args.no_recursive)
+
+	if args.output is None:
+		failed, internal_errors = run_batch(file_paths, sys.stdout, args.jobs)
+	else:
+		with open(args.output, "w") as output:
+			failed, internal_errors = run_batch(file_paths, output, args.jobs)
+
+	sys.stderr.write("%i files checked, %i failed\n" % (len(file_paths), failed))
+
+	if internal_errors:
+		sys.stderr.write("%i files raised an internal error\n" % internal_errors)
+		return 2
+
+	return 1 if failed else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
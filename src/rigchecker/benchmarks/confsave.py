@@ -0,0 +1,148 @@
+"""
+Latency of saving the configuration from the config window, on user configurations holding hundreds of validation
+rules. Each save is followed by reading the configuration back, as the UI does. Saves are measured when one section
+changed, when nothing did, and against the previous approach: rewriting the whole file in place and parsing it again.
+
+The user's configuration file is redirected to a temporary directory for the run, the actual one is left untouched.
+
+	python -m rigchecker.benchmarks.confsave [--rules 100 500 1000] [--repeat 50]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+from collections import OrderedDict
+
+try:
+	from time import perf_counter as clock
+except ImportError:
+	# Python 2
+	from time import time as clock
+
+from rigchecker import getconf
+
+DEFAULT_RULES = (100, 500, 1000)
+DEFAULT_REPEAT = 50
+
+# Rules are spread over this many categories
+CATEGORIES = 20
+
+
+def build_validations(rules):
+	"""
+	Returns a validations block holding the number of rules received as argument.
+
+	@rtype: OrderedDict
+	"""
+
+	validations = OrderedDict()
+
+	for i in range(rules):
+		validations.setdefault("category%i" % (i % CATEGORIES), []).append(OrderedDict([
+			("type", "attribute_value"),
+			("params", OrderedDict([("attribute", "attribute%i" % i), ("value", i), ("tolerance", 1e-05)]))
+		]))
+
+	return validations
+
+
+def save_in_place(config):
+	# Previous approach: the whole file is rewritten where it stands, then parsed again on the next read
+	mod_conf = OrderedDict(getconf.get_user_conf())
+	mod_conf.update(config)
+
+	with open(getconf.get_conf_file_path(), 'w') as config_file:
+		json.dump(mod_conf, config_file, indent=2)
+
+	getconf.invalidate_conf()
+	getconf.DISCOVERY_REGISTRY.sync()
+
+
+def time_saves(save, configs, repeat):
+	"""
+	Returns the mean time, in seconds, of saving each configuration received as argument in turn and reading the
+	configuration back.
+
+	@rtype: float
+	"""
+
+	start = clock()
+
+	for i in range(repeat):
+		save(configs[i % len(configs)])
+		getconf.get_conf()
+
+	return (clock() - start) / repeat
+
+
+def measure(rules, repeat):
+	validations = build_validations(rules)
+	suffixes = ("Controler", "CTL")
+
+	# The find section alternates between two values, so every save changes one section
+	changed = []
+
+	for suffix in suffixes:
+		find = OrderedDict(getconf.get_def_conf()["find"])
+		find["controls"] = OrderedDict(find["controls"], suffix=suffix)
+		changed.append(OrderedDict([("find", find), ("validations", validations)]))
+
+	getconf.save_conf(changed[0])
+	file_size = os.path.getsize(getconf.get_conf_file_path())
+
+	return OrderedDict([
+		("rules", rules),
+		("file_size", file_size),
+		("changed", time_saves(getconf.save_conf, changed, repeat)),
+		("unchanged", time_saves(getconf.save_conf, changed[:1], repeat)),
+		("in_place", time_saves(save_in_place, changed, repeat))
+	])
+
+
+def run(rules=DEFAULT_RULES, repeat=DEFAULT_REPEAT):
+	temp_dir_path = tempfile.mkdtemp(prefix="rigchecker_confsave")
+	conf_file_path = os.path.join(temp_dir_path, "config.json")
+
+	get_conf_file_path = getconf.get_conf_file_path
+	getconf.get_conf_file_path = lambda: conf_file_path
+	getconf.invalidate_conf(conf_file_path)
+
+	measures = []
+
+	print("%6s  %10s  %12s  %12s  %12s" % ("rules", "file", "changed", "unchanged", "in place"))
+
+	try:
+		for n in rules:
+			measures.append(measure(n, repeat))
+
+			m = measures[-1]
+			print("%6i  %8.1f kB  %9.3f ms  %9.3f ms  %9.3f ms" % (
+				m["rules"], m["file_size"] / 1e3, m["changed"] * 1e3, m["unchanged"] * 1e3, m["in_place"] * 1e3
+			))
+	finally:
+		getconf.get_conf_file_path = get_conf_file_path
+		getconf.invalidate_conf(conf_file_path)
+		getconf.invalidate_conf()
+		shutil.rmtree(temp_dir_path, ignore_errors=True)
+
+	return measures
+
+
+def main(args=None):
+	parser = argparse.ArgumentParser(description="Measures the latency of saving the configuration.")
+	parser.add_argument("--rules", nargs="+", type=int, default=list(DEFAULT_RULES), help="Validation rules saved.")
+	parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Saves measured per case.")
+
+	options = parser.parse_args(args)
+
+	run(options.rules, options.repeat)
+
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Parse throughput of the Maya ASCII reader, measured on generated files.
+
+	python -m rigchecker.benchmarks.mareader [controls] [vertices_per_mesh]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+try:
+	import tracemalloc
+except ImportError:
+	# Python 2
+	tracemalloc = None
+
+from rigchecker.utils import mareader
+
+
+def write_synthetic_ma(file_path, controls=1000, vertices_per_mesh=500):
+	"""
+	Writes a Maya ASCII file holding a rig of the size received as argument: a control curve, an offset group, a joint
+	and a skinned mesh per control, each mesh carrying vertex data the reader has to stream past.
+
+	@return: The number of nodes in the file
+	@rtype: int
+	"""
+
+	nodes = 2
+
+	with open(file_path, "w") as ma_file:
+		ma_file.write("//Maya ASCII 2020 scene\n//Name: synthetic.ma\n")
+		ma_file.write('requires maya "2020";\ncurrentUnit -l centimeter -a degree -t film;\n')
+		ma_file.write('createNode transform -n "rig_grp";\ncreateNode transform -n "geo_grp";\n')
+
+		for i in range(controls):
+			ma_file.write('createNode transform -n "c_%i_offset_grp" -p "rig_grp";\n' % i)
+			ma_file.write('createNode transform -n "c_%i_ctrl" -p "c_%i_offset_grp";\n' % (i, i))
+			ma_file.write('\tsetAttr -l on ".sx";\n\tsetAttr ".t" -type "double3" 0 0 0 ;\n')
+			ma_file.write('createNode nurbsCurve -n "c_%i_ctrlShape" -p "c_%i_ctrl";\n' % (i, i))
+			ma_file.write('\tsetAttr -k off ".v";\n\tsetAttr ".cc" -type "nurbsCurve" \n\t\t1 4 0 no 3\n')
+			ma_file.write("\t\t5 0 1 2 3 4\n\t\t5\n" + "\t\t-1 0 -1\n" * 5 + "\t\t;\n")
+			ma_file.write('createNode joint -n "j_%i_jnt" -p "rig_grp";\n\tsetAttr ".v" no;\n' % i)
+			ma_file.write('createNode transform -n "m_%i_geo" -p "geo_grp";\n' % i)
+			ma_file.write('createNode mesh -n "m_%i_geoShape" -p "m_%i_geo";\n' % (i, i))
+			ma_file.write('\tsetAttr -k off ".v";\n\tsetAttr -s %i ".vt";\n' % vertices_per_mesh)
+
+			for v in range(0, vertices_per_mesh, 3):
+				ma_file.write('\tsetAttr ".vt[%i:%i]"  -0.5 -0.5 0.5 0.5 -0.5 0.5 -0.5 0.5 0.5;\n' % (v, v + 2))
+
+			ma_file.write('\tsetAttr -s %i ".ed";\n\tsetAttr ".ed[0:%i]"' % (vertices_per_mesh, vertices_per_mesh - 1))
+
+			for v in range(vertices_per_mesh):
+				ma_file.write("  %i %i 0" % (v, (v + 1) % vertices_per_mesh) + ("\n\t\t" if v % 8 == 7 else ""))
+
+			ma_file.write(";\n")
+			ma_file.write('createNode skinCluster -n "skinCluster%i";\n' % i)
+			ma_file.write('\tsetAttr -s %i ".wl";\n' % vertices_per_mesh)
+			ma_file.write('connectAttr "skinCluster%i.og[0]" "m_%i_geoShape.i";\n' % (i, i))
+			ma_file.write('connectAttr "j_%i_jnt.wm" "skinCluster%i.ma[0]";\n' % (i, i))
+
+			nodes += 7
+
+		ma_file.write("// End of synthetic.ma\n")
+
+	return nodes
+
+
+def run(controls=1000, vertices_per_mesh=500):
+	file_descriptor, file_path = tempfile.mkstemp(suffix=".ma")
+	os.close(file_descriptor)
+
+	try:
+		nodes = write_synthetic_ma(file_path, controls, vertices_per_mesh)
+		size = os.path.getsize(file_path)
+
+		start = time.time()
+		scene = mareader.read_ma(file_path)
+		elapsed = time.time() - start
+
+		# Memory is measured on a second read, since tracing slows the parse down
+		peak = 0
+
+		if tracemalloc is not None:
+			tracemalloc.start()
+			mareader.read_ma(file_path)
+			peak = tracemalloc.get_traced_memory()[1]
+			tracemalloc.stop()
+	finally:
+		os.remove(file_path)
+
+	assert len(scene) == nodes
+
+	print("File: %.1f MB, %i nodes" % (size / 1e6, nodes))
+	print("Parse: %.3f s, %.1f MB/s, %.0f nodes/s" % (elapsed, size / 1e6 / elapsed, nodes / elapsed))
+	print("Peak memory: %.1f MB" % (peak / 1e6))
+
+	return {"size": size, "nodes": nodes, "seconds": elapsed, "peak_memory": peak}
+
+
+if __name__ == "__main__":
+	run(*[int(a) for a in sys.argv[1:3]])
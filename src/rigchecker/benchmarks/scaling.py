@@ -0,0 +1,229 @@
+"""
+How discovery, every all_* check and the validations scale with the scene's size, measured on synthetic rigs held by
+the in-memory backend (see synthrig). Results are written to a JSON file, along with the commit and the rig parameters,
+so runs can be compared across commits.
+
+	python -m rigchecker.benchmarks.scaling [--sizes 1000 10000 100000 1000000] [--output results.json]
+		[--compare previous.json] [--no-memory]
+"""
+
+import argparse
+import json
+import math
+import platform
+import subprocess
+import sys
+
+from collections import OrderedDict
+
+try:
+	from time import perf_counter as clock
+except ImportError:
+	# Python 2
+	from time import time as clock
+
+try:
+	import tracemalloc
+except ImportError:
+	# Python 2
+	tracemalloc = None
+
+from rigchecker.benchmarks import synthrig
+from rigchecker.utils import backend, inspect, inspectutils, scenesnapshot, validations
+
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+
+
+def get_commit():
+	try:
+		return subprocess.check_output(
+			["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.STDOUT
+		).decode("utf-8").strip()
+	except(OSError, subprocess.CalledProcessError):
+		return None
+
+
+def run_stages():
+	"""
+	Runs discovery, every check and the validations on the current backend's scene, timing each of them.
+
+	@return: The time each stage took, in seconds, keyed by the stage's name
+	@rtype: OrderedDict
+	"""
+
+	stages = OrderedDict()
+
+	start = clock()
+	snapshot = scenesnapshot.take_snapshot()
+	stages["take_snapshot"] = clock() - start
+
+	start = clock()
+	inspect.classify_scene(snapshot)
+	stages["classify_scene"] = clock() - start
+
+	start = clock()
+
+	for title in inspect.get_discovery_specs():
+		inspect.discover_nodes(title, snapshot)
+
+	stages["discover_nodes"] = clock() - start
+
+	for check in inspectutils.ALL_CHECKS:
+		start = clock()
+		check(snapshot)
+		stages[check.__name__] = clock() - start
+
+	start = clock()
+	validations.run_validations(snapshot)
+	stages["validations"] = clock() - start
+
+	stages["total"] = sum(stages.values())
+
+	return stages
+
+
+def measure(nodes, rig_params, memory=True):
+	start = clock()
+	scene_backend = synthrig.build_rig_of_size(nodes, **rig_params)
+	build_time = clock() - start
+
+	previous_backend = backend.BACKEND
+	backend.set_backend(scene_backend)
+
+	try:
+		stages = run_stages()
+
+		# Memory is measured on a second run, since tracing slows it down
+		peak_memory = None
+
+		if memory is True and tracemalloc is not None:
+			tracemalloc.start()
+			run_stages()
+			peak_memory = tracemalloc.get_traced_memory()[1]
+			tracemalloc.stop()
+	finally:
+		backend.set_backend(previous_backend)
+
+	scene_nodes = len(scene_backend)
+
+	return OrderedDict([
+		("nodes", scene_nodes),
+		("build_seconds", build_time),
+		("seconds", stages),
+		("nodes_per_second", OrderedDict((s, scene_nodes / t if t else None) for s, t in stages.items())),
+		("peak_memory", peak_memory)
+	])
+
+
+def scaling_exponent(nodes, seconds):
+	"""
+	Returns the least squares slope of log(time) against log(nodes): 1 for stages scaling linearly, 2 for quadratic
+	ones. Sizes too fast to time are left out.
+
+	@rtype: float
+	"""
+
+	points = [(math.log(n), math.log(t)) for n, t in zip(nodes, seconds) if t > 0]
+
+	if len(points) < 2:
+		return None
+
+	mean_x = sum(x for x, _ in points) / len(points)
+	mean_y = sum(y for _, y in points) / len(points)
+	variance = sum((x - mean_x) ** 2 for x, _ in points)
+
+	if variance == 0:
+		return None
+
+	return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+def run(sizes=DEFAULT_SIZES, output=None, compare=None, memory=True, rig_params=None):
+	rig_params = dict(synthrig.DEFAULT_RIG_PARAMS, **(rig_params or {}))
+	measures = []
+
+	for size in sizes:
+		measures.append(measure(size, rig_params, memory))
+
+		m = measures[-1]
+		print("%9i nodes: build %.2f s, total %.3f s, %.0f nodes/s%s" % (
+			m["nodes"], m["build_seconds"], m["seconds"]["total"], m["nodes_per_second"]["total"],
+			", peak %.1f MB" % (m["peak_memory"] / 1e6) if m["peak_memory"] is not None else ""
+		))
+
+	exponents = OrderedDict(
+		(s, scaling_exponent([m["nodes"] for m in measures], [m["seconds"][s] for m in measures]))
+		for s in measures[0]["seconds"]
+	)
+
+	results = OrderedDict([
+		("commit", get_commit()),
+		("python", platform.python_version()),
+		("platform", platform.platform()),
+		("rig_params", rig_params),
+		("sizes", list(sizes)),
+		("measures", measures),
+		("exponents", exponents)
+	])
+
+	print("\n%-32s %8s" % ("stage", "exponent"))
+
+	for s, e in exponents.items():
+		print("%-32s %8s" % (s, "-" if e is None else "%.2f" % e))
+
+	if compare is not None:
+		with open(compare) as previous_file:
+			print_comparison(json.load(previous_file), results)
+
+	if output is not None:
+		with open(output, "w") as output_file:
+			json.dump(results, output_file, indent=2)
+
+		print("\nResults written to %s" % output)
+
+	return results
+
+
+def print_comparison(previous, current):
+	"""
+	Prints the time ratio of every stage against a previous run, for the sizes both runs measured.
+	"""
+
+	if previous.get("rig_params") != current["rig_params"]:
+		print("\nWarning: the runs built their rigs with different parameters.")
+
+	previous_measures = dict((m["nodes"], m) for m in previous["measures"])
+
+	print("\nAgainst %s (current / previous time):" % (previous.get("commit") or "previous run"))
+
+	for m in current["measures"]:
+		try:
+			previous_seconds = previous_measures[m["nodes"]]["seconds"]
+		except KeyError:
+			continue
+
+		print("%9i nodes: %s" % (m["nodes"], ", ".join(
+			"%s %.2fx" % (s, t / previous_seconds[s]) for s, t in m["seconds"].items() if previous_seconds.get(s)
+		)))
+
+
+def main(args=None):
+	parser = argparse.ArgumentParser(description="Measures how discovery and checks scale on synthetic rigs.")
+	parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES), help="Scene sizes, in nodes.")
+	parser.add_argument("--output", help="JSON file the results are written to.")
+	parser.add_argument("--compare", help="Results file of a previous run to compare against.")
+	parser.add_argument("--no-memory", action="store_true", help="Skip measuring peak memory.")
+
+	for name, value in sorted(synthrig.DEFAULT_RIG_PARAMS.items()):
+		parser.add_argument("--%s" % name.replace("_", "-"), type=type(value), default=value)
+
+	options = parser.parse_args(args)
+	rig_params = dict((name, getattr(options, name)) for name in synthrig.DEFAULT_RIG_PARAMS)
+
+	run(options.sizes, options.output, options.compare, not options.no_memory, rig_params)
+
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Synthetic rigs built straight into the in-memory backend, sized by node count, for the scaling benchmarks.
+"""
+
+import random
+
+from rigchecker.utils import backend
+
+# Parameters of the rigs the scaling benchmarks build, unless told otherwise. Runs are only comparable with the same
+# parameters, which are written to the results file
+DEFAULT_RIG_PARAMS = {
+	"depth": 4,
+	"fanout": 4,
+	"meshes_per_control": 1.0,
+	"skinned_ratio": 0.9,
+	"constraint_density": 0.1,
+	"zeroed_ratio": 0.95,
+	"seed": 0
+}
+
+
+def controls_for_nodes(nodes, meshes_per_control=1.0, skinned_ratio=0.9, constraint_density=0.1, **kwargs):
+	"""
+	Returns how many controls a rig needs to hold about the number of nodes received as argument. Each control comes
+	with an offset group, a shape and a joint, and each mesh with a transform, its shape, and a skin cluster and a
+	constraint depending on the ratios.
+
+	@rtype: int
+	"""
+
+	nodes_per_control = 4 + meshes_per_control * (2 + skinned_ratio + constraint_density)
+
+	return max(1, int(round((nodes - 2) / nodes_per_control)))
+
+
+def build_rig(controls, depth=4, fanout=4, meshes_per_control=1.0, skinned_ratio=0.9, constraint_density=0.1,
+		zeroed_ratio=0.95, seed=0, scene_backend=None):
+	"""
+	Builds a rig with the number of controls received as argument:
+
+	- controls are offset group, transform and curve shape triplets, nested in trees of the depth and fan out received
+	as argument under rig_grp, with a hidden joint hierarchy mirroring them,
+	- meshes live under geo_grp, skinned to a joint for skinned_ratio of them and constrained to a control for
+	constraint_density of them,
+	- zeroed_ratio of the controls are zeroed, the others are offset along X.
+
+	The same arguments always build the same rig.
+
+	@return: The backend holding the rig
+	@rtype: backend.MemoryBackend
+	"""
+
+	if scene_backend is None:
+		scene_backend = backend.MemoryBackend()
+
+	rng = random.Random(seed)
+	tree_size = sum(fanout ** k for k in range(depth))
+
+	rig_grp = scene_backend.create_node("rig_grp", "transform")
+	geo_grp = scene_backend.create_node("geo_grp", "transform")
+
+	control_names = []
+	joint_names = []
+
+	for i in range(controls):
+		local_index = i % tree_size
+
+		if local_index == 0:
+			control_parent = rig_grp
+			joint_parent = rig_grp
+		else:
+			control_parent = control_names[i - local_index + (local_index - 1) // fanout]
+			joint_parent = joint_names[i - local_index + (local_index - 1) // fanout]
+
+		offset_grp = scene_backend.create_node("c%i_offset_grp" % i, "transform", control_parent)
+		control = scene_backend.create_node("c%i_Controler" % i, "transform", offset_grp)
+		scene_backend.create_node("c%i_ControlerShape" % i, "nurbsCurve", control)
+
+		if rng.random() >= zeroed_ratio:
+			scene_backend.set_attr(control, "translateX", rng.uniform(0.1, 10.0))
+
+		joint = scene_backend.create_node("j%i_jnt" % i, "joint", joint_parent)
+
+		if local_index == 0:
+			scene_backend.set_attr(joint, "visibility", False)
+
+		control_names.append(control)
+		joint_names.append(joint)
+
+	for i in range(int(round(controls * meshes_per_control))):
+		geo = scene_backend.create_node("m%i_geo" % i, "transform", geo_grp)
+		geo_shape = scene_backend.create_node("m%i_geoShape" % i, "mesh", geo)
+
+		if rng.random() < skinned_ratio:
+			skin_cluster = scene_backend.create_node("skinCluster%i" % i, "skinCluster")
+			scene_backend.connect_attr(skin_cluster + ".outputGeometry[0]", geo_shape + ".inMesh")
+			scene_backend.connect_attr(joint_names[i % controls] + ".worldMatrix[0]", skin_cluster + ".matrix[0]")
+
+		if rng.random() < constraint_density:
+			constraint = scene_backend.create_node("m%i_geo_parentConstraint1" % i, "parentConstraint", geo)
+			scene_backend.connect_attr(constraint + ".constraintTranslateX", geo + ".translateX")
+			scene_backend.connect_attr(control_names[i % controls] + ".worldMatrix[0]", constraint + ".target[0]")
+
+	return scene_backend
+
+
+def build_rig_of_size(nodes, **params):
+	"""
+	Builds a rig holding about the number of nodes received as argument, see controls_for_nodes.
+
+	@return: backend.MemoryBackend
+	@rtype: backend.MemoryBackend
+	"""
+
+	rig_params = dict(DEFAULT_RIG_PARAMS, **params)
+
+	return build_rig(controls_for_nodes(nodes, **rig_params), **rig_params)
@@ -1,11 +1,103 @@
 import json
 import os
 import re
+import stat
+import tempfile
 
-from collections import namedtuple, OrderedDict
+from collections import OrderedDict
 
-CONF = None
-DEF_CONF = None
+try:
+	from time import monotonic as clock
+except ImportError:
+	# Python 2
+	from time import time as clock
+
+# Seconds a configuration file is trusted not to have changed since it was last checked. Within that window reading the
+# configuration costs a dictionary lookup, past it a single stat
+STAT_WINDOW = 1.0
+
+
+class ConfCache(object):
+	"""
+	Parsed configuration files keyed by path. A file is parsed again only when its modification time or size changed,
+	so edits made by another Maya session or by pipeline tooling are picked up, while reading an unchanged file costs
+	one stat per STAT_WINDOW seconds at most.
+
+	The generation of a file grows every time it's parsed again, so data derived from the configuration can tell
+	whether it's still current.
+	"""
+
+	def __init__(self, stat_window=STAT_WINDOW):
+		self.stat_window = stat_window
+
+		# Path: [modification time, size, parsed content, time last checked]. Missing files are cached as None
+		self.__entries = {}
+		self.__generations = {}
+
+	def get(self, file_path, load):
+		"""
+		Returns the parsed content of the file received as argument, parsing it with load if it changed since it was
+		last parsed.
+
+		@return: The file's content, or None if the file doesn't exist
+		@rtype: object
+		"""
+
+		now = clock()
+		entry = self.__entries.get(file_path)
+
+		if entry is not None and now - entry[3] < self.stat_window:
+			return entry[2]
+
+		try:
+			file_stat = os.stat(file_path)
+		except OSError:
+			self.__entries[file_path] = [None, None, None, now]
+			return None
+
+		if entry is not None and entry[2] is not None and (entry[0], entry[1]) == (file_stat.st_mtime, file_stat.st_size):
+			entry[3] = now
+			return entry[2]
+
+		content = load(file_path)
+
+		self.__entries[file_path] = [file_stat.st_mtime, file_stat.st_size, content, now]
+		self.__generations[file_path] = self.__generations.get(file_path, 0) + 1
+
+		return content
+
+	def generation(self, file_path):
+		return self.__generations.get(file_path, 0)
+
+	def put(self, file_path, content):
+		"""
+		Caches the content received as argument for the file received as argument, which was just written with it, so
+		it isn't parsed again.
+		"""
+
+		file_stat = os.stat(file_path)
+
+		self.__entries[file_path] = [file_stat.st_mtime, file_stat.st_size, content, clock()]
+		self.__generations[file_path] = self.__generations.get(file_path, 0) + 1
+
+	def invalidate(self, file_path=None):
+		"""
+		Drops the content cached for the file received as argument, or for every file, so it's parsed again on the
+		next access.
+		"""
+
+		if file_path is None:
+			self.__entries.clear()
+		else:
+			self.__entries.pop(file_path, None)
+
+
+try:
+	CONF_CACHE
+except NameError:
+	# Kept across reloads of this module, so the generations data derived from the configuration is tagged with stay
+	# meaningful
+	CONF_CACHE = ConfCache()
 
 # ##############################
 #
@@ -24,135 +116,701 @@ def get_def_conf_file_path():
 	return os.path.join(os.path.dirname(__file__), "config", "default.json")
 
 
-def get_conf():
-	global CONF
+def _load_conf(file_path):
+	with open(file_path, 'r') as conf_file:
+		return json.load(conf_file, object_pairs_hook=OrderedDict)
 
-	try:
-		assert CONF is None
-	except AssertionError:
-		return CONF
 
+def _load_def_conf(file_path):
 	try:
-		conf_file = open(get_conf_file_path(), 'r')
-	except(RuntimeError, Exception):
-		# A user configuration file doesn't exists. Therefore, resort to the default configuration
-		CONF = get_def_conf()
-	else:
-		try:
-			CONF = json.load(conf_file, object_pairs_hook=OrderedDict)
-		except(ValueError, RuntimeError, Exception):
-			conf_file.close()
-			raise
-		else:
-			conf_file.close()
+		return _load_conf(file_path)
+	except ValueError:
+		# A default configuration doesn't exist. Raise the appropriate exception
+		raise RuntimeError("File default.json doesn't contain a valid JSON")
+
+
+def get_user_conf():
+	"""
+	Returns the user's configuration file: the overrides applied on top of the default configuration and the studio
+	profile. Empty if the user has no configuration file.
 
-	return CONF
+	@rtype: OrderedDict
+	"""
+
+	conf = CONF_CACHE.get(get_conf_file_path(), _load_conf)
+
+	return OrderedDict() if conf is None else conf
 
 
 def get_def_conf():
-	global DEF_CONF
+	def_conf = CONF_CACHE.get(get_def_conf_file_path(), _load_def_conf)
+
+	if def_conf is None:
+		raise IOError("Unable to find a default configuration file, default.json")
+
+	return def_conf
+
+
+def get_conf():
+	"""
+	Returns the configuration in effect: the default configuration, overridden by the active studio profile, overridden
+	by the user's configuration, see get_layered_conf.
+
+	@rtype: OrderedDict
+	"""
+
+	return get_layered_conf().conf
+
+
+def get_conf_generation():
+	"""
+	Returns a value which changes every time a configuration file is parsed again or the active profile changes, i.e.
+	every time the configuration changes.
+
+	@rtype: tuple
+	"""
+
+	return get_layered_conf().generation
+
+
+# ##############################
+# Profiles
+# ##############################
+
+# Flat keys of the studio profiles mapped to their path in the configuration
+PROFILE_KEYS = {
+	"studio": ("name",),
+	"forbidden_types": ("forbidden",)
+}
+
+# Flat keys setting a category's find data, as <title>_<key> or selected_<title>_discovery_methods
+PROFILE_FIND_KEY_RE = re.compile(
+	r"^(?P<selected>selected_)?(?P<title>\w+?)_(?P<key>suffix|types?|exp|expression|locations|discovery_methods)$"
+)
+PROFILE_FIND_KEYS = {"type": "types", "expression": "exp"}
+
+# Returned by _overrides when a value doesn't need to be overridden
+UNCHANGED = object()
+
+# Name of the layers the configuration is resolved from, lowest first
+DEFAULT_LAYER = "default"
+PROFILE_LAYER = "profile:%s"
+USER_LAYER = "user"
+
+ACTIVE_PROFILE = None
+
+
+def get_profiles_dir_path():
+	return os.path.join(os.path.dirname(__file__), "config", "profiles")
+
+
+def list_profiles():
+	profiles_dir_path = get_profiles_dir_path()
 
 	try:
-		assert DEF_CONF is None
-	except AssertionError:
-		return DEF_CONF
+		return sorted(d for d in os.listdir(profiles_dir_path) if os.path.isdir(os.path.join(profiles_dir_path, d)))
+	except OSError:
+		return []
+
+
+def get_profile_file_paths(profile):
+	"""
+	Returns the files of the studio profile received as argument, in the order they're applied: profile.json first,
+	then the rest of its JSON files, alphabetically.
+
+	@rtype: list
+	"""
+
+	if not profile:
+		return []
+
+	profile_dir_path = os.path.join(get_profiles_dir_path(), profile)
 
 	try:
-		def_conf_file = open(get_def_conf_file_path(), 'r')
-	except(RuntimeError, Exception):
-		if os.path.exists(get_conf_file_path()) is False:
-			raise FileNotFoundError("Unable to find a default configuration file, default.json")
+		file_names = sorted(f for f in os.listdir(profile_dir_path) if f.endswith(".json"))
+	except OSError:
+		raise ValueError("Unable to find a profile named %s." % profile)
+
+	file_names.sort(key=lambda f: f != "profile.json")
+
+	return [os.path.join(profile_dir_path, f) for f in file_names]
+
+
+def normalize_profile(profile_data):
+	"""
+	Converts the flat keys of a studio profile (controls_suffix, selected_controls_discovery_methods...) into the
+	configuration's structure. Keys already structured like the configuration's are kept as they are.
+
+	@rtype: OrderedDict
+	"""
+
+	normalized = OrderedDict()
+
+	for key, value in profile_data.items():
+		if key in PROFILE_KEYS:
+			path = PROFILE_KEYS[key]
 		else:
-			raise
+			match = PROFILE_FIND_KEY_RE.match(key)
 
-	try:
-		DEF_CONF = json.load(def_conf_file, object_pairs_hook=OrderedDict)
-	except(RuntimeError, Exception):
-		# A default configuration doesn't exist. Raise the appropriate exception
-		def_conf_file.close()
-		raise RuntimeError("File default.json doesn't contain a valid JSON")
+			if match is None or (match.group("selected") and match.group("key") != "discovery_methods"):
+				normalized[key] = value
+				continue
+
+			find_key = PROFILE_FIND_KEYS.get(match.group("key"), match.group("key"))
+
+			if match.group("selected"):
+				find_key = "selected_" + find_key
+
+			if find_key == "types" and not isinstance(value, list):
+				value = [value] if value else []
 
-	def_conf_file.close()
-	return DEF_CONF
+			path = ("find", match.group("title"), find_key)
+
+		_merge(normalized, _nest(path, value))
+
+	return normalized
+
+
+def _copy(value):
+	"""
+	Returns a deep copy of the configuration value received as argument. Values are parsed from JSON, so only
+	dictionaries and lists need copying, which is much cheaper than copy.deepcopy.
+	"""
+
+	if isinstance(value, dict):
+		return OrderedDict((k, _copy(v)) for k, v in value.items())
+	elif isinstance(value, list):
+		return [_copy(v) for v in value]
+
+	return value
+
+
+def _nest(path, value):
+	for key in reversed(path):
+		value = OrderedDict([(key, value)])
+
+	return value
+
+
+def _merge(base, overlay, layer=None, provenance=None, path=()):
+	"""
+	Merges the overlay received as argument into base, in place: dictionaries are merged key by key, anything else,
+	lists included, replaces the value underneath. When a provenance dictionary is received, the layer received as
+	argument is recorded as the source of every value the overlay sets, keyed by its dotted path.
+	"""
+
+	for key, value in overlay.items():
+		key_path = path + (key,)
+
+		if isinstance(value, dict) and isinstance(base.get(key), dict):
+			_merge(base[key], value, layer, provenance, key_path)
+			continue
+
+		base[key] = _copy(value)
+
+		if provenance is not None:
+			dotted_path = ".".join(key_path)
+
+			# Values the overlay replaced are gone, along with their provenance
+			for p in [p for p in provenance if p.startswith(dotted_path + ".")]:
+				del provenance[p]
+
+			for leaf_path in _leaf_paths(value, key_path):
+				provenance[".".join(leaf_path)] = layer
+
+
+def _leaf_paths(value, path):
+	if isinstance(value, dict) and value:
+		for key, child in value.items():
+			for leaf_path in _leaf_paths(child, path + (key,)):
+				yield leaf_path
+	else:
+		yield path
+
+
+class LayeredConf(object):
+	"""
+	The configuration in effect, resolved from its layers: the default configuration, then the studio profile, then
+	the user's overrides. Besides the merged configuration, it tells which layer each value comes from.
+	"""
+
+	__slots__ = ("generation", "profile", "conf", "provenance")
+
+	def __init__(self, generation, profile, layers, previous=None, sections=None):
+		"""
+		When a previous resolution and the top level sections changed since are received as argument, only those
+		sections are merged again, the others are copied from the previous resolution. They're copied rather than
+		shared, since callers of get_conf may hold and modify the previous resolution's.
+		"""
+
+		self.generation = generation
+		self.profile = profile
+		self.conf = OrderedDict()
+		self.provenance = {}
+
+		if previous is None or sections is None:
+			for layer, layer_conf in layers:
+				_merge(self.conf, layer_conf, layer, self.provenance)
+
+			return
+
+		for key in OrderedDict((k, None) for _, layer_conf in layers for k in layer_conf):
+			if key in sections or key not in previous.conf:
+				for layer, layer_conf in layers:
+					if key in layer_conf:
+						_merge(self.conf, OrderedDict([(key, layer_conf[key])]), layer, self.provenance)
+			else:
+				self.conf[key] = _copy(previous.conf[key])
+
+		for p, layer in previous.provenance.items():
+			key = p.partition(".")[0]
+
+			if key in self.conf and key not in sections:
+				self.provenance[p] = layer
+
+	def source_of(self, key_path):
+		"""
+		Returns the layer the value at the dotted path received as argument comes from. Paths to dictionaries return
+		the layer of the first of their values.
+
+		@return: The layer's name, or None if no layer sets the value
+		@rtype: str
+		"""
+
+		try:
+			return self.provenance[key_path]
+		except KeyError:
+			return next((l for p, l in sorted(self.provenance.items()) if p.startswith(key_path + ".")), None)
+
+
+# Resolved configuration of every profile used so far, so switching back to one is free: [generation, time last
+# checked, LayeredConf], keyed by profile
+LAYERED_CONFS = {}
+
+
+def get_active_profile():
+	"""
+	Returns the studio profile in effect: the one set via set_active_profile if any, otherwise the one the user's
+	configuration names under "profile".
+
+	@return: The profile's name, or None if no profile is in effect
+	@rtype: str
+	"""
+
+	if ACTIVE_PROFILE is not None:
+		return ACTIVE_PROFILE or None
+
+	return get_user_conf().get("profile") or None
+
+
+def set_active_profile(profile):
+	"""
+	Switches to the studio profile received as argument. Passing None goes back to the profile the user's
+	configuration names, and an empty string to no profile at all. Profiles resolved before are reused, as long as
+	none of their files changed.
+	"""
+
+	global ACTIVE_PROFILE, RESOLVED_CONF
+
+	if profile and profile not in list_profiles():
+		raise ValueError("Unable to find a profile named %s." % profile)
+
+	ACTIVE_PROFILE = profile
+	RESOLVED_CONF = None
+
+	DISCOVERY_REGISTRY.sync()
+
+
+def _get_layers(profile):
+	"""
+	Returns the layers of the configuration for the profile received as argument, lowest first.
+
+	@return: [(str, OrderedDict),...] as (layer, configuration)
+	@rtype: list
+	"""
+
+	layers = [(DEFAULT_LAYER, get_def_conf())]
+
+	if profile:
+		profile_conf = OrderedDict()
+
+		for file_path in get_profile_file_paths(profile):
+			_merge(profile_conf, normalize_profile(CONF_CACHE.get(file_path, _load_conf) or {}))
+
+		layers.append((PROFILE_LAYER % profile, profile_conf))
+
+	layers.append((USER_LAYER, get_user_conf()))
+
+	return layers
+
+
+def _get_layers_generation(profile):
+	return (
+		CONF_CACHE.generation(get_conf_file_path()), CONF_CACHE.generation(get_def_conf_file_path()), profile,
+		tuple(CONF_CACHE.generation(f) for f in get_profile_file_paths(profile))
+	)
+
+
+def get_layered_conf(profile=None):
+	"""
+	Returns the configuration resolved from its layers for the profile received as argument, the active one by
+	default. Like the files themselves, a resolved configuration is trusted for STAT_WINDOW seconds, and resolved
+	again only when one of its files changed.
+
+	@return: LayeredConf
+	@rtype: LayeredConf
+	"""
+
+	if profile is None:
+		profile = get_active_profile()
+
+	now = clock()
+	entry = LAYERED_CONFS.get(profile)
+
+	if entry is not None and entry[1] is not None and now - entry[1] < CONF_CACHE.stat_window:
+		return entry[2]
+
+	layers = _get_layers(profile)
+	generation = _get_layers_generation(profile)
+
+	if entry is None or entry[0] != generation:
+		entry = LAYERED_CONFS[profile] = [generation, now, LayeredConf(generation, profile, layers)]
+	else:
+		entry[1] = now
+
+	return entry[2]
+
+
+def get_provenance(key_path):
+	"""
+	Returns the layer the configuration value at the dotted path received as argument (find.controls.suffix...) comes
+	from: "default", "profile:<name>" or "user".
+
+	@rtype: str
+	"""
+
+	return get_layered_conf().source_of(key_path)
 
 
 # ##############################
-# Find
+# Resolved configuration
 # ##############################
 
 
-def get_suffix(title):
-	try:
-		return get_conf()["find"][title]["suffix"]
-	except KeyError:
+class FindSpec(object):
+	"""
+	Find block of a category, resolved once: values missing from the user configuration are read from the default one,
+	the expression is compiled and lists are frozen, so discovery reads plain attributes. Instances are read-only.
+	"""
+
+	__slots__ = (
+		"title", "suffix", "expression", "types", "type_names", "locations", "discovery_methods",
+		"selected_discovery_methods"
+	)
+
+	def __init__(self, title, find_data=None, def_find_data=None):
+		find_data = find_data or {}
+		def_find_data = def_find_data or {}
+
+		def value(key, default):
+			try:
+				return find_data[key]
+			except KeyError:
+				return def_find_data.get(key, default)
+
 		try:
-			return get_def_conf()["find"][title]["suffix"]
-		except KeyError:
-			return ""
+			expression = re.compile(value("exp", None))
+		except(TypeError, ValueError, RuntimeError, Exception):
+			expression = None
 
+		set_attr = super(FindSpec, self).__setattr__
 
-def get_expression(title):
-	try:
-		geo_exp = get_conf()["find"][title]["exp"]
-	except KeyError:
+		set_attr("title", title)
+		set_attr("suffix", value("suffix", "") or "")
+		set_attr("expression", expression)
+		set_attr("type_names", tuple(value("types", ())))
+		set_attr("types", frozenset(self.type_names))
+		set_attr("locations", tuple(value("locations", ())))
+		set_attr("discovery_methods", tuple(value("discovery_methods", ())))
+		set_attr("selected_discovery_methods", tuple(value("selected_discovery_methods", ())))
+
+	def __setattr__(self, name, value):
+		raise AttributeError("Resolved configurations are read-only.")
+
+
+class ResolvedConf(object):
+	"""
+	The configuration resolved into read-only objects, for the generation of the configuration files it was resolved
+	from, see get_conf_generation.
+	"""
+
+	__slots__ = ("generation", "name", "find", "forbidden")
+
+	def __init__(self, generation, conf, def_conf):
+		set_attr = super(ResolvedConf, self).__setattr__
+
+		conf_find = conf.get("find", {})
+		def_conf_find = def_conf.get("find", {})
+
+		set_attr("generation", generation)
+		set_attr("name", conf.get("name", def_conf.get("name", "")))
+		set_attr("find", dict(
+			(t, FindSpec(t, conf_find.get(t), def_conf_find.get(t))) for t in list(def_conf_find) + list(conf_find)
+		))
+		set_attr("forbidden", tuple(conf.get("forbidden", def_conf.get("forbidden", ()))))
+
+	def __setattr__(self, name, value):
+		raise AttributeError("Resolved configurations are read-only.")
+
+	def find_spec(self, title):
 		try:
-			geo_exp = get_def_conf()["find"][title]["exp"]
+			return self.find[title]
 		except KeyError:
-			return None
+			# Categories found in neither configuration resolve to empty specs, built once
+			return self.find.setdefault(title, FindSpec(title))
 
-	try:
-		return re.compile(geo_exp)
-	except(ValueError, RuntimeError, Exception):
-		return None
+
+RESOLVED_CONF = None
+RESOLVED_CONF_CHECKED = None
+
+
+def get_resolved_conf():
+	"""
+	Returns the configuration resolved into read-only objects. It's resolved again only when a configuration file
+	changed. Like the files themselves, the resolved configuration is trusted for STAT_WINDOW seconds.
+
+	@return: ResolvedConf
+	@rtype: ResolvedConf
+	"""
+
+	global RESOLVED_CONF, RESOLVED_CONF_CHECKED
+
+	now = clock()
+
+	if RESOLVED_CONF is not None and now - RESOLVED_CONF_CHECKED < CONF_CACHE.stat_window:
+		return RESOLVED_CONF
+
+	RESOLVED_CONF_CHECKED = now
+
+	conf = get_conf()
+	def_conf = get_def_conf()
+	generation = get_conf_generation()
+
+	if RESOLVED_CONF is None or RESOLVED_CONF.generation != generation:
+		RESOLVED_CONF = ResolvedConf(generation, conf, def_conf)
+
+	return RESOLVED_CONF
+
+
+def get_find_spec(title):
+	"""
+	Returns the resolved find block of the category received as argument.
+
+	@return: FindSpec
+	@rtype: FindSpec
+	"""
+
+	return get_resolved_conf().find_spec(title)
+
+
+# ##############################
+# Find
+# ##############################
+
+
+def get_suffix(title):
+	return get_find_spec(title).suffix
+
+
+def get_expression(title):
+	return get_find_spec(title).expression
 
 
 def get_types(title):
-	try:
-		return get_conf()["find"][title]["types"]
-	except KeyError:
-		try:
-			return get_def_conf()["find"][title]["types"]
-		except KeyError:
-			return []
+	return get_find_spec(title).type_names
 
 
 def get_discovery_methods(title):
-	try:
-		return get_conf()["find"][title]["discovery_methods"]
-	except KeyError:
-		try:
-			return get_def_conf()["find"][title]["discovery_methods"]
-		except KeyError:
-			return []
+	return get_find_spec(title).discovery_methods
 
 
 def get_selected_discovery_methods(title):
-	try:
-		return get_conf()["find"][title]["selected_discovery_methods"]
-	except KeyError:
+	return get_find_spec(title).selected_discovery_methods
+
+
+# ##############################
+# Discovery
+# ##############################
+
+
+class DiscoverySpec(object):
+	"""
+	Discovery data of a category: the values of its selected discovery methods, None for the methods not selected.
+	Instances are read-only and shared, see DiscoveryRegistry.
+	"""
+
+	__slots__ = ("title", "methods", "suffix", "expression", "type", "location")
+
+	def __init__(self, find_spec):
+		methods = find_spec.selected_discovery_methods
+		set_attr = super(DiscoverySpec, self).__setattr__
+
+		set_attr("title", find_spec.title)
+		set_attr("methods", methods)
+		set_attr("suffix", find_spec.suffix if "suffix" in methods else None)
+		set_attr("expression", find_spec.expression if "expression" in methods else None)
+		set_attr("type", find_spec.type_names if "type" in methods else None)
+		set_attr("location", find_spec.locations if "location" in methods else None)
+
+	def __setattr__(self, name, value):
+		raise AttributeError("Discovery specs are read-only.")
+
+	def __repr__(self):
+		return "DiscoverySpec(%s)" % ", ".join("%s=%r" % (m, getattr(self, m, None)) for m in self.methods)
+
+	def key(self):
+		"""
+		Returns the values discovery depends on, telling whether two specs discover the same nodes.
+
+		@rtype: tuple
+		"""
+
+		return (
+			self.methods, self.suffix, None if self.expression is None else self.expression.pattern, self.type,
+			self.location
+		)
+
+
+class DiscoveryRegistry(object):
+	"""
+	Builds one discovery spec per category from the resolved configuration, and keeps it until the category's find
+	block changes. Whenever the configuration changes, only the specs of the categories whose discovery data changed
+	are replaced, and the listeners are told which ones, so they can drop the data they derived from them.
+	"""
+
+	def __init__(self):
+		self.__specs = {}
+		self.__generation = None
+		self.__listeners = []
+
+	def add_listener(self, listener):
+		"""
+		Makes the callable received as argument be called with the titles of the categories whose spec changed,
+		every time some did. A listener replaces the one with the same module and name, if any, so reloading the
+		module registering it doesn't register it twice.
+		"""
+
+		key = (listener.__module__, listener.__name__)
+
+		self.__listeners = [l for l in self.__listeners if (l.__module__, l.__name__) != key] + [listener]
+
+	def remove_listener(self, listener):
+		try:
+			self.__listeners.remove(listener)
+		except ValueError:
+			pass
+
+	def sync(self):
+		"""
+		Rebuilds the specs if the configuration changed since they were built, and notifies the listeners of the
+		categories whose spec changed.
+
+		@return: The titles of the categories whose spec changed
+		@rtype: frozenset
+		"""
+
+		resolved_conf = get_resolved_conf()
+
+		if resolved_conf.generation == self.__generation:
+			return frozenset()
+
+		self.__generation = resolved_conf.generation
+		changed = set()
+
+		for title, spec in list(self.__specs.items()):
+			new_spec = DiscoverySpec(resolved_conf.find_spec(title))
+
+			if new_spec.key() != spec.key():
+				self.__specs[title] = new_spec
+				changed.add(title)
+
+		changed = frozenset(changed)
+
+		if changed:
+			for listener in list(self.__listeners):
+				listener(changed)
+
+		return changed
+
+	def get(self, title):
+		"""
+		Returns the discovery spec of the category received as argument.
+
+		@return: DiscoverySpec
+		@rtype: DiscoverySpec
+		"""
+
+		self.sync()
+
 		try:
-			return get_def_conf()["find"][title]["selected_discovery_methods"]
+			return self.__specs[title]
 		except KeyError:
-			return []
+			spec = self.__specs[title] = DiscoverySpec(get_find_spec(title))
+
+			return spec
+
+
+try:
+	DISCOVERY_REGISTRY
+except NameError:
+	# Kept across reloads of this module, which would otherwise drop the listeners registered by other modules
+	DISCOVERY_REGISTRY = DiscoveryRegistry()
 
 
 def get_discovery_data(title):
-	sel_discovery_methods = get_selected_discovery_methods(title)
-
-	GeoDiscoveryData = namedtuple("GeoDiscoveryData", sel_discovery_methods)
-	discovery_data = []
-
-	for m in sel_discovery_methods:
-		if m == "suffix":
-			discovery_data.append(get_geo_suffix())
-		elif m == "expression":
-			discovery_data.append(get_geo_expression())
-		elif m == "type":
-			discovery_data.append(get_geo_types())
-		else:
-			discovery_data.append(None)
+	return DISCOVERY_REGISTRY.get(title)
 
-	return GeoDiscoveryData.__new__(GeoDiscoveryData, *discovery_data)
+
+# ##############################
+# Validations
+# ##############################
+
+
+def get_validations():
+	"""
+	Returns the validations block: the validations set for each category, keyed by the category's title.
+
+	@rtype: OrderedDict
+	"""
+
+	return get_conf().get("validations", OrderedDict())
+
+
+def get_validation_params(title, validation_type):
+	"""
+	Returns the parameters of the first validation of the type received as argument set for the category received as
+	argument, or None if the category has no such validation.
+
+	@rtype: dict
+	"""
+
+	try:
+		validations = get_conf()["validations"][title]
+	except KeyError:
+		return None
+
+	for v in validations:
+		if v.get("type") == validation_type:
+			return v.get("params", {})
+
+	return None
+
+
+def get_zeroed_tolerance(title="controls"):
+	try:
+		return float(get_validation_params(title, "node_zeroed")["tolerance"])
+	except(TypeError, KeyError, ValueError):
+		return None
 
 
 # ##############################
@@ -162,66 +820,188 @@ def get_discovery_data(title):
 # ##############################
 
 
-def reset_conf_to_default():
-	# Assume a custom config file already exists or create a new one, otherwise
+def _conf_changed():
+	"""
+	Drops the configuration resolved from the files, after one of them changed.
+	"""
+
+	global RESOLVED_CONF
+
+	RESOLVED_CONF = None
+
+	# Resolved profiles are checked again, and resolved again if they depend on the file
+	for entry in LAYERED_CONFS.values():
+		entry[1] = None
+
+
+def invalidate_conf(file_path=None):
+	"""
+	Drops the cached content of the configuration file received as argument, the user's by default, and the
+	configuration resolved from it.
+	"""
+
+	CONF_CACHE.invalidate(get_conf_file_path() if file_path is None else file_path)
+	_conf_changed()
+
+
+def _replace_file(source_path, destination_path):
 	try:
-		config_file = open(get_conf_file_path(), 'w')
-	except(RuntimeError, Exception):
-		raise
+		os.replace(source_path, destination_path)
+	except AttributeError:
+		# Python 2. Renaming over an existing file fails on Windows
+		if os.name == "nt" and os.path.exists(destination_path):
+			os.remove(destination_path)
+
+		os.rename(source_path, destination_path)
+
+
+def write_conf_file(file_path, conf):
+	"""
+	Writes the configuration received as argument atomically: it's written to a temporary file next to the destination
+	and flushed to disk, then renamed over the destination. A crash mid-write leaves the previous file intact.
+	"""
+
+	file_descriptor, temp_file_path = tempfile.mkstemp(
+		prefix=".%s." % os.path.basename(file_path), suffix=".tmp", dir=os.path.dirname(file_path)
+	)
 
 	try:
-		json.dump(get_def_conf(), config_file, indent=2, sort_keys=False)
+		with os.fdopen(file_descriptor, 'w') as temp_file:
+			json.dump(conf, temp_file, indent=2, sort_keys=False)
+			temp_file.flush()
+			os.fsync(temp_file.fileno())
+
+		# Temporary files are only readable by their owner. Keep the permissions of the file being replaced instead
+		try:
+			os.chmod(temp_file_path, stat.S_IMODE(os.stat(file_path).st_mode))
+		except OSError:
+			os.chmod(temp_file_path, 0o644)
+
+		_replace_file(temp_file_path, file_path)
 	except(RuntimeError, Exception):
-		config_file.close()
+		try:
+			os.remove(temp_file_path)
+		except OSError:
+			pass
+
 		raise
 
-	# Force the configuration to reload
-	global CONF
 
-	CONF = None
-	config_file.close()
+def _save_user_conf(user_conf, sections=None):
+	"""
+	Writes the user's overrides received as argument and caches them as they are, so the file isn't parsed again, then
+	replaces the discovery specs of the categories they changed. When the top level sections that changed are received
+	as argument, only those are merged again into the resolved configurations, see LayeredConf.
+	"""
+
+	previous_generation = CONF_CACHE.generation(get_conf_file_path())
+
+	write_conf_file(get_conf_file_path(), user_conf)
+
+	CONF_CACHE.put(get_conf_file_path(), user_conf)
+	_conf_changed()
+
+	if sections is not None:
+		for profile, entry in LAYERED_CONFS.items():
+			if entry[0][0] != previous_generation:
+				continue
+
+			# Still checked on the next read, in case the other layers changed on disk
+			generation = _get_layers_generation(profile)
+			entry[:] = [generation, None, LayeredConf(generation, profile, _get_layers(profile), entry[2], sections)]
+
+	DISCOVERY_REGISTRY.sync()
+
+
+def reset_conf_to_default():
+	# Drop every user override, so the default configuration, under the studio profile the user chose if any, is back
+	# in effect
+	user_conf = get_user_conf()
+	profile = user_conf.get("profile")
+	def_overrides = OrderedDict([("profile", profile)] if profile else [])
+
+	if os.path.exists(get_conf_file_path()) and user_conf == def_overrides:
+		return True
+
+	_save_user_conf(def_overrides)
 
 	return True
 
 
+def _overrides(base, value):
+	"""
+	Returns what has to be merged on top of base for the value received as argument to be in effect, see _merge:
+	dictionaries are compared key by key, anything else, lists included, is overridden whole. The overrides share
+	their values with the value received as argument.
+
+	@return: The overrides, or UNCHANGED if base already is the value
+	"""
+
+	if isinstance(value, dict) and isinstance(base, dict):
+		overrides = OrderedDict()
+
+		for key, child in value.items():
+			child_overrides = _overrides(base[key], child) if key in base else child
+
+			if child_overrides is not UNCHANGED:
+				overrides[key] = child_overrides
+
+		return overrides if overrides else UNCHANGED
+
+	return UNCHANGED if value == base else value
+
+
 def save_conf(config):
-	mod_conf = get_conf()
+	"""
+	Saves the sections of the configuration received as argument as the user's overrides. Each section is compared
+	with what the default configuration and the studio profile resolve to, and only the values differing from them
+	are written, so the sections aren't frozen and later changes to the lower layers still show through. The file is
+	only written if some section's overrides actually changed.
 
-	for k in config.keys():
-		mod_conf[k] = config[k]
+	@return: True
+	@rtype: bool
+	"""
 
-	try:
-		conf_file = open(get_conf_file_path(), 'w')
-	except(RuntimeError, Exception):
-		raise
+	user_conf = get_user_conf()
 
-	try:
-		json.dump(mod_conf, conf_file, sort_keys=False, indent=2)
-	except(RuntimeError, Exception):
-		conf_file.close()
-		raise
+	# The profile the configuration names is the one it's going to be resolved with, unless one is forced
+	profile = get_active_profile() if ACTIVE_PROFILE is not None or "profile" not in config else config["profile"]
+	lower_conf = OrderedDict()
+
+	for _, layer_conf in _get_layers(profile)[:-1]:
+		_merge(lower_conf, layer_conf)
+
+	# The cached overrides are left untouched until the new ones are written
+	mod_conf = OrderedDict(user_conf)
+	changed_sections = []
 
-	# Force the configuration to reload
-	global CONF
+	for k in config.keys():
+		section_overrides = _overrides(lower_conf[k], config[k]) if k in lower_conf else config[k]
+
+		if section_overrides is UNCHANGED:
+			if k in mod_conf:
+				del mod_conf[k]
+				changed_sections.append(k)
+		elif k not in user_conf or user_conf[k] != section_overrides:
+			mod_conf[k] = _copy(section_overrides)
+			changed_sections.append(k)
+
+	if not changed_sections:
+		return True
 
-	CONF = None
-	conf_file.close()
+	_save_user_conf(mod_conf, changed_sections)
 
 	return True
 
 
 def reload_conf():
-	global CONF
-
-	CONF = None
+	invalidate_conf()
 
 	return get_conf()
 
 
 def reload_def_conf():
-	global DEF_CONF
-
-	DEF_CONF = None
+	invalidate_conf(get_def_conf_file_path())
 
 	return get_def_conf()
 
@@ -39,7 +39,7 @@ class ConfigController(QObject):
             return False
         else:
             self.configuration_reset[str].emit("Configuration reset to defaults")
-            self.configuration_reset[dict].emit(getconf.get_def_conf())
+            self.configuration_reset[dict].emit(getconf.get_conf())
             self.configuration_reset[None].emit()
 
             return True
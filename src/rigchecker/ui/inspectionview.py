@@ -3,9 +3,11 @@ from collections import namedtuple
 
 from PySide2.QtWidgets import QWidget, QScrollArea, QPushButton, QLabel, QGroupBox, QTreeWidget, QTreeWidgetItem
 from PySide2.QtWidgets import QSplitter, QMessageBox, QVBoxLayout, QHBoxLayout, QGridLayout, QFormLayout, QSizePolicy
-from PySide2.QtCore import Qt, Property, Slot, Signal, QObject
+from PySide2.QtWidgets import QProgressBar
+from PySide2.QtCore import Qt, Property, Slot, Signal, QObject, QTimer
 
 from .widgets import ResizeScrollAreaWidgetEventFilter, MayaToolBoxWidget, MayaGroupBox, BlockLabel, ClickableLabel
+from ..utils import inspectutils, scheduler
 
 
 NodeData = namedtuple("NodeData", ["name", "path"])
@@ -77,6 +79,183 @@ class InspectionController(QObject):
 		self.nodesIsolatede.emit()
 
 
+class ChecksController(QObject):
+	"""
+	Runs every check in slices of a few milliseconds, from a zero interval timer, which Qt fires whenever the event loop
+	is idle. The UI stays responsive while checks run, and receives their progress and partial results. The scene
+	passes the checks share (taking the snapshot, classifying it...) run in slices as well, before the first check.
+	"""
+
+	__run = None
+	__timer = None
+
+	# Signals
+	passProgressed = Signal(str, int, int)
+	checkProgressed = Signal(str, int, int, int)
+	checkFinished = Signal(str, object)
+
+	checksStarted = Signal()
+	checksFinished = Signal()
+	checksCancelled = Signal()
+
+	def __init__(self, *args, **kwargs):
+		super(ChecksController, self).__init__(*args, **kwargs)
+
+		self.__timer = QTimer(self)
+		self.__timer.setInterval(0)
+		self.__timer.timeout.connect(self.__runSlice)
+
+	def isRunning(self):
+		return self.__run is not None and self.__run.done is False
+
+	@Slot()
+	def runChecks(self):
+		self.cancelChecks()
+
+		self.__run = scheduler.SlicedRun(inspectutils.iter_all_checks())
+		self.__timer.start()
+
+		self.checksStarted.emit()
+
+	@Slot()
+	def cancelChecks(self):
+		if self.isRunning() is False:
+			return
+
+		self.__timer.stop()
+		self.__run.cancel()
+
+		self.checksCancelled.emit()
+
+	@Slot()
+	def __runSlice(self):
+		try:
+			steps = self.__run.run_slice()
+		except(RuntimeError, Exception):
+			self.__timer.stop()
+			self.__run.cancel()
+			self.checksCancelled.emit()
+
+			raise
+
+		for step in steps:
+			if isinstance(step, scheduler.PassStep):
+				self.passProgressed.emit(step.name, step.done, step.total)
+			elif step.finished is True:
+				self.checkFinished.emit(step.check, step.result)
+			else:
+				self.checkProgressed.emit(step.check, step.done, step.total, step.failed)
+
+		if self.__run.finished is True:
+			self.__timer.stop()
+			self.checksFinished.emit()
+
+	running = Property(bool, isRunning, None)
+
+
+class ChecksWidget(QWidget):
+	__controller = None
+
+	__checks_tree = None
+	__progress_bar = None
+	__run_button = None
+	__cancel_button = None
+
+	def __init__(self, *args, **kwargs):
+		super(ChecksWidget, self).__init__(*args, **kwargs)
+
+		self.setLayout(QVBoxLayout(self))
+		self.layout().setContentsMargins(5, 5, 5, 5)
+
+		self.__checks_tree = QTreeWidget(self)
+		self.__checks_tree.setHeaderLabels(["Check", "Result"])
+
+		for check in inspectutils.ALL_CHECKS:
+			self.__checks_tree.addTopLevelItem(QTreeWidgetItem(self.__checks_tree, [check.__name__, ""]))
+
+		self.__progress_bar = QProgressBar(self)
+		self.__progress_bar.setRange(0, len(inspectutils.ALL_CHECKS))
+		self.__progress_bar.setValue(0)
+
+		self.__run_button = QPushButton("Run checks", self)
+		self.__cancel_button = QPushButton("Cancel", self)
+		self.__cancel_button.setEnabled(False)
+
+		buttons_layout = QHBoxLayout()
+		buttons_layout.setContentsMargins(0, 0, 0, 0)
+		buttons_layout.addWidget(self.__progress_bar)
+		buttons_layout.addWidget(self.__run_button)
+		buttons_layout.addWidget(self.__cancel_button)
+
+		self.layout().addWidget(self.__checks_tree)
+		self.layout().addLayout(buttons_layout)
+
+		# Connect signals
+		self.__controller = ChecksController(self)
+
+		self.__run_button.clicked.connect(self.__controller.runChecks)
+		self.__cancel_button.clicked.connect(self.__controller.cancelChecks)
+
+		self.__controller.checksStarted.connect(self.clearResults)
+		self.__controller.passProgressed.connect(self.setPassProgress)
+		self.__controller.checkProgressed.connect(self.setCheckProgress)
+		self.__controller.checkFinished.connect(self.setCheckResult)
+		self.__controller.checksFinished.connect(self.__setIdle)
+		self.__controller.checksCancelled.connect(self.__setIdle)
+
+	def __checkItem(self, check_name):
+		try:
+			return self.__checks_tree.findItems(check_name, Qt.MatchExactly, 0)[0]
+		except IndexError:
+			item = QTreeWidgetItem(self.__checks_tree, [check_name, ""])
+			self.__checks_tree.addTopLevelItem(item)
+
+			return item
+
+	@Slot()
+	def clearResults(self):
+		for i in range(self.__checks_tree.topLevelItemCount()):
+			item = self.__checks_tree.topLevelItem(i)
+			item.setText(1, "")
+			item.takeChildren()
+
+		self.__progress_bar.setValue(0)
+		self.__progress_bar.resetFormat()
+		self.__run_button.setEnabled(False)
+		self.__cancel_button.setEnabled(True)
+
+	@Slot(str, int, int)
+	def setPassProgress(self, pass_name, done, total):
+		# Passes run before any check. Therefore, their progress is shown on the progress bar until the first result
+		if total:
+			self.__progress_bar.setFormat("%s %i/%i" % (pass_name, done, total))
+		else:
+			self.__progress_bar.setFormat("%s %i" % (pass_name, done))
+
+	@Slot(str, int, int, int)
+	def setCheckProgress(self, check_name, done, total, failed):
+		self.__checkItem(check_name).setText(1, "%i/%i, %i failed" % (done, total, failed))
+
+	@Slot(str, object)
+	def setCheckResult(self, check_name, result):
+		item = self.__checkItem(check_name)
+		item.takeChildren()
+
+		if type(result) is list:
+			item.setText(1, "Passed" if not result else "%i failed" % len(result))
+			item.addChildren([QTreeWidgetItem(item, [n]) for n in result])
+		else:
+			item.setText(1, "Passed" if result is True else "Failed")
+
+		self.__progress_bar.resetFormat()
+		self.__progress_bar.setValue(self.__progress_bar.value() + 1)
+
+	@Slot()
+	def __setIdle(self):
+		self.__run_button.setEnabled(True)
+		self.__cancel_button.setEnabled(False)
+
+
 class NodeEntryWidget(QWidget):
 	__node_data = None
 
@@ -330,6 +509,7 @@ class InspectionView(QWidget):
 
 	__finding_specs_tree = None
 	__dynamic_scroll_area_widget = None
+	__checks_widget = None
 
 	# Signals
 	loadSelectedSpecs = Signal([str], [None])
@@ -365,7 +545,10 @@ class InspectionView(QWidget):
 
 		self.__finding_specs_tree.currentItemChanged.connect(self.__loadNewSpecs)
 
+		self.__checks_widget = ChecksWidget(self)
+
 		self.layout().addWidget(main_split_widget)
+		self.layout().addWidget(self.__checks_widget)
 
 		# Connect signals
 		self.__controller = InspectionController(self)
@@ -0,0 +1,1067 @@
+import fnmatch
+import re
+
+from array import array
+from collections import OrderedDict
+
+from . import scheduler
+
+try:
+	import maya.api.OpenMaya as om
+	import maya.cmds as cmds
+except ImportError:
+	# Outside of Maya only the in-memory backend is available
+	om = None
+	cmds = None
+
+maya_useNewAPI = True
+
+BACKEND = None
+
+# Values returned for the attributes a node of the in-memory backend was never given
+DEFAULT_ATTRIBUTE_VALUES = {
+	"translateX": 0.0, "translateY": 0.0, "translateZ": 0.0,
+	"rotateX": 0.0, "rotateY": 0.0, "rotateZ": 0.0,
+	"scaleX": 1.0, "scaleY": 1.0, "scaleZ": 1.0,
+	"visibility": True, "lodVisibility": True, "intermediateObject": False,
+	"overrideEnabled": False, "overrideVisibility": True
+}
+
+# Type inheritance used by the in-memory backend to answer derived type queries, mirroring Maya's for the node types
+# rigchecker deals with
+DEFAULT_TYPE_HIERARCHY = {
+	"dagNode": ["transform", "shape"],
+	"transform": ["joint", "ikHandle", "constraint"],
+	"shape": ["geometryShape", "locator"],
+	"geometryShape": ["deformableShape", "surfaceShape", "controlPoint"],
+	"controlPoint": ["deformableShape"],
+	"deformableShape": ["curveShape", "surfaceShape"],
+	"curveShape": ["nurbsCurve"],
+	"surfaceShape": ["mesh", "nurbsSurface"],
+	"constraint": [
+		"parentConstraint", "pointConstraint", "orientConstraint", "scaleConstraint", "aimConstraint",
+		"poleVectorConstraint"
+	],
+	"geometryFilter": ["weightGeometryFilter", "skinCluster"],
+	"weightGeometryFilter": ["blendShape", "cluster"],
+	"animCurve": ["animCurveTL", "animCurveTA", "animCurveTU", "animCurveTT"]
+}
+
+# Attributes geometry flows out of: deformers' output, and the meshes' and curves' own. See SceneBackend.downstream
+GEOMETRY_OUTPUT_ATTRIBUTES = ("outputGeometry", "outMesh", "worldMesh", "local", "worldSpace")
+
+
+class AmbiguousNameError(ValueError):
+	"""
+	Raised when a short name or a partial path matches more than one node.
+	"""
+
+
+class SceneBackend(object):
+	"""
+	Protocol every scene backend implements: listing, typing, hierarchy, attributes and connections. Discovery and
+	checks only talk to the scene through it, so they run the same on a Maya scene and on any stand in for one.
+
+	Nodes are addressed by their long names. Backends may also hand out their own node references (MObjects for
+	Maya), which resolve and name_of convert to and from long names.
+	"""
+
+	def __init__(self):
+		self.__derived_types = {}
+
+	# ##############################
+	# Listing
+	# ##############################
+
+	def list_nodes(self):
+		"""
+		Returns the long name and the type of every node in the scene, fetched in one sweep.
+
+		@return: ([str,...], [str,...])
+		@rtype: tuple
+		"""
+
+		raise NotImplementedError
+
+	def iter_list_nodes(self, chunk_size=None):
+		"""
+		Resumable counterpart of list_nodes, for backends able to list the scene in steps: a generator for the long
+		names and types of up to chunk_size nodes at a time. The whole scene is listed in a single step by default.
+
+		@return: (([str,...], [str,...]),...)
+		@rtype: generator
+		"""
+
+		yield self.list_nodes()
+
+	def list_intermediates(self):
+		raise NotImplementedError
+
+	def ls(self, patterns=None, types=None, no_intermediate=False):
+		"""
+		Returns the long names of the nodes whose short name matches any of the wildcard patterns received as argument
+		and whose type is, or derives from, any of the types received as argument.
+
+		@rtype: list
+		"""
+
+		raise NotImplementedError
+
+	def resolve(self, names):
+		"""
+		Returns the backend's references to the nodes received as argument.
+
+		@rtype: list
+		"""
+
+		return list(names)
+
+	def name_of(self, node):
+		"""
+		Returns the long name of the node reference, or node name, received as argument.
+
+		@rtype: str
+		"""
+
+		return node
+
+	def names_of(self, nodes):
+		"""
+		Returns the long names of all the node references, or node names, received as argument, resolved in bulk.
+
+		@rtype: list
+		"""
+
+		return [self.name_of(n) for n in nodes]
+
+	# ##############################
+	# Typing
+	# ##############################
+
+	def node_type(self, name):
+		raise NotImplementedError
+
+	def derived_types(self, node_type):
+		"""
+		Returns every type deriving from the type received as argument, the type itself included.
+
+		@rtype: list
+		"""
+
+		raise NotImplementedError
+
+	def expand_types(self, types):
+		"""
+		Returns the types received as argument along with every type derived from them, the same way ls(type=...)
+		matches nodes. Each type's derived types are queried once and cached for the backend's lifetime.
+
+		@return: frozenset(str,...)
+		@rtype: frozenset
+		"""
+
+		if not isinstance(types, (list, tuple, set, frozenset)):
+			types = [types]
+
+		expanded = set()
+
+		for t in types:
+			try:
+				expanded.update(self.__derived_types[t])
+			except KeyError:
+				try:
+					derived = self.derived_types(t) or []
+				except(RuntimeError, Exception):
+					# Not a registered type name. Therefore, it can only match itself
+					derived = []
+
+				self.__derived_types[t] = frozenset(derived) | frozenset([t])
+				expanded.update(self.__derived_types[t])
+
+		return frozenset(expanded)
+
+	def is_type(self, name, types):
+		return self.node_type(name) in self.expand_types(types)
+
+	# ##############################
+	# Hierarchy
+	# ##############################
+
+	def parent(self, name):
+		"""
+		Returns the long name of the parent of the node received as argument, or None for world children.
+
+		@rtype: str
+		"""
+
+		raise NotImplementedError
+
+	def children(self, name):
+		raise NotImplementedError
+
+	def shapes(self, name):
+		return [c for c in self.children(name) if self.is_type(c, "shape")]
+
+	def root(self, name):
+		parent = self.parent(name)
+
+		while parent is not None:
+			name = parent
+			parent = self.parent(name)
+
+		return name
+
+	def is_visible(self, name):
+		"""
+		Tells whether the node received as argument is visible, taking its ancestors' visibility into account.
+
+		@rtype: bool
+		"""
+
+		while name is not None:
+			try:
+				assert self.get_attr(name, "visibility") and self.get_attr(name, "lodVisibility")
+				assert not self.get_attr(name, "intermediateObject")
+				assert not self.get_attr(name, "overrideEnabled") or self.get_attr(name, "overrideVisibility")
+			except AssertionError:
+				return False
+			except(ValueError, RuntimeError):
+				# Non DAG nodes don't have visibility attributes
+				pass
+
+			name = self.parent(name)
+
+		return True
+
+	# ##############################
+	# Attributes
+	# ##############################
+
+	def get_attr(self, name, attribute):
+		raise NotImplementedError
+
+	def is_locked(self, name, attribute):
+		raise NotImplementedError
+
+	def get_attrs(self, names, attributes):
+		"""
+		Returns the values of the attributes received as argument for every node received as argument, with a row per
+		node and a column per attribute.
+
+		@rtype: list
+		"""
+
+		return [[self.get_attr(n, a) for a in attributes] for n in names]
+
+	def get_channels(self, names, attributes):
+		"""
+		Returns the values and lock states of the attributes received as argument for every node received as argument,
+		as two lists with a row per node and a column per attribute.
+
+		@rtype: tuple
+		"""
+
+		return self.get_attrs(names, attributes), self.get_locks(names, attributes)
+
+	def get_locks(self, names, attributes):
+		"""
+		Returns the lock states of the attributes received as argument for every node received as argument, with a row
+		per node and a column per attribute.
+
+		@rtype: list
+		"""
+
+		return [[self.is_locked(n, a) for a in attributes] for n in names]
+
+	# ##############################
+	# Connections
+	# ##############################
+
+	def connections(self, name, attribute=None, source=True, destination=True):
+		"""
+		Returns the long names of the nodes connected to the node, or the node's attribute, received as argument.
+
+		@rtype: list
+		"""
+
+		raise NotImplementedError
+
+	def bulk_connections(self, names, source=True, destination=True):
+		"""
+		Returns the connections of all the nodes received as argument, queried in bulk, as (plug, connected node) pairs.
+		The plug is the connected attribute of one of the nodes, the connected node the long name of the node at the
+		other end.
+
+		@return: [(str, str),...]
+		@rtype: list
+		"""
+
+		return [(n, c) for n in names for c in self.connections(n, source=source, destination=destination)]
+
+	def has_upstream(self, name, attribute, types):
+		"""
+		Tells whether a node of any of the types received as argument feeds, directly or not, the attribute received
+		as argument.
+
+		@rtype: bool
+		"""
+
+		types = self.expand_types(types)
+		visited = set()
+		pending = self.connections(name, attribute, source=True, destination=False)
+
+		while pending:
+			node = pending.pop()
+
+			if node in visited:
+				continue
+
+			if self.node_type(node) in types:
+				return True
+
+			visited.add(node)
+			pending.extend(self.connections(node, source=True, destination=False))
+
+		return False
+
+	def downstream(self, names, types=None, visited=None, geometry=False):
+		"""
+		Returns the long names of every node fed, directly or not, by any of the nodes received as argument, walking
+		the graph once from all of them. When types is given, only the nodes of those types are returned.
+
+		@param visited: Nodes walked already, updated by the call. Sharing it between calls walks the graph in steps
+			without walking any node twice, each call returning only the nodes it found.
+		@param geometry: When True, only the connections geometry flows through are walked, see
+			GEOMETRY_OUTPUT_ATTRIBUTES, and the walk stops at the nodes of the types received as argument. Geometry
+			only driven by one of them (a blend shape or wrap target...) isn't returned.
+		@rtype: set
+		"""
+
+		types = None if types is None else self.expand_types(types)
+		visited = set() if visited is None else visited
+		found = set()
+		pending = list(names)
+
+		while pending:
+			node = pending.pop()
+
+			if geometry is True:
+				connected = [
+					n for a in GEOMETRY_OUTPUT_ATTRIBUTES for n in self.connections(node, a, source=False, destination=True)
+				]
+			else:
+				connected = self.connections(node, source=False, destination=True)
+
+			for n in connected:
+				if n in visited:
+					continue
+
+				visited.add(n)
+				found.add(n)
+
+				if geometry is False or types is None or self.node_type(n) not in types:
+					pending.append(n)
+
+		if types is None:
+			return found
+
+		return set(n for n in found if self.node_type(n) in types)
+
+
+class EnumValue(int):
+	"""
+	Value of an enum attribute: its index, which also knows the name of its field.
+	"""
+
+	def __new__(cls, index, field_name=None):
+		value = super(EnumValue, cls).__new__(cls, index)
+		value.field_name = field_name
+
+		return value
+
+
+def _plug_value(plug):
+	"""
+	Returns the value of the plug received as argument read by its attribute's type: strings as strings, enums as
+	EnumValue, anything else as a number.
+	"""
+
+	attribute = plug.attribute()
+
+	if attribute.hasFn(om.MFn.kEnumAttribute):
+		index = plug.asShort()
+
+		return EnumValue(index, om.MFnEnumAttribute(attribute).fieldName(index))
+	elif attribute.hasFn(om.MFn.kTypedAttribute) and om.MFnTypedAttribute(attribute).attrType() == om.MFnData.kString:
+		return plug.asString()
+
+	return plug.asDouble()
+
+
+class MayaBackend(SceneBackend):
+	"""
+	Backend for the scene open in the current Maya session.
+	"""
+
+	def __init__(self, list_method="ls"):
+		"""
+		@param list_method: "ls" lists the scene with a single ls(showType=True) query. "api" walks the dependency
+			graph with an MItDependencyNodes iterator instead, which avoids building the flat string list on very large
+			scenes.
+		"""
+
+		super(MayaBackend, self).__init__()
+
+		self.list_method = list_method
+
+	def list_nodes(self):
+		if self.list_method == "ls":
+			names_and_types = cmds.ls(long=True, showType=True) or []
+
+			return names_and_types[0::2], names_and_types[1::2]
+		elif self.list_method == "api":
+			names = []
+			types = []
+
+			for chunk_names, chunk_types in self.iter_list_nodes():
+				names.extend(chunk_names)
+				types.extend(chunk_types)
+
+			return names, types
+		else:
+			raise ValueError("Unsupported list method %s." % self.list_method)
+
+	def iter_list_nodes(self, chunk_size=None):
+		if self.list_method != "api":
+			# A single ls query can't be split
+			yield self.list_nodes()
+			return
+
+		names = []
+		types = []
+
+		dep_fn = om.MFnDependencyNode()
+		dag_fn = om.MFnDagNode()
+		nodes_it = om.MItDependencyNodes()
+
+		while not nodes_it.isDone():
+			node = nodes_it.thisNode()
+
+			if node.hasFn(om.MFn.kDagNode):
+				dag_fn.setObject(node)
+				names.append(dag_fn.fullPathName())
+				types.append(dag_fn.typeName)
+			else:
+				dep_fn.setObject(node)
+				names.append(dep_fn.name())
+				types.append(dep_fn.typeName)
+
+			nodes_it.next()
+
+			if len(names) == chunk_size:
+				yield names, types
+
+				names = []
+				types = []
+
+		if names:
+			yield names, types
+
+	def list_intermediates(self):
+		return cmds.ls(long=True, intermediateObjects=True) or []
+
+	def ls(self, patterns=None, types=None, no_intermediate=False):
+		kwargs = {"long": True}
+
+		if types:
+			kwargs["type"] = list(types)
+
+		if no_intermediate is True:
+			kwargs["noIntermediate"] = True
+
+		if patterns:
+			return cmds.ls(list(patterns), recursive=True, **kwargs) or []
+
+		return cmds.ls(**kwargs) or []
+
+	def resolve(self, names):
+		# A selection list merges duplicates. Therefore, each name is added once, and its node looked up by name, so the
+		# references stay aligned with the names received
+		names = list(names)
+		unique_names = list(OrderedDict.fromkeys(names))
+
+		if not unique_names:
+			return []
+
+		nodes_sel_list = om.MSelectionList()
+
+		for n in unique_names:
+			nodes_sel_list.add(n)
+
+		if nodes_sel_list.length() == len(unique_names):
+			nodes = dict((n, nodes_sel_list.getDependNode(k)) for k, n in enumerate(unique_names))
+		else:
+			# Some names are different paths to the same node, or match several nodes. Therefore, resolve them one by one
+			nodes = {}
+
+			for n in unique_names:
+				node_sel_list = om.MSelectionList()
+				node_sel_list.add(n)
+
+				try:
+					assert node_sel_list.length() == 1
+				except AssertionError:
+					raise ValueError("%s doesn't match a single node." % n)
+
+				nodes[n] = node_sel_list.getDependNode(0)
+
+		return [nodes[n] for n in names]
+
+	def name_of(self, node):
+		if isinstance(node, om.MObject):
+			if node.hasFn(om.MFn.kDagNode):
+				return om.MFnDagNode(node).fullPathName()
+
+			return om.MFnDependencyNode(node).name()
+
+		return (cmds.ls(node, long=True) or [node])[0]
+
+	def names_of(self, nodes):
+		# Names are resolved through a single selection list, and the same function sets are reused for every node
+		dag_fn = om.MFnDagNode()
+		dep_fn = om.MFnDependencyNode()
+
+		def object_name(node):
+			if node.hasFn(om.MFn.kDagNode):
+				dag_fn.setObject(node)
+				return dag_fn.fullPathName()
+
+			dep_fn.setObject(node)
+			return dep_fn.name()
+
+		unique_names = list(OrderedDict.fromkeys(n for n in nodes if not isinstance(n, om.MObject)))
+		long_names = {}
+
+		if unique_names:
+			nodes_sel_list = om.MSelectionList()
+
+			for n in unique_names:
+				nodes_sel_list.add(n)
+
+			try:
+				assert nodes_sel_list.length() == len(unique_names)
+			except AssertionError:
+				raise ValueError("Some of the names received as argument don't match a single node.")
+
+			for k, n in enumerate(unique_names):
+				long_names[n] = object_name(nodes_sel_list.getDependNode(k))
+
+		return [object_name(n) if isinstance(n, om.MObject) else long_names[n] for n in nodes]
+
+	def node_type(self, name):
+		return cmds.nodeType(name)
+
+	def derived_types(self, node_type):
+		return cmds.nodeType(node_type, isTypeName=True, derived=True)
+
+	def parent(self, name):
+		return (cmds.listRelatives(name, parent=True, fullPath=True) or [None])[0]
+
+	def children(self, name):
+		return cmds.listRelatives(name, children=True, fullPath=True) or []
+
+	def shapes(self, name):
+		return cmds.listRelatives(name, shapes=True, fullPath=True) or []
+
+	def is_visible(self, name):
+		nodes_sel_list = om.MSelectionList()
+		nodes_sel_list.add(name)
+
+		return nodes_sel_list.getDagPath(0).isVisible()
+
+	def get_attr(self, name, attribute):
+		return cmds.getAttr("{}.{}".format(name, attribute))
+
+	def is_locked(self, name, attribute):
+		return cmds.getAttr("{}.{}".format(name, attribute), lock=True)
+
+	def get_attrs(self, names, attributes):
+		values = []
+
+		dep_fn = om.MFnDependencyNode()
+
+		for node in self.resolve(names):
+			dep_fn.setObject(node)
+			values.append([_plug_value(dep_fn.findPlug(a, False)) for a in attributes])
+
+		return values
+
+	def get_locks(self, names, attributes):
+		locks = []
+
+		dep_fn = om.MFnDependencyNode()
+
+		for node in self.resolve(names):
+			dep_fn.setObject(node)
+			locks.append([dep_fn.findPlug(a, False).isLocked for a in attributes])
+
+		return locks
+
+	def get_channels(self, names, attributes):
+		# Plugs are read through the API, no getAttr query is made per node or per attribute
+		values = []
+		locks = []
+
+		dep_fn = om.MFnDependencyNode()
+
+		for node in self.resolve(names):
+			dep_fn.setObject(node)
+			plugs = [dep_fn.findPlug(a, False) for a in attributes]
+
+			values.append([p.asDouble() for p in plugs])
+			locks.append([p.isLocked for p in plugs])
+
+		return values, locks
+
+	def connections(self, name, attribute=None, source=True, destination=True):
+		plug = name if attribute is None else "{}.{}".format(name, attribute)
+
+		return cmds.listConnections(
+			plug, source=source, destination=destination, fullNodeName=True, skipConversionNodes=False
+		) or []
+
+	def bulk_connections(self, names, source=True, destination=True):
+		if not names:
+			# listConnections would list the selection's connections instead
+			return []
+
+		plugs_and_nodes = cmds.listConnections(
+			list(names), source=source, destination=destination, connections=True, fullNodeName=True,
+			skipConversionNodes=False
+		) or []
+
+		return list(zip(plugs_and_nodes[0::2], plugs_and_nodes[1::2]))
+
+	def has_upstream(self, name, attribute, types):
+		if types != "skinCluster" and types != ["skinCluster"]:
+			return super(MayaBackend, self).has_upstream(name, attribute, types)
+
+		nodes_sel_list = om.MSelectionList()
+		nodes_sel_list.add("{}.{}".format(name, attribute))
+
+		shape_dep_graph_it = om.MItDependencyGraph(
+			nodes_sel_list.getPlug(0), om.MFn.kSkinClusterFilter,
+			om.MItDependencyGraph.kUpstream, om.MItDependencyGraph.kDepthFirst
+		)
+
+		try:
+			shape_dep_graph_it.currentNode()
+		except(RuntimeError, Exception):
+			return False
+		else:
+			return True
+
+	def downstream(self, names, types=None, visited=None, geometry=False):
+		if geometry is False:
+			return super(MayaBackend, self).downstream(names, types, visited)
+
+		types = None if types is None else self.expand_types(types)
+		visited = set() if visited is None else visited
+		found = set()
+
+		# Nodes are told apart by their long names: handle hash codes aren't unique
+		dep_fn = om.MFnDependencyNode()
+		destination_dag_fn = om.MFnDagNode()
+		destination_dep_fn = om.MFnDependencyNode()
+		pending = self.resolve(names)
+
+		while pending:
+			dep_fn.setObject(pending.pop())
+
+			for attribute in GEOMETRY_OUTPUT_ATTRIBUTES:
+				if not dep_fn.hasAttribute(attribute):
+					continue
+
+				plug = dep_fn.findPlug(attribute, False)
+				plugs = [plug.elementByPhysicalIndex(k) for k in range(plug.numElements())] if plug.isArray else [plug]
+
+				for destination in (d for p in plugs for d in p.destinations()):
+					node = destination.node()
+
+					if node.hasFn(om.MFn.kDagNode):
+						destination_dag_fn.setObject(node)
+						name, node_type = destination_dag_fn.fullPathName(), destination_dag_fn.typeName
+					else:
+						destination_dep_fn.setObject(node)
+						name, node_type = destination_dep_fn.name(), destination_dep_fn.typeName
+
+					if name in visited:
+						continue
+
+					visited.add(name)
+
+					if types is None or node_type not in types:
+						pending.append(node)
+
+					if types is None or node_type in types:
+						found.add(name)
+
+		return found
+
+
+class MemoryBackend(SceneBackend):
+	"""
+	Pure Python scene held in memory, with no dependency on Maya. Node data is stored in flat lists addressed by
+	index, and only the attributes, locks and connections actually set are stored, so a synthetic rig of a million
+	nodes fits comfortably.
+	"""
+
+	def __init__(self, type_hierarchy=None):
+		super(MemoryBackend, self).__init__()
+
+		self.names = []
+		self.types = []
+		self.parents = array("i")
+
+		self.__type_hierarchy = DEFAULT_TYPE_HIERARCHY if type_hierarchy is None else type_hierarchy
+		self.__index = {}
+		self.__short_index = None
+		self.__children = {}
+		self.__intermediates = set()
+		self.__attributes = {}
+		self.__locks = set()
+		self.__inputs = {}
+		self.__outputs = {}
+
+	def __len__(self):
+		return len(self.names)
+
+	def __node_index(self, name):
+		try:
+			return self.__index[name]
+		except KeyError:
+			pass
+
+		# Short names and partial paths are resolved the same way Maya does: they have to match a single node, by the
+		# end of its long name
+		if self.__short_index is None:
+			self.__short_index = {}
+
+			for i, n in enumerate(self.names):
+				self.__short_index.setdefault(n.rpartition("|")[2], []).append(i)
+
+		if name.startswith("|"):
+			# Long names are only looked up as they are
+			indices = ()
+		else:
+			indices = self.__short_index.get(name.rpartition("|")[2], ())
+
+			if "|" in name:
+				indices = [i for i in indices if self.names[i].endswith("|" + name)]
+
+		try:
+			assert len(indices) == 1
+		except AssertionError:
+			if indices:
+				raise AmbiguousNameError("More than one object matches name: %s" % name)
+
+			raise ValueError("No object matches name: %s" % name)
+
+		return indices[0]
+
+	# ##############################
+	# Building
+	# ##############################
+
+	def create_node(self, name, node_type, parent=None, intermediate=False):
+		"""
+		Adds a node to the scene.
+
+		@return: The new node's long name
+		@rtype: str
+		"""
+
+		if parent is None:
+			long_name = "|" + name if self.__is_dag_type(node_type) else name
+			parent_index = -1
+		else:
+			parent_index = self.__node_index(parent)
+			long_name = self.names[parent_index] + "|" + name
+
+		try:
+			assert long_name not in self.__index
+		except AssertionError:
+			raise ValueError("A node named %s already exists." % long_name)
+
+		index = len(self.names)
+
+		self.names.append(long_name)
+		self.types.append(node_type)
+		self.parents.append(parent_index)
+		self.__index[long_name] = index
+
+		if self.__short_index is not None:
+			self.__short_index.setdefault(name, []).append(index)
+
+		if parent_index != -1:
+			self.__children.setdefault(parent_index, []).append(index)
+
+		if intermediate is True:
+			self.__intermediates.add(index)
+
+		return long_name
+
+	def reparent(self, name, parent=None):
+		"""
+		Moves the node received as argument, along with all of its descendants, under a new parent, or under the world
+		when parent is None.
+
+		@return: The node's new long name
+		@rtype: str
+		"""
+
+		index = self.__node_index(name)
+		parent_index = -1 if parent is None else self.__node_index(parent)
+
+		previous_parent_index = self.parents[index]
+
+		if previous_parent_index != -1:
+			self.__children[previous_parent_index].remove(index)
+
+		if parent_index != -1:
+			self.__children.setdefault(parent_index, []).append(index)
+
+		self.parents[index] = parent_index
+
+		# Long names change for the whole branch
+		pending = [index]
+
+		while pending:
+			i = pending.pop()
+			short_name = self.names[i].rpartition("|")[2]
+
+			if self.parents[i] == -1:
+				long_name = "|" + short_name
+			else:
+				long_name = self.names[self.parents[i]] + "|" + short_name
+
+			del self.__index[self.names[i]]
+			self.__index[long_name] = i
+			self.names[i] = long_name
+
+			pending.extend(self.__children.get(i, ()))
+
+		return self.names[index]
+
+	def __is_dag_type(self, node_type):
+		return node_type in self.expand_types("dagNode")
+
+	def set_attr(self, name, attribute, value, lock=None):
+		index = self.__node_index(name)
+
+		if attribute == "intermediateObject":
+			if value:
+				self.__intermediates.add(index)
+			else:
+				self.__intermediates.discard(index)
+		else:
+			self.__attributes[(index, attribute)] = value
+
+		if lock is True:
+			self.__locks.add((index, attribute))
+		elif lock is False:
+			self.__locks.discard((index, attribute))
+
+	def set_lock(self, name, attribute, locked=True):
+		if locked is True:
+			self.__locks.add((self.__node_index(name), attribute))
+		else:
+			self.__locks.discard((self.__node_index(name), attribute))
+
+	def connect_attr(self, source_plug, destination_plug):
+		source_name, _, source_attribute = source_plug.rpartition(".")
+		destination_name, _, destination_attribute = destination_plug.rpartition(".")
+
+		source_index = self.__node_index(source_name)
+		destination_index = self.__node_index(destination_name)
+
+		self.__outputs.setdefault(source_index, []).append((source_attribute, destination_index))
+		self.__inputs.setdefault(destination_index, []).append((destination_attribute, source_index))
+
+	# ##############################
+	# Listing
+	# ##############################
+
+	def list_nodes(self):
+		return list(self.names), list(self.types)
+
+	def iter_list_nodes(self, chunk_size=None):
+		for start, stop in scheduler.chunks(len(self.names), chunk_size):
+			yield self.names[start:stop], self.types[start:stop]
+
+	def list_intermediates(self):
+		return [self.names[i] for i in sorted(self.__intermediates)]
+
+	def ls(self, patterns=None, types=None, no_intermediate=False):
+		indices = range(len(self.names))
+
+		if types:
+			types = self.expand_types(types)
+			indices = [i for i in indices if self.types[i] in types]
+
+		if no_intermediate is True:
+			indices = [i for i in indices if i not in self.__intermediates]
+
+		if patterns:
+			# Wildcards are matched against the short name, with or without its namespace, as ls(recursive=True) does
+			patterns_regex = re.compile("|".join("(?:%s)" % fnmatch.translate(p) for p in patterns))
+			names = self.names
+			indices = [
+				i for i in indices
+				if patterns_regex.match(names[i].rpartition("|")[2]) or
+				patterns_regex.match(names[i].rpartition("|")[2].rpartition(":")[2])
+			]
+
+		return [self.names[i] for i in indices]
+
+	def name_of(self, node):
+		return self.names[self.__node_index(node)]
+
+	# ##############################
+	# Typing
+	# ##############################
+
+	def node_type(self, name):
+		return self.types[self.__node_index(name)]
+
+	def derived_types(self, node_type):
+		derived = [node_type]
+		pending = [node_type]
+
+		while pending:
+			for t in self.__type_hierarchy.get(pending.pop(), ()):
+				derived.append(t)
+				pending.append(t)
+
+		return derived
+
+	# ##############################
+	# Hierarchy
+	# ##############################
+
+	def parent(self, name):
+		parent_index = self.parents[self.__node_index(name)]
+
+		return None if parent_index == -1 else self.names[parent_index]
+
+	def children(self, name):
+		return [self.names[i] for i in self.__children.get(self.__node_index(name), ())]
+
+	# ##############################
+	# Attributes
+	# ##############################
+
+	def get_attr(self, name, attribute):
+		index = self.__node_index(name)
+
+		if attribute == "intermediateObject":
+			return index in self.__intermediates
+
+		try:
+			return self.__attributes[(index, attribute)]
+		except KeyError:
+			pass
+
+		try:
+			assert self.__is_dag_type(self.types[index]) or attribute not in DEFAULT_ATTRIBUTE_VALUES
+			return DEFAULT_ATTRIBUTE_VALUES[attribute]
+		except(AssertionError, KeyError):
+			raise ValueError("No object matches name: %s.%s" % (name, attribute))
+
+	def is_locked(self, name, attribute):
+		return (self.__node_index(name), attribute) in self.__locks
+
+	def get_attrs(self, names, attributes):
+		attribute_values = self.__attributes
+		defaults = [DEFAULT_ATTRIBUTE_VALUES.get(a) for a in attributes]
+
+		return [
+			[attribute_values.get((i, a), d) for a, d in zip(attributes, defaults)]
+			for i in (self.__node_index(n) for n in names)
+		]
+
+	def get_locks(self, names, attributes):
+		locks = self.__locks
+
+		return [[(i, a) in locks for a in attributes] for i in (self.__node_index(n) for n in names)]
+
+	def get_channels(self, names, attributes):
+		attribute_values = self.__attributes
+		locks = self.__locks
+		indices = [self.__node_index(n) for n in names]
+		defaults = [DEFAULT_ATTRIBUTE_VALUES.get(a) for a in attributes]
+
+		return (
+			[[attribute_values.get((i, a), d) for a, d in zip(attributes, defaults)] for i in indices],
+			[[(i, a) in locks for a in attributes] for i in indices]
+		)
+
+	# ##############################
+	# Connections
+	# ##############################
+
+	def connections(self, name, attribute=None, source=True, destination=True):
+		index = self.__node_index(name)
+		connected = []
+
+		if source is True:
+			connected.extend(i for a, i in self.__inputs.get(index, ()) if self.__is_plug_of(a, attribute))
+
+		if destination is True:
+			connected.extend(i for a, i in self.__outputs.get(index, ()) if self.__is_plug_of(a, attribute))
+
+		return [self.names[i] for i in connected]
+
+	@staticmethod
+	def __is_plug_of(plug, attribute):
+		# An array attribute matches the connections of all of its elements, as it does in Maya
+		return attribute is None or plug == attribute or plug.startswith(attribute + "[")
+
+	def bulk_connections(self, names, source=True, destination=True):
+		connected = []
+
+		for name in names:
+			index = self.__node_index(name)
+
+			if source is True:
+				connected.extend(("%s.%s" % (name, a), self.names[i]) for a, i in self.__inputs.get(index, ()))
+
+			if destination is True:
+				connected.extend(("%s.%s" % (name, a), self.names[i]) for a, i in self.__outputs.get(index, ()))
+
+		return connected
+
+
+def get_backend():
+	"""
+	Returns the backend discovery and checks currently talk to. Unless another one was set, that's the Maya backend.
+
+	@return: SceneBackend
+	@rtype: SceneBackend
+	"""
+
+	global BACKEND
+
+	if BACKEND is None:
+		BACKEND = MayaBackend()
+
+	return BACKEND
+
+
+def set_backend(backend):
+	"""
+	Makes discovery and checks talk to the backend received as argument. Passing None restores the Maya backend.
+	"""
+
+	global BACKEND
+
+	BACKEND = backend
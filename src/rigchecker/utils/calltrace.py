@@ -0,0 +1,307 @@
+import math
+import os
+import sys
+
+from collections import Counter, OrderedDict
+
+from . import backend
+from . import profiling
+
+maya_useNewAPI = True
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# OpenMaya entry points traced, besides every maya.cmds command. Only classes nothing checks instances against can be
+# traced, since tracing replaces them with a proxy
+TRACED_OPENMAYA = (
+	"MSelectionList", "MFnDagNode", "MFnDependencyNode", "MItDependencyGraph", "MItDependencyNodes", "MObjectHandle"
+)
+
+# Backend methods traced: those issuing Maya API calls, see profiling.BACKEND_API_CALLS
+TRACED_BACKEND_METHODS = frozenset(profiling.BACKEND_API_CALLS)
+
+# Smallest growth exponent of a call site's count with scene size flagged as a per node pattern. Calls issued once per
+# node have an exponent close to 1, bulk calls one close to 0
+DEFAULT_GROWTH_THRESHOLD = 0.8
+
+# Call sites issuing fewer calls than this on the largest scene are never flagged
+DEFAULT_MIN_CALLS = 10
+
+
+def _call_site():
+	"""
+	Returns the file, line and function of the first frame up the stack outside of this module, with the file relative
+	to the package.
+
+	@rtype: str
+	"""
+
+	frame = sys._getframe(2)
+
+	while frame is not None and frame.f_globals.get("__name__") == __name__:
+		frame = frame.f_back
+
+	if frame is None:
+		return "<unknown>"
+
+	file_path = os.path.abspath(frame.f_code.co_filename)
+
+	if file_path.startswith(PACKAGE_DIR):
+		file_path = os.path.relpath(file_path, PACKAGE_DIR)
+
+	return "%s:%i (%s)" % (file_path, frame.f_lineno, frame.f_code.co_name)
+
+
+class TracedCallable(object):
+	"""
+	Proxy recording every call to the callable it wraps. Attributes are forwarded, so a traced class still exposes its
+	constants and static methods.
+	"""
+
+	def __init__(self, wrapped, api, tracer):
+		self.wrapped = wrapped
+		self.api = api
+		self.tracer = tracer
+
+	def __call__(self, *args, **kwargs):
+		self.tracer.record(self.api)
+
+		return self.wrapped(*args, **kwargs)
+
+	def __getattr__(self, attribute_name):
+		return getattr(self.wrapped, attribute_name)
+
+
+class TracedNamespace(object):
+	"""
+	Proxy over a module or an object whose callables, or only those named in traced_names, are traced under the
+	prefix received as argument.
+	"""
+
+	def __init__(self, wrapped, prefix, tracer, traced_names=None):
+		self.wrapped = wrapped
+		self.prefix = prefix
+		self.tracer = tracer
+		self.traced_names = traced_names
+
+		self.__callables = {}
+
+	def __getattr__(self, attribute_name):
+		value = getattr(self.wrapped, attribute_name)
+
+		if not callable(value) or (self.traced_names is not None and attribute_name not in self.traced_names):
+			return value
+
+		try:
+			return self.__callables[attribute_name]
+		except KeyError:
+			traced = self.__callables[attribute_name] = TracedCallable(
+				value, "%s.%s" % (self.prefix, attribute_name), self.tracer
+			)
+
+			return traced
+
+
+class CallTracer(object):
+	"""
+	Counts the calls issued during a run to maya.cmds, to the main OpenMaya entry points and to the scene backend,
+	grouped by call site: the line of rigchecker's code issuing each call. Backend calls are attributed to the code
+	calling the backend, and Maya calls to the backend's lines issuing them.
+
+	The tracer is installed for the duration of a with block:
+
+		with CallTracer() as tracer:
+			inspectutils.run_all_checks()
+
+		print(tracer.report())
+	"""
+
+	def __init__(self):
+		self.calls = Counter()
+
+		self.__installed = None
+
+	def record(self, api):
+		self.calls[(api, _call_site())] += 1
+
+	def install(self):
+		if self.__installed is not None:
+			return
+
+		self.__installed = (backend.cmds, backend.om, backend.get_backend())
+
+		if backend.cmds is not None:
+			backend.cmds = TracedNamespace(backend.cmds, "cmds", self)
+
+		if backend.om is not None:
+			backend.om = TracedNamespace(backend.om, "om", self, TRACED_OPENMAYA)
+
+		backend.set_backend(TracedNamespace(backend.get_backend(), "backend", self, TRACED_BACKEND_METHODS))
+
+	def uninstall(self):
+		if self.__installed is None:
+			return
+
+		backend.cmds, backend.om, scene_backend = self.__installed
+		backend.set_backend(scene_backend)
+
+		self.__installed = None
+
+	def __enter__(self):
+		self.install()
+
+		return self
+
+	def __exit__(self, exc_type, exc_value, exc_traceback):
+		self.uninstall()
+
+		return False
+
+	def total(self):
+		return sum(self.calls.values())
+
+	def by_api(self):
+		"""
+		Returns the number of calls to each entry point, regardless of their call site.
+
+		@rtype: Counter
+		"""
+
+		totals = Counter()
+
+		for (api, _), n in self.calls.items():
+			totals[api] += n
+
+		return totals
+
+	def report(self):
+		"""
+		Returns a table with the number of calls issued from each call site, busiest first.
+
+		@rtype: str
+		"""
+
+		lines = ["%8s  %-32s %s" % ("calls", "api", "call site")]
+
+		for (api, site), n in sorted(self.calls.items(), key=lambda item: (-item[1], item[0])):
+			lines.append("%8i  %-32s %s" % (n, api, site))
+
+		return "\n".join(lines)
+
+
+class ScalingReport(object):
+	"""
+	Counts of every call site over runs on scenes of increasing size, and the exponent each count grows with: the
+	slope of log(count) against log(scene size) between the smallest and the largest scene.
+	"""
+
+	def __init__(self, sizes, tracers):
+		self.sizes = sizes
+		self.counts = OrderedDict()
+
+		for key in sorted(set(k for t in tracers for k in t.calls)):
+			self.counts[key] = [t.calls.get(key, 0) for t in tracers]
+
+	def exponent(self, key):
+		first, last = self.counts[key][0], self.counts[key][-1]
+
+		if last == 0:
+			return 0.0
+		elif first == 0:
+			# Only issued on the larger scenes
+			return float("inf")
+
+		return math.log(float(last) / first) / math.log(float(self.sizes[-1]) / self.sizes[0])
+
+	def flagged(self, threshold=DEFAULT_GROWTH_THRESHOLD, min_calls=DEFAULT_MIN_CALLS):
+		"""
+		Returns the call sites whose count grows with the scene's size at least as fast as the threshold, N+1 patterns
+		issuing a call per node.
+
+		@return: [(str, str, float),...] as (api, call site, exponent)
+		@rtype: list
+		"""
+
+		return [
+			(api, site, self.exponent((api, site))) for api, site in self.counts
+			if self.counts[(api, site)][-1] >= min_calls and self.exponent((api, site)) >= threshold
+		]
+
+	def report(self, threshold=DEFAULT_GROWTH_THRESHOLD, min_calls=DEFAULT_MIN_CALLS):
+		"""
+		Returns a table with the count of every call site at each scene size and its growth exponent. Call sites
+		flagged as per node patterns are marked with an asterisk.
+
+		@rtype: str
+		"""
+
+		flagged = set((api, site) for api, site, _ in self.flagged(threshold, min_calls))
+
+		lines = ["   %s  %6s  %-32s %s" % ("  ".join("%8s" % ("n=%i" % s) for s in self.sizes), "exp", "api", "call site")]
+
+		for key, counts in self.counts.items():
+			lines.append("%s  %s  %6.2f  %-32s %s" % (
+				"*" if key in flagged else " ", "  ".join("%8i" % c for c in counts), self.exponent(key), key[0], key[1]
+			))
+
+		return "\n".join(lines)
+
+
+def trace(function, *args, **kwargs):
+	"""
+	Runs the function received as argument with a call tracer installed.
+
+	@return: CallTracer
+	@rtype: CallTracer
+	"""
+
+	with CallTracer() as tracer:
+		function(*args, **kwargs)
+
+	return tracer
+
+
+def trace_scaling(run, build_backend, sizes):
+	"""
+	Runs the function received as argument once on the scene build_backend returns for each size, and compares how
+	many calls each call site issued. The scene's size is its node count. The current backend is restored afterwards.
+
+	@return: ScalingReport
+	@rtype: ScalingReport
+	"""
+
+	previous_backend = backend.get_backend() if backend.BACKEND is not None else None
+	node_counts = []
+	tracers = []
+
+	try:
+		for size in sizes:
+			scene_backend = build_backend(size)
+			node_counts.append(len(scene_backend.list_nodes()[0]))
+
+			backend.set_backend(scene_backend)
+			tracers.append(trace(run))
+	finally:
+		backend.set_backend(previous_backend)
+
+	return ScalingReport(node_counts, tracers)
+
+
+def assert_no_per_node_calls(run, build_backend, sizes=(200, 2000), threshold=DEFAULT_GROWTH_THRESHOLD,
+		min_calls=DEFAULT_MIN_CALLS):
+	"""
+	Fails when the function received as argument has a call site whose number of calls grows with the scene's size, so
+	a batch check regressing into per node calls is caught. For instance:
+
+		calltrace.assert_no_per_node_calls(lambda: inspectutils.run_all_checks(), build_rig)
+	"""
+
+	scaling_report = trace_scaling(run, build_backend, sizes)
+	flagged = scaling_report.flagged(threshold, min_calls)
+
+	try:
+		assert not flagged
+	except AssertionError:
+		raise AssertionError("Calls issued per node:\n%s" % "\n".join(
+			"%s from %s, growth exponent %.2f" % (api, site, exponent) for api, site, exponent in flagged
+		))
@@ -0,0 +1,160 @@
+try:
+	import numpy
+except ImportError:
+	# Channel tables fall back to plain lists of tuples
+	numpy = None
+
+from . import backend
+from . import dataplan
+
+maya_useNewAPI = True
+
+CHANNELS = tuple("%s%s" % (at, ax) for at in ("translate", "rotate", "scale") for ax in ("X", "Y", "Z"))
+ZEROED_VALUES = (0.0,) * 6 + (1.0,) * 3
+
+# Largest difference with a channel's zeroed value still considered zeroed, unless the configuration says otherwise
+DEFAULT_TOLERANCE = 1e-5
+
+
+class ChannelTable(object):
+	"""
+	Values and lock states of the same channels for many nodes, read in one go. There's a row per node and a column per
+	channel. Rows are NumPy arrays when NumPy is available and tuples otherwise.
+	"""
+
+	def __init__(self, names, channels, values, locks):
+		self.names = names
+		self.channels = channels
+
+		if numpy is not None:
+			self.values = numpy.array(values, dtype=float).reshape(len(names), len(channels))
+			self.locks = numpy.array(locks, dtype=bool).reshape(len(names), len(channels))
+		else:
+			self.values = [tuple(float(v) for v in row) for row in values]
+			self.locks = [tuple(bool(l) for l in row) for row in locks]
+
+	def __len__(self):
+		return len(self.names)
+
+
+class ChannelMasks(object):
+	"""
+	Per node, per channel failure masks: masks[i][c] is True when channel c of node i fails the check.
+	"""
+
+	def __init__(self, names, channels, masks):
+		self.names = names
+		self.channels = channels
+		self.masks = masks
+
+		if numpy is not None:
+			self.__failed = masks.any(axis=1).tolist() if len(names) else []
+		else:
+			self.__failed = [any(row) for row in masks]
+
+	def __len__(self):
+		return len(self.names)
+
+	def failed(self, index):
+		return self.__failed[index]
+
+	def failed_names(self):
+		"""
+		Returns the names of the nodes with at least one failing channel.
+
+		@return: [str,...]
+		@rtype: list
+		"""
+
+		return [n for n, f in zip(self.names, self.__failed) if f]
+
+	def failed_channels(self, index):
+		"""
+		Returns the channels failing the check for the node at the index received as argument.
+
+		@return: [str,...]
+		@rtype: list
+		"""
+
+		return [c for c, f in zip(self.channels, self.masks[index]) if f]
+
+	def as_dict(self):
+		"""
+		Returns the failing channels of every node with at least one of them, keyed by the node's name.
+
+		@rtype: dict
+		"""
+
+		return dict((self.names[i], self.failed_channels(i)) for i, f in enumerate(self.__failed) if f)
+
+
+def read_channels(names, channels=CHANNELS, scene_backend=None):
+	"""
+	Reads the values and lock states of the channels received as argument for every node received as argument, in a
+	single bulk query to the backend.
+
+	@return: ChannelTable
+	@rtype: ChannelTable
+	"""
+
+	if scene_backend is None:
+		scene_backend = backend.get_backend()
+
+	values, locks = scene_backend.get_channels(names, channels)
+
+	return ChannelTable(names, channels, values, locks)
+
+
+def read_planned_channels(data_planner, indices, channels=CHANNELS):
+	"""
+	Same as read_channels, for the snapshot nodes at the indices received as argument, read through the run's data
+	planner so channels already read by another check aren't read again.
+
+	@return: ChannelTable
+	@rtype: ChannelTable
+	"""
+
+	view = data_planner.view(indices, ["name"] + dataplan.attribute_columns(channels) + dataplan.lock_columns(channels))
+
+	return ChannelTable(
+		list(view["name"]), channels,
+		view.rows(dataplan.attribute_columns(channels)), view.rows(dataplan.lock_columns(channels))
+	)
+
+
+def zeroed_masks(channel_table, tolerance=DEFAULT_TOLERANCE, zeroed_values=ZEROED_VALUES):
+	"""
+	Tells which channels aren't zeroed: unlocked channels whose value differs from its zeroed value by more than the
+	tolerance. With NumPy the whole table is evaluated in a single vectorized operation.
+
+	@return: ChannelMasks
+	@rtype: ChannelMasks
+	"""
+
+	if numpy is not None:
+		masks = (numpy.abs(channel_table.values - numpy.asarray(zeroed_values)) > tolerance) & ~channel_table.locks
+	else:
+		masks = [
+			tuple(not l and abs(v - z) > tolerance for v, l, z in zip(values, locks, zeroed_values))
+			for values, locks in zip(channel_table.values, channel_table.locks)
+		]
+
+	return ChannelMasks(channel_table.names, channel_table.channels, masks)
+
+
+def are_zeroed(data_planner, indices, tolerance=DEFAULT_TOLERANCE):
+	"""
+	Tells whether the snapshot nodes at the indices received as argument are zeroed. Shapes are checked through their
+	transform, and nodes with no transform have no channels to check.
+
+	@return: A list of booleans aligned with indices
+	@rtype: list
+	"""
+
+	transforms = data_planner.view(indices, ["transform"])["transform"]
+	checked = [t for t in transforms if t != -1]
+
+	masks = zeroed_masks(read_planned_channels(data_planner, checked), tolerance)
+	failed = iter([masks.failed(k) for k in range(len(masks))])
+
+	return [t == -1 or not next(failed) for t in transforms]
@@ -0,0 +1,283 @@
+import re
+
+try:
+	from re import _parser as sre_parse
+except ImportError:
+	# Python 3.10 and older
+	import sre_parse
+
+from . import nodetypes
+from . import queryplan
+from . import scheduler
+
+maya_useNewAPI = True
+
+# Flags of an expression with no inline flags, see DiscoveryClassifier
+DEFAULT_REGEX_FLAGS = re.compile("").flags
+
+
+def has_back_references(regex):
+	"""
+	Tells whether the compiled expression received as argument refers back to one of its groups, by number, by name
+	or through a conditional.
+
+	@rtype: bool
+	"""
+
+	pending = [sre_parse.parse(regex.pattern, regex.flags)]
+
+	while pending:
+		item = pending.pop()
+
+		if isinstance(item, sre_parse.SubPattern):
+			for op, av in item:
+				if str(op).lower().startswith("groupref"):
+					return True
+
+				pending.append(av)
+		elif isinstance(item, (list, tuple)):
+			pending.extend(item)
+
+	return False
+
+
+def is_mergeable(regex):
+	# Numbered back references would point to the wrong group once embedded in another expression, and global inline
+	# flags would apply to every expression
+	return regex.flags == DEFAULT_REGEX_FLAGS and not has_back_references(regex)
+
+
+class Classification(object):
+	"""
+	Result of classifying a list of nodes: for each node, a bit mask with one bit per category it belongs to.
+	"""
+
+	def __init__(self, titles, masks):
+		self.titles = titles
+		self.masks = masks
+
+		self.__indices = {}
+
+	def indices(self, title):
+		"""
+		Returns the indices of all the nodes tagged with the category received as argument, in traversal order.
+
+		@return: [int,...]
+		@rtype: list
+		"""
+
+		try:
+			return self.__indices[title]
+		except KeyError:
+			bit = 1 << self.titles.index(title)
+			self.__indices[title] = [i for i, m in enumerate(self.masks) if m & bit]
+
+			return self.__indices[title]
+
+	def titles_of(self, index):
+		"""
+		Returns every category the node at the index received as argument belongs to.
+
+		@return: (str,...)
+		@rtype: tuple
+		"""
+
+		mask = self.masks[index]
+
+		return tuple(t for b, t in enumerate(self.titles) if mask & (1 << b))
+
+
+class DiscoveryClassifier(object):
+	"""
+	Matches a list of nodes against several discovery specs at once. The specs are compiled into:
+
+	- a single suffix table, keyed by suffix, shared by every category's suffix and the literal suffixes of their
+	expressions,
+	- a single regular expression holding every category's expression as an optional look ahead, so one match tells
+	which of them a name satisfies. Expressions with back references or inline flags are matched on their own instead,
+	- a type table, built lazily, telling which categories accept each node type.
+
+	Each node is then visited once and tagged with a bit mask of all the categories it belongs to.
+	"""
+
+	def __init__(self, specs, no_intermediate_titles=()):
+		self.titles = list(specs)
+		self.all_bits = (1 << len(self.titles)) - 1
+
+		self.__no_intermediate_bits = 0
+		self.__type_bits = {}
+		self.__typed_titles = []
+		self.__untyped_bits = 0
+
+		self.__suffix_table = {}
+		self.__unsuffixed_bits = 0
+		self.__unhinted_bits = 0
+
+		self.__regex_bits = 0
+		self.__regex_groups = []
+		self.__merged_regex = None
+		self.__regexes = []
+		self.__separate_regexes = []
+
+		for b, title in enumerate(self.titles):
+			bit = 1 << b
+			plan = queryplan.plan_discovery(specs[title], title)
+
+			if title in no_intermediate_titles:
+				self.__no_intermediate_bits |= bit
+
+			if plan.types:
+				self.__typed_titles.append((bit, plan.types))
+			else:
+				self.__untyped_bits |= bit
+
+			# The spec's own suffix is a requirement while the suffixes extracted from its expression are only hints
+			# telling whether the expression can possibly match
+			if plan.suffix:
+				self.__add_suffix(plan.suffix, bit, 0)
+			else:
+				self.__unsuffixed_bits |= bit
+
+			if plan.expression is not None:
+				self.__regex_bits |= bit
+				self.__regexes.append((bit, plan.expression))
+
+				exp_suffixes = queryplan.literal_bounds(plan.expression)[1]
+
+				if exp_suffixes is None:
+					self.__unhinted_bits |= bit
+				else:
+					for s in exp_suffixes:
+						self.__add_suffix(s, 0, bit)
+
+		self.__suffix_lengths = sorted(set(len(s) for s in self.__suffix_table))
+
+		# Expressions which can't be embedded in another one are matched on their own, see is_mergeable
+		mergeable = [(bit, r) for bit, r in self.__regexes if is_mergeable(r)]
+		self.__separate_regexes = [(bit, r) for bit, r in self.__regexes if not is_mergeable(r)]
+
+		try:
+			assert mergeable
+
+			self.__merged_regex = re.compile("".join(
+				"(?:(?=(?P<c%i>%s)))?" % (k, regex.pattern) for k, (_, regex) in enumerate(mergeable)
+			))
+		except(AssertionError, re.error, ValueError, RuntimeError, Exception):
+			self.__merged_regex = None
+			self.__separate_regexes = self.__regexes
+		else:
+			self.__regex_groups = [("c%i" % k, bit) for k, (bit, _) in enumerate(mergeable)]
+
+	def __add_suffix(self, suffix, required_bit, hint_bit):
+		required_bits, hint_bits = self.__suffix_table.get(suffix, (0, 0))
+		self.__suffix_table[suffix] = (required_bits | required_bit, hint_bits | hint_bit)
+
+	def __types_mask(self, node_type):
+		try:
+			return self.__type_bits[node_type]
+		except KeyError:
+			mask = self.__untyped_bits
+
+			for bit, types in self.__typed_titles:
+				if node_type in nodetypes.expand_types(types):
+					mask |= bit
+
+			self.__type_bits[node_type] = mask
+
+			return mask
+
+	def __regex_mask(self, name, candidate_bits):
+		mask = 0
+
+		if self.__merged_regex is not None:
+			match = self.__merged_regex.match(name)
+
+			for group, bit in self.__regex_groups:
+				if candidate_bits & bit and match.group(group) is not None:
+					mask |= bit
+
+		for bit, regex in self.__separate_regexes:
+			if candidate_bits & bit and regex.match(name) is not None:
+				mask |= bit
+
+		return mask
+
+	def classify_name(self, name, node_type=None, intermediate=False):
+		"""
+		Returns the bit mask of every category the node received as argument belongs to.
+
+		@rtype: int
+		"""
+
+		mask = self.all_bits if node_type is None else self.__types_mask(node_type)
+
+		if intermediate is True:
+			mask &= ~self.__no_intermediate_bits
+
+		if mask == 0:
+			return 0
+
+		required_bits = self.__unsuffixed_bits
+		hint_bits = self.__unhinted_bits
+
+		for length in self.__suffix_lengths:
+			try:
+				r, h = self.__suffix_table[name[-length:]]
+			except KeyError:
+				continue
+
+			required_bits |= r
+			hint_bits |= h
+
+		mask &= required_bits
+
+		if mask & self.__regex_bits:
+			# Only run the expressions which can possibly match, given the name's suffix
+			regex_mask = self.__regex_mask(name, mask & self.__regex_bits & hint_bits)
+			mask &= regex_mask | (self.all_bits & ~self.__regex_bits)
+
+		return mask
+
+	def classify(self, names, types=None, intermediates=frozenset()):
+		"""
+		Tags every name received as argument with all the categories it belongs to, in a single pass.
+
+		@return: Classification
+		@rtype: Classification
+		"""
+
+		return scheduler.run_pass(self.iter_classify(names, types, intermediates))
+
+	def iter_classify(self, names, types=None, intermediates=frozenset(), chunk_size=None):
+		"""
+		Resumable counterpart of classify, tagging chunk_size names per step, see scheduler.PassStep.
+
+		@return: (scheduler.PassStep,...), then the Classification
+		@rtype: generator
+		"""
+
+		classify_name = self.classify_name
+		masks = []
+
+		for start, stop in scheduler.chunks(len(names), chunk_size):
+			if types is None:
+				masks.extend(classify_name(names[i], None, i in intermediates) for i in range(start, stop))
+			else:
+				masks.extend(classify_name(names[i], types[i], i in intermediates) for i in range(start, stop))
+
+			yield scheduler.PassStep("classify_scene", stop, len(names))
+
+		yield Classification(self.titles, masks)
+
+	def classify_snapshot(self, snapshot):
+		"""
+		Tags every node in the snapshot received as argument with all the categories it belongs to, in a single pass.
+
+		@return: Classification
+		@rtype: Classification
+		"""
+
+		return self.classify(snapshot.short_names, snapshot.types, snapshot.intermediates)
+
+	def iter_classify_snapshot(self, snapshot, chunk_size=None):
+		return self.iter_classify(snapshot.short_names, snapshot.types, snapshot.intermediates, chunk_size)
@@ -0,0 +1,217 @@
+from collections import Counter, OrderedDict
+
+maya_useNewAPI = True
+
+# Columns derived from the snapshot itself, which never query the backend
+DERIVED_COLUMNS = ("name", "short_name", "type", "transform", "parent", "parent_name", "shape_types")
+
+# Prefixes of the columns read from the backend: an attribute's value or its lock state
+ATTRIBUTE_PREFIX = "attr:"
+LOCK_PREFIX = "lock:"
+
+
+def attribute_columns(attributes):
+	return [ATTRIBUTE_PREFIX + a for a in attributes]
+
+
+def lock_columns(attributes):
+	return [LOCK_PREFIX + a for a in attributes]
+
+
+class ColumnView(object):
+	"""
+	Read-only columnar view over some of the snapshot's nodes: each column is a tuple aligned with the view's indices.
+	"""
+
+	def __init__(self, indices, columns):
+		self.__indices = tuple(indices)
+		self.__columns = columns
+
+	def __len__(self):
+		return len(self.__indices)
+
+	def __getitem__(self, column):
+		return self.__columns[column]
+
+	def __contains__(self, column):
+		return column in self.__columns
+
+	@property
+	def indices(self):
+		return self.__indices
+
+	def columns(self):
+		return list(self.__columns)
+
+	def rows(self, columns):
+		"""
+		Returns the values of the columns received as argument, one tuple per node.
+
+		@rtype: list
+		"""
+
+		return list(zip(*[self.__columns[c] for c in columns])) if self.__indices else []
+
+
+class DataPlanner(object):
+	"""
+	Fetches the data checks declare they need, once per inspection. Values are cached per node and per column, so
+	overlapping requests, from the same check or from different ones, only fetch what no one fetched before, in bulk.
+
+	Every value read from the backend is counted in reads, keyed by (node index, column), which proves no attribute is
+	read twice in the same run, see duplicate_reads.
+	"""
+
+	def __init__(self, snapshot):
+		self.snapshot = snapshot
+
+		self.reads = Counter()
+		self.backend_calls = 0
+
+		self.__cells = {}
+
+	def __derive(self, column, i):
+		snapshot = self.snapshot
+
+		if column == "name":
+			return snapshot.names[i]
+		elif column == "short_name":
+			return snapshot.short_names[i]
+		elif column == "type":
+			return snapshot.types[i]
+		elif column == "transform":
+			# Shapes are addressed through their transform
+			if snapshot.types[i] in snapshot.backend.expand_types("transform"):
+				return i
+
+			return snapshot.parents[i]
+		elif column == "parent":
+			transform = self.__cell("transform", i)
+
+			return -1 if transform == -1 else snapshot.parents[transform]
+		elif column == "parent_name":
+			parent = self.__cell("parent", i)
+
+			return None if parent == -1 else snapshot.short_names[parent]
+		elif column == "shape_types":
+			shape_types = snapshot.backend.expand_types("shape")
+
+			if snapshot.types[i] in shape_types:
+				return (snapshot.types[i],)
+
+			return tuple(
+				snapshot.types[c] for c in snapshot.hierarchy().children(i) if snapshot.types[c] in shape_types
+			)
+
+		raise ValueError("Unsupported column %s." % column)
+
+	def __cell(self, column, i):
+		try:
+			return self.__cells[(column, i)]
+		except KeyError:
+			value = self.__cells[(column, i)] = self.__derive(column, i)
+
+			return value
+
+	def __fetch(self, indices, columns):
+		"""
+		Reads the attribute and lock columns received as argument for the nodes missing them. Columns missing for the
+		same nodes are read together, in a single bulk query.
+		"""
+
+		pending = {}
+		indices = list(OrderedDict.fromkeys(indices))
+
+		for c in columns:
+			missing = tuple(i for i in indices if (c, i) not in self.__cells)
+
+			if missing:
+				pending.setdefault(missing, []).append(c)
+
+		scene_backend = self.snapshot.backend
+
+		for missing, missing_columns in pending.items():
+			names = [self.snapshot.names[i] for i in missing]
+			attributes = [c[len(ATTRIBUTE_PREFIX):] for c in missing_columns if c.startswith(ATTRIBUTE_PREFIX)]
+			locks = [c[len(LOCK_PREFIX):] for c in missing_columns if c.startswith(LOCK_PREFIX)]
+
+			if attributes:
+				self.backend_calls += 1
+
+				for i, row in zip(missing, scene_backend.get_attrs(names, attributes)):
+					for a, v in zip(attributes, row):
+						self.__cells[(ATTRIBUTE_PREFIX + a, i)] = v
+						self.reads[(i, ATTRIBUTE_PREFIX + a)] += 1
+
+			if locks:
+				self.backend_calls += 1
+
+				for i, row in zip(missing, scene_backend.get_locks(names, locks)):
+					for a, v in zip(locks, row):
+						self.__cells[(LOCK_PREFIX + a, i)] = v
+						self.reads[(i, LOCK_PREFIX + a)] += 1
+
+	def view(self, indices, columns):
+		"""
+		Returns a read-only view of the columns received as argument for the nodes at the indices received as argument.
+		Data no previous request fetched is fetched now, in bulk.
+
+		@return: ColumnView
+		@rtype: ColumnView
+		"""
+
+		indices = list(indices)
+		fetched_columns = [c for c in columns if c.startswith((ATTRIBUTE_PREFIX, LOCK_PREFIX))]
+
+		for c in columns:
+			if c not in fetched_columns and c not in DERIVED_COLUMNS:
+				raise ValueError("Unsupported column %s." % c)
+
+		if fetched_columns and indices:
+			self.__fetch(indices, fetched_columns)
+
+		cells = self.__cells
+		cell = self.__cell
+
+		return ColumnView(indices, dict(
+			(c, tuple(cells[(c, i)] for i in indices) if c in fetched_columns else tuple(cell(c, i) for i in indices))
+			for c in columns
+		))
+
+	def duplicate_reads(self):
+		"""
+		Returns every value read from the backend more than once during the run. Empty unless caching is broken.
+
+		@return: [(str, str, int),...] as (node name, column, times read)
+		@rtype: list
+		"""
+
+		return [(self.snapshot.names[i], c, n) for (i, c), n in sorted(self.reads.items()) if n > 1]
+
+	def assert_no_duplicate_reads(self):
+		duplicates = self.duplicate_reads()
+
+		try:
+			assert not duplicates
+		except AssertionError:
+			raise AssertionError("Values read more than once: %s" % ", ".join(
+				"%s.%s (%i times)" % (n, c.partition(":")[2], k) for n, c, k in duplicates
+			))
+
+	def stats(self):
+		return {
+			"values_read": sum(self.reads.values()),
+			"backend_calls": self.backend_calls,
+			"duplicate_reads": len(self.duplicate_reads())
+		}
+
+
+def get_data_planner(snapshot):
+	"""
+	Returns the data planner of the snapshot received as argument, shared by every check of the run.
+
+	@return: DataPlanner
+	@rtype: DataPlanner
+	"""
+
+	return snapshot.memo("data_planner", lambda: DataPlanner(snapshot))
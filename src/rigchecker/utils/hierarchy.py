@@ -0,0 +1,134 @@
+from . import scheduler
+
+maya_useNewAPI = True
+
+
+class HierarchyIndex(object):
+	"""
+	Answers hierarchy queries over a parent index array, where parents[i] is the index of node i's parent, or -1 for
+	world children and non DAG nodes. Every answer is memoized, so a query costs O(1) amortized no matter how many
+	nodes share the same ancestors:
+
+	- roots are resolved with path compression: every node visited on the way up learns its root,
+	- nearest matching ancestors are memoized per predicate key the same way.
+
+	Parents and children are plain lookups, shared by every hierarchy check of the run.
+	"""
+
+	def __init__(self, parents):
+		self.parents = parents
+
+		self.__roots = [None] * len(parents)
+		self.__nearest = {}
+		self.__children = None
+
+	def __len__(self):
+		return len(self.parents)
+
+	def children(self, index):
+		"""
+		Returns the indices of the immediate children of the node at the index received as argument.
+
+		@return: [int,...]
+		@rtype: list
+		"""
+
+		if self.__children is None:
+			scheduler.run_pass(self.iter_build())
+
+		return self.__children[index]
+
+	def iter_build(self, chunk_size=None):
+		"""
+		Resumable pass building the children lists, chunk_size nodes per step, see scheduler.PassStep.
+		"""
+
+		parents = self.parents
+		children = []
+
+		for start, stop in scheduler.chunks(len(parents), chunk_size):
+			children.extend([] for _ in range(start, stop))
+
+			yield scheduler.PassStep("hierarchy", stop, 2 * len(parents))
+
+		for start, stop in scheduler.chunks(len(parents), chunk_size):
+			for i in range(start, stop):
+				if parents[i] != -1:
+					children[parents[i]].append(i)
+
+			yield scheduler.PassStep("hierarchy", len(parents) + stop, 2 * len(parents))
+
+		self.__children = children
+
+		yield self
+
+	def root(self, index):
+		"""
+		Returns the index of the outermost ancestor of the node at the index received as argument, or the index itself
+		for world children.
+
+		@rtype: int
+		"""
+
+		roots = self.__roots
+		parents = self.parents
+		path = []
+
+		while roots[index] is None:
+			path.append(index)
+
+			if parents[index] == -1:
+				roots[index] = index
+				break
+
+			index = parents[index]
+
+		root = roots[index]
+
+		for i in path:
+			roots[i] = root
+
+		return root
+
+	def nearest_ancestor(self, index, key, predicate):
+		"""
+		Returns the index of the closest ancestor of the node at the index received as argument satisfying predicate,
+		or -1 if none does. Results are memoized under key, which has to identify the predicate.
+
+		@param predicate: Function receiving a node's index and returning whether it matches
+		@rtype: int
+		"""
+
+		try:
+			nearest = self.__nearest[key]
+		except KeyError:
+			nearest = self.__nearest[key] = {}
+
+		parents = self.parents
+		path = []
+		i = index
+		found = -1
+
+		while True:
+			p = parents[i]
+
+			if p == -1:
+				break
+
+			try:
+				found = nearest[i]
+				break
+			except KeyError:
+				path.append(i)
+
+			if predicate(p) is True:
+				found = p
+				break
+
+			i = p
+
+		# Every node walked through shares the same answer, as none of the ancestors in between matched
+		for i in path:
+			nearest[i] = found
+
+		return found
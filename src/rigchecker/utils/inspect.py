@@ -1,198 +1,257 @@
-import maya.api.OpenMaya as om
-import maya.cmds as cmds
+import functools
 
+from collections import OrderedDict
+
+from . import backend
+from . import classifier
+from . import profiling
+from . import queryplan
+from . import sceneindex
+from . import scenesnapshot
 from .. import getconf
 
+try:
+	reload
+except NameError:
+	# Python 3 moved reload out of the builtins
+	from importlib import reload
+
 reload(getconf)
 
 maya_useNewAPI = True
 
-GEO_DISCOVERY_DATA = None
-CONTROLS_DISCOVERY_DATA = None
-JOINTS_DISCOVERY_DATA = None
-ACCEPTED_CONTROLS_TYPE = None
-OFFSET_GROUPS_DISCOVERY_DATA = None
-GEO_GROUP_DISCOVERY_DATA = None
+# Categories classified in every inspection, see classify_scene
+DISCOVERY_TITLES = ("geo", "joints", "controls", "geo_grp", "rig_grp")
+DISCOVERY_PLANS = {}
 
+NO_INTERMEDIATE_TITLES = ("geo", "joints")
 
-def get_node_reference_decorator(function):
-	def decorated(node):
-		try:
-			assert type(node) is om.MObject
-		except AssertionError:
-			node_sel_list = om.MSelectionList()
+SCENE_INDEX = None
 
-			try:
-				node_sel_list.add(node)
-			except(RuntimeError, Exception):
-				raise
-			else:
-				node = node_sel_list.getDependNode(0)
 
-		return function(node)
+def get_node_reference_decorator(function):
+	"""
+	Makes the function received as argument accept either a node reference (an MObject in Maya) or a node name. The
+	function always receives the node's long name, which is how the backend addresses nodes.
+	"""
+
+	@functools.wraps(function)
+	def decorated(node, *args, **kwargs):
+		return function(backend.get_backend().name_of(node), *args, **kwargs)
 
 	return decorated
 
 
-def get_geos_in_scene_gen():
+def get_discovery_specs():
 	"""
-	Returns a generator for all the shape nodesList in the scene which match the filters specified via the configuration
-	file.
+	Returns the discovery data of every category classified in an inspection, keyed by the category's title. Specs
+	come from the configuration's discovery registry, see getconf.DiscoveryRegistry.
 
-	@return: (MObject,...)
-	@rtype: generator
+	@return: {str: getconf.DiscoverySpec,...}
+	@rtype: OrderedDict
+	"""
+
+	return OrderedDict((t, getconf.get_discovery_data(t)) for t in DISCOVERY_TITLES)
+
+
+def release_discovery_specs(titles=None):
+	"""
+	Drops the data derived from the discovery specs of the categories received as argument, or of every category: their
+	query plans, and the persistent scene index, whose classification depends on all of them. Called by the discovery
+	registry whenever some specs change.
+	"""
+
+	for title in list(DISCOVERY_PLANS) if titles is None else titles:
+		DISCOVERY_PLANS.pop(title, None)
+
+	if titles is None or set(titles).intersection(DISCOVERY_TITLES):
+		release_scene_index()
+
+
+def get_discovery_plan(title):
 	"""
+	Returns the query plan for the discovery data of the category received as argument, built once. Besides running
+	discovery, plans tell whether a single name matches the category, see queryplan.QueryPlan.accepts.
 
-	global GEO_DISCOVERY_DATA
+	@return: queryplan.QueryPlan
+	@rtype: queryplan.QueryPlan
+	"""
 
-	if GEO_DISCOVERY_DATA is None:
-		GEO_DISCOVERY_DATA = getconf.get_geo_discovery_data()
+	# Specs changed since the plan was built are released first
+	getconf.DISCOVERY_REGISTRY.sync()
 
-	# Assume there is a types specification for finding geos in the scene
 	try:
-		geos_in_scene = cmds.ls(type=GEO_DISCOVERY_DATA.type, noIntermediate=True)
-	except AttributeError:
-		geos_in_scene = cmds.ls(noIntermediate=True)
+		return DISCOVERY_PLANS[title]
+	except KeyError:
+		DISCOVERY_PLANS[title] = queryplan.plan_discovery(
+			getconf.get_discovery_data(title), title, no_intermediate=title in NO_INTERMEDIATE_TITLES
+		)
+
+		return DISCOVERY_PLANS[title]
+
 
-	geo_ref_sel_list = om.MSelectionList()
+def classify_scene(snapshot):
+	"""
+	Tags every node in the snapshot received as argument with all the discovery categories it belongs to. All the
+	categories are matched in a single pass over the snapshot, which is done only once per snapshot.
 
-	for geo_name in geos_in_scene:
-		try:
-			assert geo_name.endswith(GEO_DISCOVERY_DATA.suffix) is True
-		except AttributeError:
-			# There isn't a suffix specification for finding geos in the scene. Therefore, ignore this error and
-			# continue on
-			pass
-		except AssertionError:
-			continue
+	@return: classifier.Classification
+	@rtype: classifier.Classification
+	"""
 
-		try:
-			assert GEO_DISCOVERY_DATA.expression.match(geo_name) is not None
-		except AttributeError:
-			# There isn't a suffix specification for finding geos in the scene. Therefore, ignore this error and
-			# continue on
-			pass
-		except AssertionError:
-			continue
+	def classify():
+		with profiling.span("classify_scene", "discovery", len(snapshot)):
+			discovery_classifier = classifier.DiscoveryClassifier(get_discovery_specs(), NO_INTERMEDIATE_TITLES)
 
-		geo_ref_sel_list.clear()
-		geo_ref_sel_list.add(geo_name)
+			return discovery_classifier.classify_snapshot(snapshot)
 
-		yield geo_ref_sel_list.getDependNode(0)
+	return snapshot.memo("classification", classify)
 
 
-def get_geos_in_scene_list():
+def iter_classify_scene(snapshot, chunk_size=None):
 	"""
-	Returns a list with references to all the shape nodesList in the scene.
+	Resumable counterpart of classify_scene, classifying chunk_size nodes per step, see scheduler.PassStep.
+
+	@return: (scheduler.PassStep,...)
+	@rtype: generator
+	"""
+
+	def classify():
+		discovery_classifier = classifier.DiscoveryClassifier(get_discovery_specs(), NO_INTERMEDIATE_TITLES)
+
+		return discovery_classifier.iter_classify_snapshot(snapshot, chunk_size)
+
+	return snapshot.iter_memo("classification", classify)
+
+
+def discover_nodes(title, snapshot=None):
+	"""
+	Returns the nodes matching the discovery data of the category received as argument. Without a scene snapshot the
+	category's data is planned into the narrowest native ls query possible (see queryplan.explain_plans). With one,
+	the nodes are read from the snapshot's classification, shared by every category.
 
 	@return: [MObject,...]
 	@rtype: list
 	"""
 
-	return [geo for geo in get_geos_in_scene_gen()]
+	with profiling.span("discover_nodes:%s" % title, "discovery") as discovery_span:
+		if snapshot is None:
+			nodes = get_discovery_plan(title).nodes()
+		else:
+			nodes = snapshot.nodes(classify_scene(snapshot).indices(title))
+
+		discovery_span.nodes = len(nodes)
+
+		return nodes
+
+
+def get_scene_index():
+	"""
+	Returns the persistent scene index, creating it the first time. The index listens to Maya's messages, so
+	discovering nodes through it only re-classifies the nodes changed since the previous inspection.
+
+	@return: sceneindex.SceneIndex
+	@rtype: sceneindex.SceneIndex
+	"""
 
+	global SCENE_INDEX
 
-def get_anim_curves_in_scene_list():
-	return cmds.ls(type=["animCurveTL", "animCurveTA", "animCurveTU"])
+	# The index is released if the specs it classifies with changed
+	getconf.DISCOVERY_REGISTRY.sync()
 
+	if SCENE_INDEX is None:
+		SCENE_INDEX = sceneindex.SceneIndex(
+			classifier.DiscoveryClassifier(get_discovery_specs(), NO_INTERMEDIATE_TITLES), sceneindex.MayaEventSource()
+		)
 
-def get_controls_in_scene_gen():
-	nodes_sel_list = om.MSelectionList()
+	return SCENE_INDEX
 
-	global CONTROLS_DISCOVERY_DATA
 
-	if CONTROLS_DISCOVERY_DATA is None:
-		CONTROLS_DISCOVERY_DATA = getconf.get_controls_discovery_data()
+def release_scene_index():
+	"""
+	Stops the persistent scene index from listening to Maya's messages and drops it. It has to be released whenever
+	the discovery data changes, since its classification depends on it.
+	"""
 
-	for node_name in cmds.ls():
-		# Assume controls_names_exp is not None
-		try:
-			assert CONTROLS_DISCOVERY_DATA.expression.match(node_name) is not None
-		except(AttributeError, AttributeError):
-			# Expressions is not a method of discovery. Therefore, ignore this error and continue on
-			pass
-		except AssertionError:
-			# The current node node_data didn't satisfy the regular expressions. Therefore, ignore it and continue with
-			# the next node_data
-			continue
+	global SCENE_INDEX
 
-		# Assume controls_type is not None
-		try:
-			assert cmds.nodeType(node_name) in CONTROLS_DISCOVERY_DATA.type
-		except AssertionError:
-			# The node's type is not supported. Therefore, ignore it and continue with the next node node_data
-			continue
-		except(AttributeError, TypeError, ValueError, RuntimeError):
-			# Type is not a method of discovery. Therefore, ignore this error and continue on
-			pass
+	try:
+		SCENE_INDEX.disconnect()
+	except AttributeError:
+		pass
 
-		# Assume controls_suffix is not None
-		try:
-			assert node_name.endswith(CONTROLS_DISCOVERY_DATA.suffix)
-		except(AttributeError, ValueError, RuntimeError):
-			# Suffixes is not a method of discovery. Therefore, ignore this error and continue on
-			pass
-		except AssertionError:
-			# The node node_data doesn't end with the suffix found in the configuration file. Therefore,
-			# ignore it and continue with the next node_data
-			continue
+	SCENE_INDEX = None
 
-		nodes_sel_list.clear()
-		nodes_sel_list.add(node_name)
 
-		yield nodes_sel_list.getDependNode(0)
+def get_indexed_nodes_gen(title):
+	"""
+	Returns a generator for all the nodes in the category received as argument, read from the persistent scene index.
 
+	@return: (MObject,...)
+	@rtype: generator
+	"""
 
-def get_controls_in_scene_list():
-	return [n for n in get_controls_in_scene_gen()]
+	scene_index = get_scene_index()
 
+	for node_id in scene_index.members(title):
+		yield scene_index.ref(node_id).object()
 
-def get_joints_in_scene_gen():
+
+def get_geos_in_scene_gen(snapshot=None):
 	"""
-	Returns a generator for all the joints nodesList in the scene which match the filters specified via the configuration
-	file.
+	Returns a generator for all the shape nodesList in the scene which match the filters specified via the configuration
+	file. When a scene snapshot is received as argument, the nodes are read from it instead of querying the scene.
 
 	@return: (MObject,...)
 	@rtype: generator
 	"""
 
-	global JOINTS_DISCOVERY_DATA
+	for geo_node in discover_nodes("geo", snapshot):
+		yield geo_node
 
-	if JOINTS_DISCOVERY_DATA is None:
-		JOINTS_DISCOVERY_DATA = getconf.get_joints_discovery_data()
 
-	# Assume there is a types specification for finding geos in the scene
-	try:
-		joints_in_scene = cmds.ls(type=JOINTS_DISCOVERY_DATA.type, noIntermediate=True)
-	except AttributeError:
-		joints_in_scene = cmds.ls(noIntermediate=True)
+def get_geos_in_scene_list(snapshot=None):
+	"""
+	Returns a list with references to all the shape nodesList in the scene.
+
+	@return: [MObject,...]
+	@rtype: list
+	"""
+
+	return [geo for geo in get_geos_in_scene_gen(snapshot)]
+
+
+def get_anim_curves_in_scene_list(snapshot=None):
+	if snapshot is None:
+		snapshot = scenesnapshot.take_snapshot()
+
+	return [snapshot.names[i] for i in snapshot.indices_of_type(["animCurveTL", "animCurveTA", "animCurveTU"])]
+
 
-	joints_ref_sel_list = om.MSelectionList()
+def get_controls_in_scene_gen(snapshot=None):
+	for control_node in discover_nodes("controls", snapshot):
+		yield control_node
 
-	for joint_name in joints_in_scene:
-		try:
-			assert joint_name.endswith(JOINTS_DISCOVERY_DATA.suffix) is True
-		except AttributeError:
-			# There isn't a suffix specification for finding geos in the scene. Therefore, ignore this error and
-			# continue on
-			pass
-		except AssertionError:
-			continue
 
-		try:
-			assert JOINTS_DISCOVERY_DATA.expression.match(joint_name) is not None
-		except AttributeError:
-			# There isn't a suffix specification for finding geos in the scene. Therefore, ignore this error and
-			# continue on
-			pass
-		except AssertionError:
-			continue
+def get_controls_in_scene_list(snapshot=None):
+	return [n for n in get_controls_in_scene_gen(snapshot)]
+
+
+def get_joints_in_scene_gen(snapshot=None):
+	"""
+	Returns a generator for all the joints nodesList in the scene which match the filters specified via the configuration
+	file. When a scene snapshot is received as argument, the nodes are read from it instead of querying the scene.
+
+	@return: (MObject,...)
+	@rtype: generator
+	"""
+
+	for joint_node in discover_nodes("joints", snapshot):
+		yield joint_node
 
-		joints_ref_sel_list.clear()
-		joints_ref_sel_list.add(joint_name)
 
-		yield joints_ref_sel_list.getDependNode(0)
+def get_joints_in_scene_list(snapshot=None):
+	return [j for j in get_joints_in_scene_gen(snapshot)]
 
 
-def get_joints_in_scene_list():
-	return [j for j in get_joints_in_scene_gen()]
\ No newline at end of file
+getconf.DISCOVERY_REGISTRY.add_listener(release_discovery_specs)
@@ -1,53 +1,54 @@
-import maya.api.OpenMaya as om
-import maya.cmds as cmds
-
+from collections import OrderedDict, namedtuple
+
+from . import backend
+from . import channels
+from . import dataplan
+from . import inspect
+from . import profiling
+from . import scenesnapshot
+from . import scheduler
+from . import visibility
+from .inspect import get_node_reference_decorator
 from .. import getconf
 
+try:
+	reload
+except NameError:
+	# Python 3 moved reload out of the builtins
+	from importlib import reload
+
 reload(getconf)
 
 maya_useNewAPI = True
 
-CONTROLS_DISCOVERY_DATA = None
-ACCEPTED_CONTROLS_TYPE = None
-OFFSET_GROUPS_DISCOVERY_DATA = None
-GEO_GROUP_DISCOVERY_DATA = None
-
-
-def get_node_reference_decorator(function):
-	def decorated(node):
-		try:
-			assert type(node) is om.MObject
-		except AssertionError:
-			node_sel_list = om.MSelectionList()
-
-			try:
-				node_sel_list.add(node)
-			except(RuntimeError, Exception):
-				raise
-			else:
-				node = node_sel_list.getDependNode(0)
+# Nodes evaluated per step when checks run as resumable generators, see iter_all_checks
+CHECK_CHUNK_SIZE = 256
 
-		return function(node)
+# Nodes whose connections are walked per step by the resumable passes querying the scene's graph, see iter_all_checks
+WALK_CHUNK_SIZE = 64
 
-	return decorated
+# Progress of a check run as a resumable generator: the number of nodes failing it so far, and once finished, the same
+# result running the check at once returns
+CheckStep = namedtuple("CheckStep", ["check", "done", "total", "failed", "finished", "result"])
 
 
-def get_geos_in_scene_gen():
+def get_geos_in_scene_gen(snapshot=None):
 	"""
-	Returns a generator for all the shape nodesList in the scene.
+	Returns a generator for all the shape nodesList in the scene. When a scene snapshot is received as argument, the
+	nodes are read from it instead of querying the scene.
 
 	@return: (MObject,...)
 	@rtype: generator
 	"""
 
-	geo_ref_sel_list = om.MSelectionList()
-	map(geo_ref_sel_list.add, cmds.ls(type="mesh"))
+	if snapshot is None:
+		snapshot = scenesnapshot.take_snapshot()
 
-	for shape_node in (geo_ref_sel_list.getDependNode(i) for i in xrange(geo_ref_sel_list.length())):
+	for shape_node in snapshot.nodes(snapshot.indices_of_type("mesh")):
 		yield shape_node
 
 
-def get_geos_in_scene_list():
+def get_geos_in_scene_list(snapshot=None):
 	"""
 	Returns a list with references to all the shape nodesList in the scene.
 
@@ -55,184 +56,99 @@ def get_geos_in_scene_list():
 	@rtype: list
 	"""
 
-	return [geo for geo in get_geos_in_scene_gen()]
-
+	return [geo for geo in get_geos_in_scene_gen(snapshot)]
 
-def get_anim_curves_in_scene_list():
-	return cmds.ls(type=["animCurveTL", "animCurveTA", "animCurveTU"])
 
+def get_anim_curves_in_scene_list(snapshot=None):
+	if snapshot is None:
+		snapshot = scenesnapshot.take_snapshot()
 
-def get_controls_in_scene_gen():
-	nodes_sel_list = om.MSelectionList()
+	return [snapshot.names[i] for i in snapshot.indices_of_type(["animCurveTL", "animCurveTA", "animCurveTU"])]
 
-	global CONTROLS_DISCOVERY_DATA
 
-	if CONTROLS_DISCOVERY_DATA is None:
-		CONTROLS_DISCOVERY_DATA = getconf.get_controls_discovery_data()
-
-	for node_name in cmds.ls():
-		# Assume controls_names_exp is not None
-		try:
-			assert CONTROLS_DISCOVERY_DATA["expression"].match(node_name) is not None
-		except(KeyError, AttributeError):
-			# Expressions is not a method of discovery. Therefore, ignore this error and continue on
-			pass
-		except AssertionError:
-			# The current node node_data didn't satisfy the regular expressions. Therefore, ignore it and continue with
-			# the next node_data
-			continue
-
-		# Assume controls_type is not None
-		try:
-			assert cmds.nodeType(node_name) == CONTROLS_DISCOVERY_DATA["type"]
-		except AssertionError:
-			# The node's type is not supported. Therefore, ignore it and continue with the next node node_data
-			continue
-		except(KeyError, ValueError):
-			# Type is not a method of discovery. Therefore, ignore this error and continue on
-			pass
-
-		# Assume controls_suffix is not None
-		try:
-			assert node_name.endswith(CONTROLS_DISCOVERY_DATA["suffix"])
-		except(KeyError, ValueError, RuntimeError):
-			# Suffixes is not a method of discovery. Therefore, ignore this error and continue on
-			pass
-		except AssertionError:
-			# The node node_data doesn't end with the suffix found in the configuration file. Therefore,
-			# ignore it and continue with the next node_data
-			continue
+def get_controls_in_scene_gen(snapshot=None):
+	for control_node in inspect.get_controls_in_scene_gen(snapshot):
+		yield control_node
 
-		nodes_sel_list.clear()
-		nodes_sel_list.add(node_name)
 
-		yield nodes_sel_list.getDependNode(0)
+def get_controls_in_scene_list(snapshot=None):
+	return [n for n in get_controls_in_scene_gen(snapshot)]
 
 
-def get_controls_in_scene_list():
-	return [n for n in get_controls_in_scene_gen()]
+def get_joints_in_scene_gen(snapshot=None):
+	if snapshot is None:
+		snapshot = scenesnapshot.take_snapshot()
 
+	for joint_node in snapshot.nodes(snapshot.indices_of_type("joint")):
+		yield joint_node
 
-def get_joints_in_scene_gen():
-	joints_sel_list = om.MSelectionList()
 
-	for joint_name in cmds.ls(type="joint"):
-		joints_sel_list.clear()
-		joints_sel_list.add(joint_name)
-
-		yield joints_sel_list.getDependNode(0)
-
-
-def get_joints_in_scene_list():
-	return [j for j in get_controls_in_scene_gen()]
+def get_joints_in_scene_list(snapshot=None):
+	return [j for j in get_joints_in_scene_gen(snapshot)]
 
 
 @get_node_reference_decorator
 def geo_is_skinned(geo_node):
-	geo_dag_fn = om.MFnDagNode(geo_node)
+	scene_backend = backend.get_backend()
 
 	try:
-		if geo_node.hasFn(om.MFn.kTransform) is True:
-			geo_node = geo_dag_fn.getPath().extendToShape(0).node()
-
-		assert geo_node.hasFn(om.MFn.kShape) is True
-	except AssertionError:
-		raise ValueError("Unsupported type %s received as argument." % geo_node.apiTypeStr)
-	else:
-		geo_dag_fn.setObject(geo_node)
-
-	try:
-		input_geometry_plug = geo_dag_fn.findPlug("inMesh", False)
-		assert input_geometry_plug is not None and input_geometry_plug.isNull is False
-	except AssertionError:
-		print("Shape type %s is not supported." % geo_node.apiTypeStr)
+		if scene_backend.is_type(geo_node, "transform") is True:
+			geo_node = scene_backend.shapes(geo_node)[0]
 
-	shape_dep_graph_it = om.MItDependencyGraph(
-		input_geometry_plug, om.MFn.kSkinClusterFilter,
-		om.MItDependencyGraph.kUpstream, om.MItDependencyGraph.kDepthFirst
-	)
+		assert scene_backend.is_type(geo_node, "shape") is True
+	except(AssertionError, IndexError):
+		raise ValueError("Unsupported type %s received as argument." % scene_backend.node_type(geo_node))
 
 	try:
-		shape_dep_graph_it.currentNode()
-	except(RuntimeError, Exception):
+		return scene_backend.has_upstream(geo_node, "inMesh", "skinCluster")
+	except(ValueError, RuntimeError):
+		# Shapes with no inMesh, such as curves, can't be skinned as a mesh. Like in all_geos_are_skinned, they fail
 		return False
-	else:
-		return True
 
 
 @get_node_reference_decorator
 def geo_is_grouped(geo_node):
-	geo_parent_dag_fn = om.MFnDagNode(geo_node)
-
 	# Find the outermost parent for the mesh received as argument
-	while geo_parent_dag_fn.parent(0).hasFn(om.MFn.kTransform):
-		geo_parent_dag_fn.setObject(geo_parent_dag_fn.parent(0))
-
-	# Retrieve the discovery information from the configuration file
-	global GEO_GROUP_DISCOVERY_DATA
-
-	if GEO_GROUP_DISCOVERY_DATA is None:
-		GEO_GROUP_DISCOVERY_DATA = getconf.get_geo_group_discovery_data()
-
-	try:
-		GEO_GROUP_DISCOVERY_DATA["expression"].match(geo_parent_dag_fn.name()).group(0)
-	except KeyError:
-		# Expression is not a method of discovery. Therefore, ignore this error and continue on
-		pass
-	except AttributeError:
-		return False
-
-	try:
-		assert geo_parent_dag_fn.name().endswith(GEO_GROUP_DISCOVERY_DATA["suffix"]) is True
-	except KeyError:
-		# Suffix is not a method of discovery. Therefore, ignore this error and continue on
-		pass
-	except AssertionError:
-		return False
+	geo_root_name = backend.get_backend().root(geo_node).rpartition("|")[2]
 
-	return True
+	# Make sure it matches the configuration file's specifications for a geo group
+	return inspect.get_discovery_plan("geo_grp").accepts(geo_root_name)
 
 
 @get_node_reference_decorator
 def geo_is_outside_control(geo_node):
+	scene_backend = backend.get_backend()
+
 	try:
-		assert geo_node.hasFn(om.MFn.kMesh) is True
+		assert scene_backend.is_type(geo_node, "mesh") is True
 	except AssertionError:
 		# Assume the node received as argument is a mesh's transform node
 		geo_transform_node = geo_node
 	else:
 		# The node received as argument is a mesh. Therefore, retrieve its immediate parent node
-		geo_transform_node = om.MFnDagNode(geo_node).parent(0)
+		geo_transform_node = scene_backend.parent(geo_node)
 
 	# Retrieve the mesh's transform's immediate parent
-	geo_parent_dag_node = om.MFnDagNode(om.MFnDagNode(geo_transform_node).parent(0))
-
-	# Make sure the mesh's transform's parent doesn't match the configuration file's specifications for an animation
-	# control
-	global CONTROLS_DISCOVERY_DATA
-
-	if CONTROLS_DISCOVERY_DATA is None:
-		CONTROLS_DISCOVERY_DATA = getconf.get_controls_discovery_data()
+	geo_parent_node = scene_backend.parent(geo_transform_node)
 
 	try:
-		assert CONTROLS_DISCOVERY_DATA["expression"].match(geo_parent_dag_node.name()) is None
+		assert geo_parent_node is not None
 	except AssertionError:
-		return False
-	except(KeyError, AttributeError):
-		pass
+		# The mesh's transform is a child of the world
+		return True
 
+	# Make sure the mesh's transform's parent doesn't match the configuration file's specifications for an animation
+	# control
 	try:
-		assert geo_parent_dag_node.name().endswith(CONTROLS_DISCOVERY_DATA["suffix"]) is False
+		assert inspect.get_discovery_plan("controls").accepts(geo_parent_node.rpartition("|")[2]) is False
 	except AssertionError:
 		return False
-	except(KeyError, TypeError, RuntimeError):
-		pass
 
 	# Finally, make sure the mesh's transform's parent has no shape children. This will ensure the parent is a group
 	# and not a shape's or group of shape's transform node
-	for i in xrange(geo_parent_dag_node.childCount()):
+	for child_node in scene_backend.children(geo_parent_node):
 		try:
-			assert geo_parent_dag_node.child(i).hasFn(om.MFn.kTransform)
+			assert scene_backend.is_type(child_node, "transform")
 		except AssertionError:
 			return False
 	else:
@@ -241,18 +157,25 @@ def geo_is_outside_control(geo_node):
 
 @get_node_reference_decorator
 def geo_is_not_constrained(geo_node):
+	scene_backend = backend.get_backend()
+
 	try:
-		assert geo_node.hasFn(om.MFn.kMesh) is True
+		assert scene_backend.is_type(geo_node, "mesh") is True
 	except AssertionError:
 		geo_transform_node = geo_node
 	else:
-		geo_transform_node = om.MFnDagNode(geo_node).parent(0)
+		geo_transform_node = scene_backend.parent(geo_node)
 
-	geo_transform_dag_fn = om.MFnDagNode(geo_transform_node)
+	for child_node in scene_backend.children(geo_transform_node):
+		try:
+			assert scene_backend.is_type(child_node, "constraint") is False
+		except AssertionError:
+			return False
 
-	for i in xrange(geo_transform_dag_fn.childCount()):
+	# Constraints may also drive the geo from elsewhere in the graph
+	for source_node in scene_backend.connections(geo_transform_node, source=True, destination=False):
 		try:
-			assert geo_transform_dag_fn.child(i).hasFn(om.MFn.kConstraint) is False
+			assert scene_backend.is_type(source_node, "constraint") is False
 		except AssertionError:
 			return False
 	else:
@@ -261,263 +184,614 @@ def geo_is_not_constrained(geo_node):
 
 @get_node_reference_decorator
 def joint_is_hidden(joint_node):
-	return not om.MFnDagNode(joint_node).getPath().isVisible()
+	return not backend.get_backend().is_visible(joint_node)
 
 
 @get_node_reference_decorator
 def control_is_valid_type(control_node):
-	control_dag_fn = om.MFnDagNode(control_node)
-
-	global ACCEPTED_CONTROLS_TYPE
-
-	if ACCEPTED_CONTROLS_TYPE is None:
-		ACCEPTED_CONTROLS_TYPE = getconf.get_accepted_controls_type()
+	scene_backend = backend.get_backend()
+	accepted_types = getconf.get_find_spec("controls").types
 
 	try:
-		assert control_node.hasFn(om.MFn.kShape) is True
+		assert scene_backend.is_type(control_node, "shape") is True
 	except AssertionError:
 		# The node received as argument is not a shape node. Therefore, retrieve all of its shape nodesList and check
 		# if their type matches the accepted type for animation controls found in the configuration file
 
-		for i in xrange(control_dag_fn.getPath().numberOfShapesDirectlyBelow()):
+		for shape_node in scene_backend.shapes(control_node):
 			try:
-				assert cmds.nodeType(control_dag_fn.getPath().extendToShape(i).fullPathName()) == ACCEPTED_CONTROLS_TYPE
+				assert scene_backend.node_type(shape_node) in accepted_types
 			except AssertionError:
 				return False
 		else:
 			return True
 	else:
-		return cmds.nodeType(control_dag_fn.getPath().fullPathName()) == ACCEPTED_CONTROLS_TYPE
+		return scene_backend.node_type(control_node) in accepted_types
 
 
 @get_node_reference_decorator
 def control_has_offset_group(control_node):
+	scene_backend = backend.get_backend()
+
 	try:
-		assert control_node.hasFn(om.MFn.kTransform) is True
+		assert scene_backend.is_type(control_node, "transform") is True
 	except AssertionError:
 		# Assume the node received as argument is a shape node and retrieve its transform node
-		control_node = om.MFnDagNode(control_node).parent(0)
+		control_node = scene_backend.parent(control_node)
+
+	control_parent_node = scene_backend.parent(control_node)
 
 	try:
-		control_parent_dag_fn = om.MFnDagNode(om.MFnDagNode(control_node).parent(0))
-	except(TypeError, RuntimeError, Exception):
+		assert control_parent_node is not None
+	except AssertionError:
 		# The control node received as argument has no valid parent node
 		return False
 
-	# Retrieve the discovery data from the configuration file
-	global OFFSET_GROUPS_DISCOVERY_DATA
+	# Make sure the name of the parent node of the node received as argument matches the configuration file's
+	# specifications for an offset group
+	return inspect.get_discovery_plan("offset_grp").accepts(control_parent_node.rpartition("|")[2])
 
-	if OFFSET_GROUPS_DISCOVERY_DATA is None:
-		OFFSET_GROUPS_DISCOVERY_DATA = getconf.get_offset_groups_discovery_data()
-
-	try:
-		assert OFFSET_GROUPS_DISCOVERY_DATA["expression"].match(control_parent_dag_fn.name()) is not None
-	except AssertionError:
-		# The node_data of the parent node of the node received as argument doesn't match the regular expression
-		# found in the configuration file
-		return False
-	except(KeyError, RuntimeError):
-		# Expression is not a method for discovering offset groups. Therefore, ignore it and continue on
-		pass
 
-	try:
-		assert control_parent_dag_fn.name().endswith(OFFSET_GROUPS_DISCOVERY_DATA["suffix"]) is True
-	except AssertionError:
-		# The node_data of the parent node of the node received as argument doesn't end with the suffix found in the
-		# configuration file
-		return False
-	except(KeyError, RuntimeError):
-		# Suffix is not a method for discovering offset groups. Therefore, ignore it and continue on
-		pass
+def get_zeroed_tolerance():
+	tolerance = getconf.get_zeroed_tolerance()
 
-	return True
+	return channels.DEFAULT_TOLERANCE if tolerance is None else tolerance
 
 
 @get_node_reference_decorator
-def control_is_zeroed(control_node):
+def control_is_zeroed(control_node, tolerance=None):
+	scene_backend = backend.get_backend()
+
 	try:
-		assert control_node.hasFn(om.MFn.kTransform) is True
+		assert scene_backend.is_type(control_node, "transform") is True
 	except AssertionError:
-		control_node = om.MFnDagNode(control_node).parent(0)
+		control_node = scene_backend.parent(control_node)
 
-	control_dag_fn = om.MFnDagNode(control_node)
-	control_path = control_dag_fn.fullPathName()
+	if tolerance is None:
+		tolerance = get_zeroed_tolerance()
 
-	for ta in ("%s%s" % (at, ax) for at in ("translate", "rotate", "scale") for ax in ("X", "Y", "Z")):
-		try:
-			assert cmds.getAttr("{}.{}".format(control_path, ta), lock=True) is False
-		except AssertionError:
-			continue
-
-		if ta == "scale":
-			default_value = 1.0
-		else:
-			default_value = 0.0
+	return not channels.zeroed_masks(channels.read_channels([control_node]), tolerance).failed(0)
 
-		try:
-			assert cmds.getAttr("{}.{}".format(control_path, ta)) == default_value
-		except AssertionError:
-			return False
-	else:
-		return True
 
+def get_controls_zeroed_masks(snapshot=None, tolerance=None):
+	"""
+	Tells which channels of every control in the scene aren't zeroed. The channels of all the controls are read in one
+	bulk query and evaluated at once, see channels.zeroed_masks.
 
-def all_geos_are_skinned():
+	@return: channels.ChannelMasks
+	@rtype: channels.ChannelMasks
 	"""
-	Asserts all geometry in the scene has a skin cluster node connected to it. An exception is raised if said condition
-	is not met.
 
-	@return: True if all the geos in the scene are skinned. False otherwise.
-	@rtype: bool
+	if snapshot is None:
+		snapshot = scenesnapshot.take_snapshot()
+
+	if tolerance is None:
+		tolerance = get_zeroed_tolerance()
+
+	def evaluate():
+		data_planner = dataplan.get_data_planner(snapshot)
+		control_indices = inspect.classify_scene(snapshot).indices("controls")
+
+		# Shapes are checked through their transform
+		transforms = [t for t in data_planner.view(control_indices, ["transform"])["transform"] if t != -1]
+
+		return channels.zeroed_masks(channels.read_planned_channels(data_planner, transforms), tolerance)
+
+	return snapshot.memo(("zeroed_masks", tolerance), evaluate)
+
+
+def get_skinned_geos_set(snapshot=None):
 	"""
+	Returns the long names of all the meshes deformed by a skin cluster. The graph is walked downstream once, from all
+	the skin clusters in the scene at the same time, instead of upstream from each mesh.
 
-	geo_ref_sel_list = om.MSelectionList()
-	map(geo_ref_sel_list.add, cmds.ls(type="mesh"))
+	@return: {str,...}
+	@rtype: frozenset
+	"""
 
-	non_skinned_geo_list = []
-	shape_dag_fn = om.MFnDagNode()
+	if snapshot is None:
+		snapshot = scenesnapshot.take_snapshot()
 
-	for shape_node in (geo_ref_sel_list.getDependNode(i) for i in xrange(geo_ref_sel_list.length())):
-		try:
-			if shape_node.hasFn(om.MFn.kTransform) is True:
-				shape_node = om.MFnDagNode(shape_node).getPath().extendToShape(0)
+	return snapshot.memo("skinned_geos", lambda: scheduler.run_pass(_iter_walk_from_skin_clusters(snapshot)))
 
-			assert shape_node.hasFn(om.MFn.kShape) is True
-		except AssertionError:
-			raise ValueError("Unsupported type %s received as argument." % shape_node.apiTypeStr)
 
-		try:
-			input_geometry_plug = om.MFnDagNode(shape_node).findPlug("inMesh", False)
-			assert input_geometry_plug is not None and input_geometry_plug.isNull is False
-		except AssertionError:
-			print("Shape type %s is not supported." % shape_node.apiTypeStr)
-			continue
+def _iter_walk_from_skin_clusters(snapshot, chunk_size=None):
+	skin_cluster_names = [snapshot.names[i] for i in snapshot.indices_of_type("skinCluster")]
+	visited = set()
+	skinned_geos = set()
 
-		shape_dep_graph_it = om.MItDependencyGraph(
-			input_geometry_plug, om.MFn.kSkinClusterFilter,
-			om.MItDependencyGraph.kUpstream, om.MItDependencyGraph.kDepthFirst
+	for start, stop in scheduler.chunks(len(skin_cluster_names), chunk_size):
+		skinned_geos.update(
+			snapshot.backend.downstream(skin_cluster_names[start:stop], "mesh", visited, geometry=True)
 		)
 
-		try:
-			shape_dep_graph_it.currentNode()
-		except(RuntimeError, Exception):
-			shape_dag_fn.setObject(shape_node)
-			non_skinned_geo_list.append(shape_dag_fn.name())
+		yield scheduler.PassStep("skinned_geos", stop, len(skin_cluster_names))
 
-	print("\n".join(non_skinned_geo_list))
+	yield frozenset(skinned_geos)
 
 
-def all_geos_are_grouped():
-	ungrouped_shape_nodes_list = []
+def iter_skinned_geos(snapshot, chunk_size=WALK_CHUNK_SIZE):
+	"""
+	Resumable counterpart of get_skinned_geos_set, walking downstream from chunk_size skin clusters per step. Nodes
+	walked from a previous step aren't walked again.
 
-	for geo in get_geos_in_scene_gen():
-		try:
-			assert geo_is_grouped(geo) is True
-		except AssertionError:
-			ungrouped_shape_nodes_list.append(geo)
+	@return: (scheduler.PassStep,...)
+	@rtype: generator
+	"""
 
-	try:
-		assert len(ungrouped_shape_nodes_list) == 0
-	except AssertionError:
-		return False
-	else:
-		return True
+	return snapshot.iter_memo("skinned_geos", lambda: _iter_walk_from_skin_clusters(snapshot, chunk_size))
 
 
-def all_geos_are_outside_controls():
-	geos_in_controls = []
+def get_constrained_indices_set(snapshot=None):
+	"""
+	Returns the indices of all the nodes driven by a constraint, built from a single sweep over the constraint nodes
+	and their outgoing connections. Nodes with a constraint among their children are included as well, regardless of
+	its connections.
 
-	for geo in get_geos_in_scene_gen():
-		try:
-			assert geo_is_outside_control(geo) is True
-		except AssertionError:
-			geos_in_controls.append(geo)
+	@return: {int,...}
+	@rtype: frozenset
+	"""
 
-	try:
-		assert len(geos_in_controls) == 0
-	except AssertionError:
-		return False
-	else:
-		return True
+	if snapshot is None:
+		snapshot = scenesnapshot.take_snapshot()
 
+	return snapshot.memo("constrained_indices", lambda: scheduler.run_pass(_iter_sweep_constraints(snapshot)))
 
-def all_geos_are_not_constrained():
-	constrained_geos = []
 
-	for geo in get_geos_in_scene_gen():
-		try:
-			assert geo_is_not_constrained(geo) is True
-		except AssertionError:
-			constrained_geos.append(geo)
+def _iter_sweep_constraints(snapshot, chunk_size=None):
+	constraint_indices = snapshot.indices_of_type("constraint")
+	constrained = set()
 
-	try:
-		assert len(constrained_geos) == 0
-	except AssertionError:
-		return False
-	else:
-		return True
+	for start, stop in scheduler.chunks(len(constraint_indices), chunk_size):
+		chunk = constraint_indices[start:stop]
+
+		for i in chunk:
+			if snapshot.parents[i] != -1:
+				constrained.add(snapshot.parents[i])
+
+		# The outgoing connections of every constraint in the chunk are listed at once
+		connections = snapshot.backend.bulk_connections([snapshot.names[i] for i in chunk], source=False)
+
+		for _, target_name in connections:
+			try:
+				constrained.add(snapshot.index(target_name))
+			except KeyError:
+				pass
+
+		yield scheduler.PassStep("constrained_indices", stop, len(constraint_indices))
+
+	yield frozenset(constrained)
+
+
+def iter_constrained_indices(snapshot, chunk_size=WALK_CHUNK_SIZE):
+	"""
+	Resumable counterpart of get_constrained_indices_set, sweeping chunk_size constraints per step.
+
+	@return: (scheduler.PassStep,...)
+	@rtype: generator
+	"""
 
+	return snapshot.iter_memo("constrained_indices", lambda: _iter_sweep_constraints(snapshot, chunk_size))
+
+
+# ##############################
+# Snapshot predicates
+# ##############################
+
+# Each predicate below evaluates a list of snapshot indices at once and returns a list of booleans aligned with it.
+# They back both the all_* checks and the *_many predicates
+
+
+def _transform_indices(snapshot, indices):
+	# Shapes are checked through their transform
+	transform_types = snapshot.backend.expand_types("transform")
+
+	return [i if snapshot.types[i] in transform_types else snapshot.parents[i] for i in indices]
+
+
+def _geos_are_skinned(snapshot, indices):
+	scene_hierarchy = snapshot.hierarchy()
+	transform_types = snapshot.backend.expand_types("transform")
+	shape_types = snapshot.backend.expand_types("shape")
+	skinned_geos = get_skinned_geos_set(snapshot)
+	results = []
+
+	for i in indices:
+		if snapshot.types[i] in transform_types:
+			i = next((c for c in scene_hierarchy.children(i) if snapshot.types[c] in shape_types), i)
 
-def all_joints_are_hidden():
-	for joint in get_joints_in_scene_gen():
 		try:
-			assert joint_is_hidden(joint)
+			assert snapshot.types[i] in shape_types
 		except AssertionError:
-			return False
-	else:
-		return True
+			raise ValueError("Unsupported type %s received as argument." % snapshot.types[i])
 
+		results.append(snapshot.names[i] in skinned_geos)
 
-def no_anim_curves_in_scene():
-	return len(get_anim_curves_in_scene_list()) == 0
+	return results
 
 
-def all_controls_are_valid_type():
-	non_curved_controls_list = []
+def _geos_are_grouped(snapshot, indices):
+	scene_hierarchy = snapshot.hierarchy()
+	geo_grp_plan = inspect.get_discovery_plan("geo_grp")
+	accepted_roots = {}
+	results = []
+
+	for i in indices:
+		# Geos share few roots. Therefore, each root is matched against the geo group's specifications only once
+		root = scene_hierarchy.root(i)
 
-	for control_node in get_controls_in_scene_gen():
 		try:
-			assert control_is_valid_type(control_node) is True
-		except AssertionError:
-			non_curved_controls_list.append(control_node)
+			results.append(accepted_roots[root])
+		except KeyError:
+			accepted_roots[root] = geo_grp_plan.accepts(snapshot.short_names[root])
+			results.append(accepted_roots[root])
+
+	return results
 
-	try:
-		assert len(non_curved_controls_list) == 0
-	except AssertionError:
-		return False
-	else:
-		return True
 
+def _geos_are_outside_controls(snapshot, indices):
+	scene_hierarchy = snapshot.hierarchy()
+	controls_plan = inspect.get_discovery_plan("controls")
+	transform_types = snapshot.backend.expand_types("transform")
+	outside_parents = {-1: True}
+	results = []
 
-def all_controls_are_zeroed():
-	non_zeroed_list = []
+	for geo_transform in _transform_indices(snapshot, indices):
+		geo_parent = scene_hierarchy.parents[geo_transform] if geo_transform != -1 else -1
 
-	for control_node in get_controls_in_scene_gen():
 		try:
-			assert control_is_zeroed(control_node)
-		except AssertionError:
-			non_zeroed_list.append(control_node)
+			results.append(outside_parents[geo_parent])
+		except KeyError:
+			# The parent mustn't match the specifications for an animation control, and has to be a group: all of its
+			# children have to be transforms
+			outside_parents[geo_parent] = (
+				controls_plan.accepts(snapshot.short_names[geo_parent]) is False and
+				all(snapshot.types[c] in transform_types for c in scene_hierarchy.children(geo_parent))
+			)
+			results.append(outside_parents[geo_parent])
+
+	return results
+
+
+def _geos_are_not_constrained(snapshot, indices):
+	constrained = get_constrained_indices_set(snapshot)
+
+	return [geo_transform not in constrained for geo_transform in _transform_indices(snapshot, indices)]
+
+
+def _joints_are_hidden(snapshot, indices):
+	scene_visibility = visibility.get_visibility(snapshot)
+
+	return [not scene_visibility[i] for i in indices]
+
+
+def _controls_are_valid_type(snapshot, indices):
+	accepted_types = getconf.get_find_spec("controls").types
+
+	# Shapes are checked on their own type, transforms on the types of all of their shapes
+	view = dataplan.get_data_planner(snapshot).view(indices, ["shape_types"])
+
+	return [all(t in accepted_types for t in shape_types) for shape_types in view["shape_types"]]
+
+
+def _controls_have_offset_groups(snapshot, indices):
+	offset_grp_plan = inspect.get_discovery_plan("offset_grp")
+	view = dataplan.get_data_planner(snapshot).view(indices, ["parent_name"])
+
+	return [n is not None and offset_grp_plan.accepts(n) is True for n in view["parent_name"]]
+
+
+def _controls_are_zeroed(snapshot, indices, tolerance=None):
+	if tolerance is None:
+		tolerance = get_zeroed_tolerance()
+
+	return channels.are_zeroed(dataplan.get_data_planner(snapshot), indices, tolerance)
+
+
+# ##############################
+# Checks
+# ##############################
+
+
+def all_geos_are_skinned(snapshot=None):
+	"""
+	Lists all the geometry in the scene with no skin cluster node connected to it.
+
+	@return: The short names of the geos which aren't skinned. An empty list if all the geos in the scene are skinned
+	@rtype: list
+	"""
+
+	if snapshot is None:
+		snapshot = scenesnapshot.take_snapshot()
+
+	skinned_geos = get_skinned_geos_set(snapshot)
+
+	return [snapshot.short_names[i] for i in snapshot.indices_of_type("mesh") if snapshot.names[i] not in skinned_geos]
+
+
+def all_geos_are_grouped(snapshot=None):
+	if snapshot is None:
+		snapshot = scenesnapshot.take_snapshot()
+
+	return all(_geos_are_grouped(snapshot, snapshot.indices_of_type("mesh")))
+
+
+def all_geos_are_outside_controls(snapshot=None):
+	if snapshot is None:
+		snapshot = scenesnapshot.take_snapshot()
+
+	return all(_geos_are_outside_controls(snapshot, snapshot.indices_of_type("mesh")))
+
+
+def all_geos_are_not_constrained(snapshot=None):
+	if snapshot is None:
+		snapshot = scenesnapshot.take_snapshot()
+
+	return all(_geos_are_not_constrained(snapshot, snapshot.indices_of_type("mesh")))
+
+
+def all_joints_are_hidden(snapshot=None):
+	"""
+	Lists all the joints in the scene which are visible. The visibility of every node is computed in a single top-down
+	pass, see visibility.compute_visibility.
+
+	@return: The short names of the visible joints. An empty list if all the joints in the scene are hidden
+	@rtype: list
+	"""
+
+	if snapshot is None:
+		snapshot = scenesnapshot.take_snapshot()
+
+	joint_indices = snapshot.indices_of_type("joint")
+
+	return [snapshot.short_names[i] for i, h in zip(joint_indices, _joints_are_hidden(snapshot, joint_indices)) if not h]
+
+
+def no_anim_curves_in_scene(snapshot=None):
+	return len(get_anim_curves_in_scene_list(snapshot)) == 0
+
+
+def all_controls_are_valid_type(snapshot=None):
+	if snapshot is None:
+		snapshot = scenesnapshot.take_snapshot()
+
+	return all(_controls_are_valid_type(snapshot, inspect.classify_scene(snapshot).indices("controls")))
+
+
+def all_controls_are_zeroed(snapshot=None):
+	return len(get_controls_zeroed_masks(snapshot).failed_names()) == 0
+
+
+def all_controls_have_offset_groups(snapshot=None):
+	if snapshot is None:
+		snapshot = scenesnapshot.take_snapshot()
+
+	return all(_controls_have_offset_groups(snapshot, inspect.classify_scene(snapshot).indices("controls")))
+
+
+# ##############################
+# Batch predicates
+# ##############################
+
+
+def _many(snapshot_predicate):
+	"""
+	Turns the snapshot predicate received as argument into one accepting a list of node references or names. All the
+	nodes are resolved in a single bulk query, and the result is a list of booleans aligned with the input.
+	"""
+
+	def many(nodes, snapshot=None, **kwargs):
+		if snapshot is None:
+			snapshot = scenesnapshot.take_snapshot()
+
+		indices = [snapshot.index(n) for n in snapshot.backend.names_of(nodes)]
+
+		return snapshot_predicate(snapshot, indices, **kwargs)
+
+	return many
+
+
+geo_is_skinned_many = _many(_geos_are_skinned)
+geo_is_grouped_many = _many(_geos_are_grouped)
+geo_is_outside_control_many = _many(_geos_are_outside_controls)
+geo_is_not_constrained_many = _many(_geos_are_not_constrained)
+joint_is_hidden_many = _many(_joints_are_hidden)
+control_is_valid_type_many = _many(_controls_are_valid_type)
+control_has_offset_group_many = _many(_controls_have_offset_groups)
+control_is_zeroed_many = _many(_controls_are_zeroed)
+
+
+ALL_CHECKS = (
+	all_geos_are_skinned,
+	all_geos_are_grouped,
+	all_geos_are_outside_controls,
+	all_geos_are_not_constrained,
+	all_joints_are_hidden,
+	no_anim_curves_in_scene,
+	all_controls_are_valid_type,
+	all_controls_are_zeroed,
+	all_controls_have_offset_groups
+)
+
 
+def run_all_checks(snapshot=None):
+	"""
+	Runs every check in the scene. The scene is traversed only once: all the checks, and the discovery generators they
+	use, share the same snapshot.
+
+	@return: The result of each check keyed by the check's name
+	@rtype: OrderedDict
+	"""
+
+	if snapshot is None:
+		snapshot = scenesnapshot.take_snapshot()
+
+	results = OrderedDict()
+
+	for check in ALL_CHECKS:
+		with profiling.span(check.__name__, "check", _check_nodes(check, snapshot) if profiling.is_enabled() else 0):
+			results[check.__name__] = check(snapshot)
+
+	return results
+
+
+# ##############################
+# Resumable checks
+# ##############################
+
+
+def _mesh_indices(snapshot):
+	return snapshot.indices_of_type("mesh")
+
+
+def _joint_indices(snapshot):
+	return snapshot.indices_of_type("joint")
+
+
+def _control_indices(snapshot):
+	return inspect.classify_scene(snapshot).indices("controls")
+
+
+# Checks which can be evaluated chunk by chunk: the nodes they cover, the snapshot predicate evaluating them, and whether
+# the check returns its failing nodes rather than whether they all pass
+STEPPED_CHECKS = {
+	"all_geos_are_skinned": (_mesh_indices, _geos_are_skinned, True),
+	"all_geos_are_grouped": (_mesh_indices, _geos_are_grouped, False),
+	"all_geos_are_outside_controls": (_mesh_indices, _geos_are_outside_controls, False),
+	"all_geos_are_not_constrained": (_mesh_indices, _geos_are_not_constrained, False),
+	"all_joints_are_hidden": (_joint_indices, _joints_are_hidden, True),
+	"all_controls_are_valid_type": (_control_indices, _controls_are_valid_type, False),
+	"all_controls_are_zeroed": (_control_indices, _controls_are_zeroed, False),
+	"all_controls_have_offset_groups": (_control_indices, _controls_have_offset_groups, False)
+}
+
+
+def _check_nodes(check, snapshot):
 	try:
-		assert len(non_zeroed_list) == 0
-	except AssertionError:
-		return False
-	else:
-		return True
+		return len(STEPPED_CHECKS[check.__name__][0](snapshot))
+	except KeyError:
+		return 0
 
 
-def all_controls_have_offset_groups():
-	no_offset_groups_list = []
+def iter_check(check, snapshot, chunk_size=CHECK_CHUNK_SIZE):
+	"""
+	Runs the check received as argument as a resumable generator, evaluating chunk_size nodes per step. Checks which
+	can't be split run in a single step.
 
-	for control_node in get_controls_in_scene_gen():
-		try:
-			assert control_has_offset_group(control_node) is True
-		except AssertionError:
-			no_offset_groups_list.append(control_node)
+	@return: (CheckStep,...), the last one finished
+	@rtype: generator
+	"""
+
+	check_name = check.__name__
 
 	try:
-		assert len(no_offset_groups_list) == 0
-	except AssertionError:
-		return False
-	else:
-		return True
+		get_indices, snapshot_predicate, lists_failed = STEPPED_CHECKS[check_name]
+	except KeyError:
+		with profiling.span(check_name, "check"):
+			result = check(snapshot)
+
+		yield CheckStep(check_name, 1, 1, 0, True, result)
+		return
+
+	indices = get_indices(snapshot)
+	failed = []
+
+	for k in range(0, len(indices), chunk_size):
+		chunk = indices[k:k + chunk_size]
+
+		with profiling.span(check_name, "check", len(chunk)):
+			failed.extend(snapshot.short_names[i] for i, r in zip(chunk, snapshot_predicate(snapshot, chunk)) if not r)
+
+		if k + chunk_size < len(indices):
+			yield CheckStep(check_name, k + chunk_size, len(indices), len(failed), False, None)
+
+	yield CheckStep(
+		check_name, len(indices), len(indices), len(failed), True, failed if lists_failed else not failed
+	)
+
+
+def iter_scene_passes(snapshot, chunk_size=scheduler.PASS_CHUNK_SIZE, attribute_chunk_size=CHECK_CHUNK_SIZE):
+	"""
+	Computes, as a single resumable generator, the data derived from the whole snapshot the checks share: its
+	hierarchy, its classification, the skinned geos, the visibility of its nodes and the constrained nodes. Data
+	computed already is skipped. Passes reading attributes from the scene step over attribute_chunk_size nodes at a
+	time, the rest over chunk_size nodes.
+
+	@return: (scheduler.PassStep,...)
+	@rtype: generator
+	"""
+
+	# Passes are generators, so none starts before the previous one is done
+	scene_passes = (
+		snapshot.iter_hierarchy(chunk_size),
+		inspect.iter_classify_scene(snapshot, chunk_size),
+		iter_skinned_geos(snapshot),
+		visibility.iter_visibility(snapshot, attribute_chunk_size),
+		iter_constrained_indices(snapshot)
+	)
+
+	for scene_pass in scene_passes:
+		for step in scene_pass:
+			yield step
+
+
+def iter_all_checks(snapshot=None, chunk_size=CHECK_CHUNK_SIZE, pass_chunk_size=scheduler.PASS_CHUNK_SIZE):
+	"""
+	Runs every check as a single resumable generator, so a caller can run them in slices while keeping its UI
+	responsive, see scheduler.SlicedRun. The snapshot, when none is received as argument, and the data the checks
+	share are computed in steps first, pass_chunk_size nodes per step, reporting their progress as scheduler.PassStep.
+	The finished steps hold the same results run_all_checks returns.
+
+	@return: (scheduler.PassStep,...), then (CheckStep,...)
+	@rtype: generator
+	"""
+
+	if snapshot is None:
+		for step in scenesnapshot.iter_take_snapshot(chunk_size=pass_chunk_size):
+			if isinstance(step, scheduler.PassStep):
+				yield step
+			else:
+				snapshot = step
+
+	for step in iter_scene_passes(snapshot, pass_chunk_size, chunk_size):
+		yield step
+
+	for check in ALL_CHECKS:
+		for step in iter_check(check, snapshot, chunk_size):
+			yield step
+
+
+INDEXED_CHECKS = (
+	("geo", geo_is_skinned),
+	("geo", geo_is_grouped),
+	("geo", geo_is_outside_control),
+	("geo", geo_is_not_constrained),
+	("joints", joint_is_hidden),
+	("controls", control_is_valid_type),
+	("controls", control_is_zeroed),
+	("controls", control_has_offset_group)
+)
+
+
+def run_indexed_checks(scene_index=None):
+	"""
+	Runs every per node check through the persistent scene index. Only the nodes changed since the previous run are
+	re-classified and checked again, the rest reuse their previous results.
+
+	@return: The names of the nodes failing each check, keyed by the check's name
+	@rtype: OrderedDict
+	"""
+
+	if scene_index is None:
+		scene_index = inspect.get_scene_index()
+
+	failed = OrderedDict()
+
+	for title, predicate in INDEXED_CHECKS:
+		results = scene_index.run_check(
+			predicate.__name__, title, lambda node_id, predicate=predicate: predicate(scene_index.long_name(node_id))
+		)
+
+		failed[predicate.__name__] = sorted(scene_index.long_name(n) for n, r in results.items() if r is not True)
+
+	return failed
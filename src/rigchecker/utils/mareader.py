@@ -0,0 +1,314 @@
+import io
+import re
+
+from . import backend
+
+maya_useNewAPI = True
+
+# MEL tokens: quoted strings (closed or running until the end of the line), the statement terminator and bare words
+TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"?|;|[^\s;"]+')
+
+# Attributes kept by the reader, by the names a Maya ASCII file can use for them. Any other attribute is skipped
+# without being buffered, mesh and curve data included
+ATTRIBUTES = {
+	"t": ("translateX", "translateY", "translateZ"),
+	"translate": ("translateX", "translateY", "translateZ"),
+	"r": ("rotateX", "rotateY", "rotateZ"),
+	"rotate": ("rotateX", "rotateY", "rotateZ"),
+	"s": ("scaleX", "scaleY", "scaleZ"),
+	"scale": ("scaleX", "scaleY", "scaleZ"),
+	"v": ("visibility",),
+	"lodv": ("lodVisibility",),
+	"io": ("intermediateObject",),
+	"ove": ("overrideEnabled",),
+	"ovv": ("overrideVisibility",)
+}
+
+for _at, _long_at in (("t", "translate"), ("r", "rotate"), ("s", "scale")):
+	for _ax in ("X", "Y", "Z"):
+		ATTRIBUTES[_at + _ax.lower()] = (_long_at + _ax,)
+		ATTRIBUTES[_long_at + _ax] = (_long_at + _ax,)
+
+for _long_names in list(ATTRIBUTES.values()):
+	if len(_long_names) == 1:
+		ATTRIBUTES[_long_names[0]] = _long_names
+
+# Long names of the attributes connections are looked up by, keyed by node type. "*" applies to every type
+CONNECTION_ATTRIBUTES = {
+	"*": {
+		"og": "outputGeometry", "ip": "input", "o": "output", "ws": "worldSpace", "w": "worldMesh", "di": "drawInfo",
+		"do": "drawOverride"
+	},
+	"mesh": {"i": "inMesh", "o": "outMesh", "w": "worldMesh"},
+	"nurbsCurve": {"cr": "create", "l": "local", "ws": "worldSpace"}
+}
+
+# setAttr flags followed by a value
+SET_ATTR_FLAGS = frozenset(["-k", "-l", "-cb", "-s", "-type", "-c", "-keyable", "-lock", "-channelBox", "-size"])
+
+BOOLEANS = {"on": True, "yes": True, "true": True, "off": False, "no": False, "false": False}
+
+
+def _unquote(token):
+	if token.startswith('"'):
+		return token[1:-1].replace('\\"', '"').replace("\\\\", "\\") if token.endswith('"') else token[1:]
+
+	return token
+
+
+def _is_number(token):
+	try:
+		float(token)
+	except ValueError:
+		return False
+
+	return True
+
+
+def _value(token):
+	try:
+		return BOOLEANS[token]
+	except KeyError:
+		return float(token)
+
+
+class MaReader(object):
+	"""
+	Streaming reader for Maya ASCII files. Statements are tokenized line by line and dispatched as soon as they end.
+	Only createNode, parent, select, connectAttr and the setAttr statements of the attributes in ATTRIBUTES are kept.
+	Every other statement, mesh and curve data included, is skipped as it streams by, so memory use depends on the
+	number of nodes in the file and not on its size.
+
+	The nodes are stored in an in-memory backend, so the same discovery and checks used in Maya run on the result.
+	Referenced files aren't followed.
+	"""
+
+	def __init__(self, scene_backend=None):
+		self.scene = backend.MemoryBackend() if scene_backend is None else scene_backend
+
+		self.lines = 0
+		self.bytes_read = 0
+		self.statements = 0
+		self.skipped_statements = 0
+
+		self.__current_node = None
+		self.__tokens = []
+		self.__skipping = False
+		self.__unnamed_count = 0
+
+		self.__handlers = {
+			"createNode": self.__create_node,
+			"setAttr": self.__set_attr,
+			"connectAttr": self.__connect_attr,
+			"parent": self.__parent,
+			"select": self.__select
+		}
+
+	def feed(self, line):
+		"""
+		Reads the line received as argument.
+		"""
+
+		self.lines += 1
+		self.bytes_read += len(line)
+
+		if self.__skipping is True and '"' not in line:
+			# Fast path for the bulk of the file: the lines of skipped statements (vertices, faces, weights...) are
+			# dropped without being tokenized
+			end = line.find(";")
+
+			if end == -1:
+				return
+
+			self.__end_statement()
+			line = line[end + 1:]
+
+		if not self.__tokens and self.__skipping is False and line.lstrip().startswith("//"):
+			return
+
+		for token in TOKEN_RE.findall(line):
+			if token == ";":
+				self.__end_statement()
+			elif self.__skipping is False:
+				self.__add_token(token)
+
+	def __add_token(self, token):
+		if not self.__tokens and token not in self.__handlers:
+			self.__skipping = True
+			return
+
+		self.__tokens.append(token)
+
+		# setAttr statements are skipped as soon as their attribute turns out to be one the reader doesn't keep
+		if self.__tokens[0] == "setAttr" and token.startswith('"') and self.__tokens[-2:-1] != ["-type"]:
+			attribute = _unquote(token).rpartition(".")[2]
+
+			if attribute not in ATTRIBUTES:
+				self.__tokens = []
+				self.__skipping = True
+
+	def __end_statement(self):
+		self.statements += 1
+
+		if self.__skipping is True:
+			self.skipped_statements += 1
+		elif self.__tokens:
+			try:
+				self.__handlers[self.__tokens[0]](self.__tokens[1:])
+			except backend.AmbiguousNameError as e:
+				# Guessing would build a different scene than the file's
+				raise backend.AmbiguousNameError("%s (line %i)" % (e, self.lines))
+			except(ValueError, IndexError, KeyError):
+				# Malformed statement or unknown node. Therefore, ignore it and continue on
+				self.skipped_statements += 1
+
+		self.__tokens = []
+		self.__skipping = False
+
+	def __find_node(self, name):
+		# Names may be partial paths (grp|ctrl), resolved by the backend like Maya does. Ambiguous ones raise
+		try:
+			return self.scene.name_of(name.lstrip(":") if name.startswith(":") else name)
+		except backend.AmbiguousNameError:
+			raise
+		except ValueError:
+			return None
+
+	# ##############################
+	# Statements
+	# ##############################
+
+	def __create_node(self, args):
+		node_type = args[0]
+		flags = {}
+		i = 1
+
+		while i < len(args):
+			if args[i] in ("-n", "-p", "-name", "-parent"):
+				flags[args[i][:2]] = _unquote(args[i + 1])
+				i += 2
+			else:
+				flags[args[i]] = True
+				i += 1
+
+		try:
+			name = flags["-n"]
+		except KeyError:
+			self.__unnamed_count += 1
+			name = "%s%i" % (node_type, self.__unnamed_count)
+
+		parent = flags.get("-p")
+
+		if parent is not None:
+			parent = self.__find_node(parent)
+
+		try:
+			self.__current_node = self.scene.create_node(name, node_type, parent)
+		except ValueError:
+			# Shared nodes may already exist
+			self.__current_node = self.__find_node(name if parent is None else parent + "|" + name)
+
+	def __set_attr(self, args):
+		lock = None
+		attribute = None
+		values = []
+		i = 0
+
+		while i < len(args):
+			token = args[i]
+
+			if token in SET_ATTR_FLAGS:
+				if token in ("-l", "-lock"):
+					lock = BOOLEANS.get(args[i + 1], False)
+
+				i += 2
+				continue
+			elif token.startswith("-") and not _is_number(token):
+				# Negative values start with a dash as well. Therefore, only what isn't a number is a flag
+				i += 1
+				continue
+
+			if attribute is None:
+				attribute = _unquote(token)
+			else:
+				values.append(_value(token))
+
+			i += 1
+
+		node_name, _, attribute = attribute.rpartition(".")
+		node_name = self.__current_node if not node_name else self.__find_node(node_name)
+
+		if node_name is None:
+			return
+
+		for k, long_attribute in enumerate(ATTRIBUTES[attribute]):
+			if k < len(values):
+				self.scene.set_attr(node_name, long_attribute, values[k], lock=lock)
+			elif lock is not None:
+				self.scene.set_lock(node_name, long_attribute, lock)
+
+	def __connect_attr(self, args):
+		plugs = [_unquote(a) for a in args if not a.startswith("-")][:2]
+		connection = []
+
+		for plug in plugs:
+			node_name, _, attribute = plug.partition(".")
+			node_name = self.__find_node(node_name)
+
+			if node_name is None:
+				return
+
+			attribute = attribute.partition(".")[0].partition("[")[0]
+			node_type = self.scene.node_type(node_name)
+			attribute = CONNECTION_ATTRIBUTES.get(node_type, {}).get(
+				attribute, CONNECTION_ATTRIBUTES["*"].get(attribute, attribute)
+			)
+
+			connection.append("%s.%s" % (node_name, attribute))
+
+		self.scene.connect_attr(*connection)
+
+	def __parent(self, args):
+		if "-add" in args or "-addObject" in args:
+			# Instancing isn't modelled
+			return
+
+		names = [_unquote(a) for a in args if not a.startswith("-")]
+
+		if "-w" in args or "-world" in args:
+			children, parent = names, None
+		else:
+			children, parent = names[:-1], self.__find_node(names[-1])
+
+		for c in children:
+			child = self.__find_node(c)
+
+			if child is not None:
+				self.scene.reparent(child, parent)
+
+	def __select(self, args):
+		names = [_unquote(a) for a in args if not a.startswith("-")]
+		self.__current_node = self.__find_node(names[0]) if names else None
+
+
+def read_ma(file_path, scene_backend=None):
+	"""
+	Reads the Maya ASCII file received as argument into an in-memory backend. The file is streamed, never held in
+	memory as a whole.
+
+	@return: The backend holding the file's nodes
+	@rtype: backend.MemoryBackend
+	"""
+
+	try:
+		assert file_path.lower().endswith(".ma")
+	except AssertionError:
+		raise ValueError("Unsupported file %s. Only Maya ASCII files can be read." % file_path)
+
+	reader = MaReader(scene_backend)
+
+	with io.open(file_path, "r", encoding="utf-8", errors="replace") as ma_file:
+		for line in ma_file:
+			reader.feed(line)
+
+	return reader.scene
@@ -0,0 +1,99 @@
+from . import backend
+
+maya_useNewAPI = True
+
+
+def expand_types(types):
+	"""
+	Returns the types received as argument along with every type derived from them, the same way ls(type=...) matches
+	nodes. Derived types are resolved by the current backend, once per type.
+
+	@return: frozenset(str,...)
+	@rtype: frozenset
+	"""
+
+	return backend.get_backend().expand_types(types)
+
+
+class NodeTypeMap(object):
+	"""
+	Name to type map for the whole scene. Type filters are answered in memory from a per type index, so no node is
+	ever typed through its own nodeType query.
+	"""
+
+	def __init__(self, names, types, indexed=True):
+		"""
+		@param indexed: When False, the types are indexed later on, in steps, see index_types.
+		"""
+
+		self.names = names
+		self.types = types
+
+		self.__name_index = None
+		self.__type_index = {}
+
+		if indexed is True:
+			self.index_types(0, len(types))
+
+	def index_types(self, start, stop):
+		"""
+		Indexes the types of the nodes from start up to stop.
+		"""
+
+		type_index = self.__type_index
+
+		for i in range(start, stop):
+			try:
+				type_index[self.types[i]].append(i)
+			except KeyError:
+				type_index[self.types[i]] = [i]
+
+	def __len__(self):
+		return len(self.types)
+
+	def type_of(self, name):
+		if self.__name_index is None:
+			self.__name_index = dict((n, i) for i, n in enumerate(self.names))
+
+		return self.types[self.__name_index[name]]
+
+	def scene_types(self):
+		return frozenset(self.__type_index)
+
+	def indices_of_type(self, types, derived=True):
+		"""
+		Returns the indices of all the nodes whose type is one of the types received as argument, sorted in traversal
+		order. When derived is True, nodes of a type derived from any of them are included as well.
+
+		@return: [int,...]
+		@rtype: list
+		"""
+
+		if derived is True:
+			types = expand_types(types)
+		elif not isinstance(types, (list, tuple, set, frozenset)):
+			types = [types]
+
+		indices = []
+
+		for t in types:
+			indices.extend(self.__type_index.get(t, []))
+
+		return sorted(indices)
+
+	def names_of_type(self, types, derived=True):
+		return [self.names[i] for i in self.indices_of_type(types, derived=derived)]
+
+
+def get_node_type_map(scene_backend=None):
+	"""
+	Returns a name to type map for every node in the scene, fetched in one sweep.
+
+	@return: NodeTypeMap
+	@rtype: NodeTypeMap
+	"""
+
+	if scene_backend is None:
+		scene_backend = backend.get_backend()
+
+	return NodeTypeMap(*scene_backend.list_nodes())
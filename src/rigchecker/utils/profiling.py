@@ -0,0 +1,308 @@
+import json
+import os
+import threading
+
+from collections import Counter, OrderedDict
+
+from . import backend
+
+try:
+	from time import perf_counter as clock
+except ImportError:
+	# Python 2
+	from time import time as clock
+
+maya_useNewAPI = True
+
+# Profiler recording the current run, None while profiling is off. Instrumented code only checks this global, which
+# keeps the cost of instrumentation close to nothing when off
+PROFILER = None
+
+
+def _per_call(*kinds):
+	return lambda *args, **kwargs: [(k, 1) for k in kinds]
+
+
+def _per_node(kind, *kinds):
+	return lambda names, *args, **kwargs: [(kind, len(names))] + [(k, 1) for k in kinds]
+
+
+def _per_value(kind, value_kind):
+	return lambda names, attributes, *args, **kwargs: [(kind, len(names)), (value_kind, len(names) * len(attributes))]
+
+
+# Maya API calls issued by each backend method, as (kind, number of calls) pairs computed from the method's arguments
+BACKEND_API_CALLS = {
+	"list_nodes": _per_call("ls"),
+	"list_intermediates": _per_call("ls"),
+	"ls": _per_call("ls"),
+	"resolve": _per_node("MSelectionList.add"),
+	"name_of": _per_call("ls"),
+	"names_of": _per_node("MSelectionList.add"),
+	"node_type": _per_call("nodeType"),
+	"derived_types": _per_call("nodeType"),
+	"is_type": _per_call("nodeType"),
+	"parent": _per_call("listRelatives"),
+	"children": _per_call("listRelatives"),
+	"shapes": _per_call("listRelatives"),
+	"root": _per_call("listRelatives"),
+	"is_visible": _per_call("MSelectionList.add", "getAttr"),
+	"get_attr": _per_call("getAttr"),
+	"is_locked": _per_call("getAttr"),
+	"get_attrs": _per_value("MSelectionList.add", "MPlug.get"),
+	"get_locks": _per_value("MSelectionList.add", "MPlug.isLocked"),
+	"get_channels": _per_value("MSelectionList.add", "MPlug.get"),
+	"connections": _per_call("listConnections"),
+	"bulk_connections": _per_call("listConnections"),
+	"has_upstream": _per_call("MSelectionList.add", "MItDependencyGraph"),
+	"downstream": _per_node("MSelectionList.add", "MPlug.destinations")
+}
+
+
+class ProfiledBackend(object):
+	"""
+	Wraps a scene backend while profiling is on, counting the Maya API calls each of its methods issues into the span
+	running at the time, see BACKEND_API_CALLS.
+	"""
+
+	def __init__(self, scene_backend, profiler):
+		self.wrapped = scene_backend
+		self.profiler = profiler
+
+	def __getattr__(self, attribute_name):
+		value = getattr(self.wrapped, attribute_name)
+
+		try:
+			api_calls = BACKEND_API_CALLS[attribute_name]
+		except KeyError:
+			return value
+
+		profiler = self.profiler
+
+		def counted(*args, **kwargs):
+			for kind, n in api_calls(*args, **kwargs):
+				profiler.count(kind, n)
+
+			return value(*args, **kwargs)
+
+		return counted
+
+
+class Span(object):
+	"""
+	A timed section of a run: a discovery step, a check or a part of one. It records its wall time, the number of nodes
+	it visited and the Maya API calls it issued itself, not counting those of the spans nested in it.
+	"""
+
+	__slots__ = ("name", "category", "nodes", "calls", "start", "duration", "depth", "__profiler")
+
+	def __init__(self, profiler, name, category, nodes=0):
+		self.name = name
+		self.category = category
+		self.nodes = nodes
+		self.calls = Counter()
+
+		self.start = None
+		self.duration = None
+		self.depth = 0
+
+		self.__profiler = profiler
+
+	def __enter__(self):
+		self.__profiler.push(self)
+		self.start = clock()
+
+		return self
+
+	def __exit__(self, exc_type, exc_value, exc_traceback):
+		self.duration = clock() - self.start
+		self.__profiler.pop(self)
+
+		return False
+
+
+class NullSpan(object):
+	"""
+	Span returned while profiling is off, which records nothing.
+	"""
+
+	__slots__ = ()
+
+	nodes = 0
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, exc_traceback):
+		return False
+
+	def __setattr__(self, attribute_name, value):
+		pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Profiler(object):
+	"""
+	Records the spans of a run, in the order they end. Spans nest: API calls are counted into the innermost span
+	running, and calls made outside of any span are counted into the profiler's own unscoped counter.
+	"""
+
+	def __init__(self):
+		self.spans = []
+		self.unscoped_calls = Counter()
+		self.origin = clock()
+
+		self.__stack = []
+
+	def push(self, span):
+		span.depth = len(self.__stack)
+		self.__stack.append(span)
+
+	def pop(self, span):
+		self.__stack.remove(span)
+		self.spans.append(span)
+
+	def count(self, kind, n=1):
+		try:
+			self.__stack[-1].calls[kind] += n
+		except IndexError:
+			self.unscoped_calls[kind] += n
+
+	def span(self, name, category, nodes=0):
+		return Span(self, name, category, nodes)
+
+	def totals(self):
+		"""
+		Returns the spans' data added up by span name, in the order each name was first seen.
+
+		@return: {str: dict,...} keyed by span name, holding its category, runs, time (in seconds), nodes and calls
+		@rtype: OrderedDict
+		"""
+
+		totals = OrderedDict()
+
+		for s in sorted(self.spans, key=lambda s: s.start):
+			try:
+				entry = totals[s.name]
+			except KeyError:
+				entry = totals[s.name] = {"category": s.category, "runs": 0, "time": 0.0, "nodes": 0, "calls": Counter()}
+
+			entry["runs"] += 1
+			entry["time"] += s.duration
+			entry["nodes"] += s.nodes
+			entry["calls"].update(s.calls)
+
+		return totals
+
+	def summary(self):
+		"""
+		Returns a table with a row per span name: times it ran, its total wall time, the nodes it visited and the Maya
+		API calls it issued, by kind.
+
+		@rtype: str
+		"""
+
+		totals = self.totals()
+		name_width = max([len(n) for n in totals] + [len("span")])
+
+		lines = ["%-*s  %-10s %5s %10s %9s  %s" % (name_width, "span", "category", "runs", "ms", "nodes", "api calls")]
+
+		for name, entry in totals.items():
+			lines.append("%-*s  %-10s %5i %10.2f %9i  %s" % (
+				name_width, name, entry["category"], entry["runs"], entry["time"] * 1000.0, entry["nodes"],
+				", ".join("%s=%i" % (k, n) for k, n in sorted(entry["calls"].items())) or "-"
+			))
+
+		if self.unscoped_calls:
+			lines.append("unscoped api calls: %s" % ", ".join(
+				"%s=%i" % (k, n) for k, n in sorted(self.unscoped_calls.items())
+			))
+
+		return "\n".join(lines)
+
+	def chrome_trace(self):
+		"""
+		Returns the recorded spans as a Chrome trace, which chrome://tracing or Perfetto can load.
+
+		@rtype: dict
+		"""
+
+		pid = os.getpid()
+		tid = threading.current_thread().ident or 0
+
+		events = [
+			{
+				"name": s.name, "cat": s.category, "ph": "X", "pid": pid, "tid": tid,
+				"ts": (s.start - self.origin) * 1e6, "dur": s.duration * 1e6,
+				"args": dict([("nodes", s.nodes)] + sorted(s.calls.items()))
+			}
+			for s in sorted(self.spans, key=lambda s: (s.start, s.depth))
+		]
+
+		return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+	def export_chrome_trace(self, file_path):
+		with open(file_path, "w") as trace_file:
+			json.dump(self.chrome_trace(), trace_file)
+
+		return file_path
+
+
+def span(name, category, nodes=0):
+	"""
+	Returns a span timing the code run in its with block, or a span recording nothing while profiling is off.
+
+	@return: Span
+	@rtype: Span
+	"""
+
+	if PROFILER is None:
+		return NULL_SPAN
+
+	return PROFILER.span(name, category, nodes)
+
+
+def is_enabled():
+	return PROFILER is not None
+
+
+def enable():
+	"""
+	Starts profiling: a new profiler records the spans run from now on, and the current backend is wrapped so its Maya
+	API calls are counted. Snapshots taken before enabling keep reading from the unwrapped backend.
+
+	@return: Profiler
+	@rtype: Profiler
+	"""
+
+	global PROFILER
+
+	disable()
+
+	PROFILER = Profiler()
+	backend.set_backend(ProfiledBackend(backend.get_backend(), PROFILER))
+
+	return PROFILER
+
+
+def disable():
+	"""
+	Stops profiling and unwraps the backend.
+
+	@return: The profiler which was recording, None if profiling was off
+	@rtype: Profiler
+	"""
+
+	global PROFILER
+
+	profiler = PROFILER
+	PROFILER = None
+
+	scene_backend = backend.get_backend()
+
+	if isinstance(scene_backend, ProfiledBackend):
+		backend.set_backend(scene_backend.wrapped)
+
+	return profiler
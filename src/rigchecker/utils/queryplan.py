@@ -0,0 +1,330 @@
+import re
+
+try:
+	from re import _parser as sre_parse
+	from re import _constants as sre_constants
+except ImportError:
+	import sre_parse
+	import sre_constants
+
+from . import backend
+
+maya_useNewAPI = True
+
+# Upper bound for the number of wildcard patterns a single expression can expand into
+MAX_PATTERNS = 16
+
+# Characters with a special meaning for ls' wildcards and paths. Literals containing them can't be pushed down
+UNSAFE_PATTERN_CHARS = frozenset("*?|[]")
+
+PLANS = {}
+
+
+def _spec_value(spec, key):
+	try:
+		value = getattr(spec, key)
+	except AttributeError:
+		try:
+			value = spec[key]
+		except(KeyError, IndexError, TypeError):
+			return None
+
+	return value or None
+
+
+def _literals(items):
+	"""
+	Returns the string formed by a sequence of parsed regular expression items if they are all literal characters.
+	Returns None otherwise.
+	"""
+
+	chars = []
+
+	for op, av in items:
+		try:
+			assert op == sre_constants.LITERAL
+		except AssertionError:
+			return None
+
+		chars.append(chr(av))
+
+	return "".join(chars)
+
+
+def _alternatives(op, av):
+	"""
+	Returns every literal string a single parsed regular expression item can match, or None if the item matches
+	something other than a short, finite set of literals.
+	"""
+
+	if op == sre_constants.LITERAL:
+		return [chr(av)]
+	elif op == sre_constants.IN:
+		chars = [_literals([item]) for item in av]
+
+		return None if None in chars else chars
+	elif op == sre_constants.SUBPATTERN:
+		# The sub pattern's items are always the last element, regardless of the Python version
+		items = list(av[-1])
+
+		if len(items) == 1 and items[0][0] == sre_constants.BRANCH:
+			branches = [_literals(b) for b in items[0][1][1]]
+
+			return None if None in branches else branches
+
+		literal = _literals(items)
+
+		return None if literal is None else [literal]
+
+	return None
+
+
+def literal_bounds(expression):
+	"""
+	Extracts the literal text every name matching the regular expression received as argument must start with, and
+	the literal suffixes it must end with. The expression "L_.*_(ctrl|Ctrl)$", for example, yields "L_" and
+	["_ctrl", "_Ctrl"].
+
+	@return: The prefix, or an empty string, and the possible suffixes, or None if the expression doesn't end with
+		literal text
+	@rtype: tuple
+	"""
+
+	if expression.flags & re.IGNORECASE:
+		return "", None
+
+	items = list(sre_parse.parse(expression.pattern))
+	suffixes = None
+
+	if items and items[-1] == (sre_constants.AT, sre_constants.AT_END):
+		items.pop()
+		suffixes = [""]
+
+		while items:
+			alternatives = _alternatives(*items[-1])
+
+			if alternatives is None or len(suffixes) * len(alternatives) > MAX_PATTERNS:
+				break
+
+			suffixes = [a + s for a in alternatives for s in suffixes]
+			items.pop()
+
+		# Each suffix has to be usable as is in a wildcard pattern. Otherwise, the patterns wouldn't cover every name
+		# the expression matches
+		for s in suffixes:
+			if not s or UNSAFE_PATTERN_CHARS.intersection(s):
+				suffixes = None
+				break
+
+	# The prefix is read from the items left once the suffixes were taken, so both never overlap
+	chars = []
+
+	for op, av in items:
+		if op != sre_constants.LITERAL or chr(av) in UNSAFE_PATTERN_CHARS:
+			break
+
+		chars.append(chr(av))
+
+	return "".join(chars), suffixes
+
+
+class QueryPlan(object):
+	"""
+	Execution plan for one discovery spec. As much of the spec as possible is pushed down into a single native ls
+	query (a type filter plus wildcard patterns built from the spec's suffix and the literal parts of its expression).
+	The spec's filters are then applied in Python, only to the nodes the query returned.
+	"""
+
+	def __init__(self, title, types=None, suffix=None, expression=None, no_intermediate=False):
+		self.title = title
+		self.types = list(types) if types else []
+		self.suffix = suffix
+		self.expression = expression
+		self.no_intermediate = no_intermediate
+		self.empty = False
+
+		suffixes = [suffix] if suffix else []
+
+		if expression is not None:
+			prefix, exp_suffixes = literal_bounds(expression)
+
+			if exp_suffixes is not None:
+				if suffix:
+					# Names must end with both the spec's suffix and one of the expression's. Keep the longest of each
+					# compatible pair and drop the pairs that can't be satisfied at the same time
+					suffixes = []
+
+					for s in exp_suffixes:
+						if s.endswith(suffix):
+							suffixes.append(s)
+						elif suffix.endswith(s):
+							suffixes.append(suffix)
+
+					self.empty = len(suffixes) == 0
+				else:
+					suffixes = exp_suffixes
+		else:
+			prefix = ""
+
+		self.prefix = prefix
+		self.suffixes = tuple(sorted(set(suffixes)))
+
+		if self.suffixes:
+			self.patterns = ["%s*%s" % (prefix, s) for s in self.suffixes]
+		elif prefix:
+			self.patterns = ["%s*" % prefix]
+		else:
+			self.patterns = []
+
+	@property
+	def strategy(self):
+		if self.empty is True:
+			return "empty"
+
+		strategy = "+".join(s for s, used in (("type", self.types), ("pattern", self.patterns)) if used)
+
+		return strategy or "scan"
+
+	def explain(self):
+		"""
+		Returns a human readable description of the plan: the native query issued and the filters left to Python.
+
+		@return: The plan's description
+		@rtype: str
+		"""
+
+		if self.empty is True:
+			return "%s: empty (suffix %r contradicts expression %r)" % (
+				self.title, self.suffix, self.expression.pattern
+			)
+
+		args = ["%r" % self.patterns] if self.patterns else []
+
+		if self.types:
+			args.append("type=%r" % self.types)
+
+		if self.no_intermediate is True:
+			args.append("noIntermediate=True")
+
+		post_filters = []
+
+		if self.suffix:
+			post_filters.append("endswith(%r)" % self.suffix)
+
+		if self.expression is not None:
+			post_filters.append("match(%r)" % self.expression.pattern)
+
+		return "%s: [%s] ls(%s) -> %s" % (
+			self.title, self.strategy, ", ".join(args), " and ".join(post_filters) or "no post filter"
+		)
+
+	def accepts(self, name):
+		"""
+		Applies the spec's filters to the short name received as argument.
+
+		@rtype: bool
+		"""
+
+		if self.suffix and not name.endswith(self.suffix):
+			return False
+
+		return self.expression is None or self.expression.match(name) is not None
+
+	def names(self, scene_backend=None):
+		"""
+		Runs the plan against the scene.
+
+		@return: The long names of all the nodes matching the spec
+		@rtype: list
+		"""
+
+		if self.empty is True:
+			return []
+
+		if scene_backend is None:
+			scene_backend = backend.get_backend()
+
+		candidates = scene_backend.ls(self.patterns, self.types, no_intermediate=self.no_intermediate)
+
+		return [n for n in candidates if self.accepts(n.rpartition("|")[2])]
+
+	def nodes(self, scene_backend=None):
+		"""
+		Runs the plan against the scene and resolves the matching nodes in bulk.
+
+		@return: The backend's references to the nodes, MObjects in Maya
+		@rtype: list
+		"""
+
+		if scene_backend is None:
+			scene_backend = backend.get_backend()
+
+		return scene_backend.resolve(self.names(scene_backend))
+
+	def indices(self, snapshot):
+		"""
+		Runs the plan against a scene snapshot instead of the scene. The type filter is answered by the snapshot's type
+		index and the wildcard patterns become a cheap prefix and suffix test ahead of the Python filters.
+
+		@return: [int,...]
+		@rtype: list
+		"""
+
+		if self.empty is True:
+			return []
+
+		if self.types:
+			candidates = snapshot.indices_of_type(self.types, no_intermediate=self.no_intermediate)
+		else:
+			candidates = snapshot.indices(no_intermediate=self.no_intermediate)
+
+		short_names = snapshot.short_names
+		prefix = self.prefix
+		suffixes = self.suffixes or ("",)
+
+		return [
+			i for i in candidates
+			if short_names[i].endswith(suffixes) and short_names[i].startswith(prefix) and self.accepts(short_names[i])
+		]
+
+
+def plan_discovery(spec, title, no_intermediate=False):
+	"""
+	Builds the execution plan for the discovery spec received as argument. Specs can be either the discovery specs
+	returned by getconf.get_discovery_data or plain dictionaries. The plan is recorded under the spec's title so the
+	choice can be reviewed afterwards via explain_plans.
+
+	@return: QueryPlan
+	@rtype: QueryPlan
+	"""
+
+	expression = _spec_value(spec, "expression")
+
+	if expression is not None and not hasattr(expression, "match"):
+		try:
+			expression = re.compile(expression)
+		except(ValueError, RuntimeError, Exception):
+			expression = None
+
+	types = _spec_value(spec, "type")
+
+	if types is not None and not isinstance(types, (list, tuple, set, frozenset)):
+		types = [types]
+
+	plan = QueryPlan(
+		title, types=types, suffix=_spec_value(spec, "suffix"), expression=expression, no_intermediate=no_intermediate
+	)
+
+	PLANS[title] = plan
+
+	return plan
+
+
+def explain_plans():
+	"""
+	Returns the description of the latest plan chosen for each discovery spec.
+
+	@rtype: str
+	"""
+
+	return "\n".join(PLANS[t].explain() for t in sorted(PLANS))
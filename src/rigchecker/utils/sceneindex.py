@@ -0,0 +1,494 @@
+try:
+	import maya.api.OpenMaya as om
+except ImportError:
+	# Outside of Maya the index can still be driven by a FakeEventSource
+	om = None
+
+maya_useNewAPI = True
+
+# Attributes whose changes affect the checks of every node below the one that changed
+HIERARCHICAL_ATTRIBUTES = frozenset(["visibility", "lodVisibility", "overrideEnabled", "overrideVisibility"])
+
+
+class SceneIndex(object):
+	"""
+	Persistent index of the scene's nodes, kept current by an event source instead of being rebuilt on every
+	inspection. Nodes are identified by an id given by the event source, so they can be renamed and reparented
+	without losing their cached data.
+
+	Every change marks the affected nodes as dirty. Refreshing the index re-classifies only the dirty nodes, and
+	checks run through the index only re-evaluate the nodes whose version changed since the check last saw them.
+
+	Checks read a node's neighbours too: a shape is checked through its transform's connections and children, and a
+	geo through its parent's children. Therefore, a change to a node also dirties its children, a change to its
+	children dirties them and their own children, and a reparented node dirties its whole branch.
+	"""
+
+	def __init__(self, discovery_classifier, source=None):
+		self.classifier = discovery_classifier
+
+		self.__names = {}
+		self.__types = {}
+		self.__refs = {}
+		self.__intermediates = set()
+		self.__dg_nodes = set()
+		self.__parents = {}
+		self.__children = {}
+
+		self.__versions = {}
+		self.__masks = {}
+		self.__members = dict((t, set()) for t in discovery_classifier.titles)
+		self.__check_results = {}
+
+		self.dirty = set()
+		self.source = None
+		self.last_run_stats = {}
+
+		if source is not None:
+			self.connect(source)
+
+	def __len__(self):
+		return len(self.__names)
+
+	def __contains__(self, node_id):
+		return node_id in self.__names
+
+	def connect(self, source):
+		"""
+		Starts listening to the event source received as argument, populating the index with the scene's current
+		nodes first.
+		"""
+
+		self.disconnect()
+
+		self.source = source
+		source.populate(self)
+		source.connect(self)
+
+	def disconnect(self):
+		try:
+			self.source.disconnect(self)
+		except AttributeError:
+			pass
+
+		self.source = None
+
+	# ##############################
+	# Events
+	# ##############################
+
+	def __mark_dirty(self, node_id, recursive=False, depth=0):
+		"""
+		Marks the node received as argument as dirty, along with its descendants: all of them when recursive, down to
+		depth levels otherwise.
+		"""
+
+		pending = [(node_id, 0)]
+
+		while pending:
+			n, level = pending.pop()
+
+			self.dirty.add(n)
+			self.__versions[n] = self.__versions.get(n, 0) + 1
+
+			if recursive is True or level < depth:
+				pending.extend((c, level + 1) for c in self.__children.get(n, ()))
+
+	def add_node(self, node_id, name, node_type, parent_id=None, ref=None, intermediate=False, dag=True):
+		self.__names[node_id] = name
+		self.__types[node_id] = node_type
+		self.__refs[node_id] = ref
+
+		if intermediate is True:
+			self.__intermediates.add(node_id)
+
+		# Nodes outside of the DAG have no path. Their long name is their name
+		if dag is False:
+			self.__dg_nodes.add(node_id)
+
+		self.__mark_dirty(node_id)
+		self.reparent_node(node_id, parent_id)
+
+	def remove_node(self, node_id):
+		try:
+			del self.__names[node_id]
+		except KeyError:
+			return
+
+		self.reparent_node(node_id, None)
+
+		for c in self.__children.pop(node_id, ()):
+			self.__parents.pop(c, None)
+			self.__mark_dirty(c, recursive=True)
+
+		for members in self.__members.values():
+			members.discard(node_id)
+
+		for results in self.__check_results.values():
+			results.pop(node_id, None)
+
+		for data in (self.__types, self.__refs, self.__masks, self.__versions):
+			data.pop(node_id, None)
+
+		self.__intermediates.discard(node_id)
+		self.__dg_nodes.discard(node_id)
+		self.dirty.discard(node_id)
+
+	def rename_node(self, node_id, name):
+		try:
+			assert node_id in self.__names
+		except AssertionError:
+			return
+
+		self.__names[node_id] = name
+
+		# Long names, and the hierarchy checks depending on them, change for the whole branch
+		self.__mark_dirty(node_id, recursive=True)
+
+	def reparent_node(self, node_id, parent_id):
+		previous_parent_id = self.__parents.pop(node_id, None)
+
+		# The parents' children changed, which the checks on their children and grandchildren read
+		if previous_parent_id is not None:
+			self.__children[previous_parent_id].discard(node_id)
+			self.__mark_dirty(previous_parent_id, depth=2)
+
+		if parent_id is not None:
+			self.__parents[node_id] = parent_id
+			self.__children.setdefault(parent_id, set()).add(node_id)
+			self.__mark_dirty(parent_id, depth=2)
+
+		self.__mark_dirty(node_id, recursive=True)
+
+	def change_attribute(self, node_id, attribute_name=None, value=None):
+		try:
+			assert node_id in self.__names
+		except AssertionError:
+			return
+
+		# Intermediate objects are classified apart, so the node is re-classified with its new state on refresh
+		if attribute_name == "intermediateObject" and value is not None:
+			if value:
+				self.__intermediates.add(node_id)
+			else:
+				self.__intermediates.discard(node_id)
+
+		# Shapes are checked through their transform's attributes and connections
+		self.__mark_dirty(node_id, recursive=attribute_name in HIERARCHICAL_ATTRIBUTES, depth=1)
+
+	# ##############################
+	# Queries
+	# ##############################
+
+	def name(self, node_id):
+		return self.__names[node_id]
+
+	def long_name(self, node_id):
+		if node_id in self.__dg_nodes:
+			return self.__names[node_id]
+
+		names = []
+
+		while node_id is not None:
+			names.append(self.__names[node_id])
+			node_id = self.__parents.get(node_id)
+
+		return "|" + "|".join(reversed(names))
+
+	def node_type(self, node_id):
+		return self.__types[node_id]
+
+	def parent(self, node_id):
+		return self.__parents.get(node_id)
+
+	def ref(self, node_id):
+		return self.__refs[node_id]
+
+	def version(self, node_id):
+		return self.__versions[node_id]
+
+	def refresh(self):
+		"""
+		Re-classifies the nodes changed since the last refresh.
+
+		@return: The ids of the nodes re-classified
+		@rtype: set
+		"""
+
+		dirty = self.dirty
+		self.dirty = set()
+
+		classify_name = self.classifier.classify_name
+		titles = self.classifier.titles
+
+		for node_id in dirty:
+			try:
+				mask = classify_name(
+					self.__names[node_id], self.__types[node_id], node_id in self.__intermediates
+				)
+			except KeyError:
+				# The node was removed after being marked as dirty
+				continue
+
+			if mask == self.__masks.get(node_id):
+				continue
+
+			self.__masks[node_id] = mask
+
+			for b, t in enumerate(titles):
+				if mask & (1 << b):
+					self.__members[t].add(node_id)
+				else:
+					self.__members[t].discard(node_id)
+
+		return dirty
+
+	def members(self, title):
+		"""
+		Returns the ids of the nodes in the category received as argument, refreshing the index first.
+
+		@return: [node_id,...]
+		@rtype: list
+		"""
+
+		if self.dirty:
+			self.refresh()
+
+		return list(self.__members[title])
+
+	def run_check(self, check_name, title, predicate):
+		"""
+		Evaluates predicate on the id of every node in the category received as argument. Results are cached along
+		with the node's version, so only the nodes changed since the previous run are evaluated again.
+
+		@return: The result for each node, keyed by node id
+		@rtype: dict
+		"""
+
+		cached_results = self.__check_results.setdefault(check_name, {})
+		results = {}
+		evaluated = 0
+
+		for node_id in self.members(title):
+			version = self.__versions[node_id]
+
+			try:
+				cached_version, result = cached_results[node_id]
+				assert cached_version == version
+			except(KeyError, AssertionError):
+				result = predicate(node_id)
+				cached_results[node_id] = (version, result)
+				evaluated += 1
+
+			results[node_id] = result
+
+		self.last_run_stats[check_name] = {"evaluated": evaluated, "reused": len(results) - evaluated}
+
+		return results
+
+
+class FakeEventSource(object):
+	"""
+	Event source driven by hand, standing in for Maya's callbacks wherever Maya isn't available. Each emit_* method
+	forwards the event to the connected indices.
+	"""
+
+	def __init__(self, nodes=()):
+		"""
+		@param nodes: The nodes the index is populated with, as (node_id, name, node_type, parent_id) tuples. A fifth
+		item set to False adds a node outside of the DAG
+		"""
+
+		self.nodes = list(nodes)
+		self.indices = []
+
+	def populate(self, index):
+		for node in self.nodes:
+			node_id, name, node_type, parent_id = node[:4]
+			index.add_node(node_id, name, node_type, parent_id=parent_id, ref=node_id, dag=node[4] if node[4:] else True)
+
+	def connect(self, index):
+		self.indices.append(index)
+
+	def disconnect(self, index):
+		self.indices.remove(index)
+
+	def emit_node_added(self, node_id, name, node_type, parent_id=None, dag=True):
+		for index in self.indices:
+			index.add_node(node_id, name, node_type, parent_id=parent_id, ref=node_id, dag=dag)
+
+	def emit_node_removed(self, node_id):
+		for index in self.indices:
+			index.remove_node(node_id)
+
+	def emit_node_renamed(self, node_id, name):
+		for index in self.indices:
+			index.rename_node(node_id, name)
+
+	def emit_node_reparented(self, node_id, parent_id):
+		for index in self.indices:
+			index.reparent_node(node_id, parent_id)
+
+	def emit_attribute_changed(self, node_id, attribute_name, value=None):
+		for index in self.indices:
+			index.change_attribute(node_id, attribute_name, value)
+
+
+class MayaEventSource(object):
+	"""
+	Event source backed by Maya's DG and DAG messages: node added, node removed, name changed, parent added and
+	attribute changed. Nodes are referenced by their MObjectHandle and identified by a counter. MObjectHandle hash
+	codes aren't unique, so nodes sharing one are told apart by comparing their handles' objects.
+	"""
+
+	def __init__(self):
+		self.__callback_ids = []
+		self.__attribute_callback_ids = {}
+		self.__index = None
+
+		# [(MObjectHandle, node_id),...], keyed by hash code
+		self.__handles = {}
+		self.__next_id = 0
+
+	def node_id(self, node):
+		"""
+		Returns the id of the node received as argument, or None if the source never added it.
+
+		@rtype: int
+		"""
+
+		for handle, node_id in self.__handles.get(om.MObjectHandle(node).hashCode(), ()):
+			if handle.isAlive() and handle.object() == node:
+				return node_id
+
+		return None
+
+	def __register(self, node):
+		node_id = self.node_id(node)
+
+		if node_id is None:
+			handle = om.MObjectHandle(node)
+			node_id = self.__next_id
+			self.__next_id += 1
+
+			self.__handles.setdefault(handle.hashCode(), []).append((handle, node_id))
+
+		return node_id
+
+	def __unregister(self, node):
+		handle_hash = om.MObjectHandle(node).hashCode()
+		node_id = self.node_id(node)
+
+		try:
+			self.__handles[handle_hash] = [h for h in self.__handles[handle_hash] if h[1] != node_id]
+			assert self.__handles[handle_hash]
+		except KeyError:
+			pass
+		except AssertionError:
+			del self.__handles[handle_hash]
+
+		return node_id
+
+	def __add_node(self, index, node):
+		dep_fn = om.MFnDependencyNode(node)
+		node_id = self.__register(node)
+		parent_id = None
+		intermediate = False
+
+		if node.hasFn(om.MFn.kDagNode):
+			dag_fn = om.MFnDagNode(node)
+			intermediate = dag_fn.isIntermediateObject
+
+			if dag_fn.parentCount() > 0 and dag_fn.parent(0).hasFn(om.MFn.kWorld) is False:
+				parent_id = self.__register(dag_fn.parent(0))
+
+		index.add_node(
+			node_id, dep_fn.name(), dep_fn.typeName, parent_id=parent_id, ref=om.MObjectHandle(node),
+			intermediate=intermediate, dag=node.hasFn(om.MFn.kDagNode)
+		)
+
+		try:
+			assert node_id not in self.__attribute_callback_ids
+			self.__attribute_callback_ids[node_id] = om.MNodeMessage.addAttributeChangedCallback(
+				node, self.__on_attribute_changed
+			)
+		except(AssertionError, RuntimeError):
+			pass
+
+	def populate(self, index):
+		nodes_it = om.MItDependencyNodes()
+		nodes = []
+
+		while not nodes_it.isDone():
+			nodes.append(nodes_it.thisNode())
+			nodes_it.next()
+
+		def depth(node):
+			return om.MFnDagNode(node).getPath().length() if node.hasFn(om.MFn.kDagNode) else 0
+
+		# Parents are added before their children, since the iterator doesn't guarantee any order
+		for node in sorted(nodes, key=depth):
+			self.__add_node(index, node)
+
+	def connect(self, index):
+		self.__index = index
+		self.__callback_ids = [
+			om.MDGMessage.addNodeAddedCallback(self.__on_node_added, "dependNode"),
+			om.MDGMessage.addNodeRemovedCallback(self.__on_node_removed, "dependNode"),
+			om.MNodeMessage.addNameChangedCallback(om.MObject.kNullObj, self.__on_name_changed),
+			om.MDagMessage.addParentAddedCallback(self.__on_parent_added)
+		]
+
+	def disconnect(self, index):
+		om.MMessage.removeCallbacks(self.__callback_ids + list(self.__attribute_callback_ids.values()))
+
+		self.__callback_ids = []
+		self.__attribute_callback_ids = {}
+		self.__handles = {}
+		self.__index = None
+
+	def __on_node_added(self, node, client_data=None):
+		self.__add_node(self.__index, node)
+
+	def __on_node_removed(self, node, client_data=None):
+		node_id = self.__unregister(node)
+
+		try:
+			om.MMessage.removeCallback(self.__attribute_callback_ids.pop(node_id))
+		except(KeyError, RuntimeError):
+			pass
+
+		self.__index.remove_node(node_id)
+
+	def __on_name_changed(self, node, previous_name, client_data=None):
+		self.__index.rename_node(self.node_id(node), om.MFnDependencyNode(node).name())
+
+	def __on_parent_added(self, child_path, parent_path, client_data=None):
+		try:
+			assert parent_path.length() > 0
+		except AssertionError:
+			# Parented to the world
+			parent_id = None
+		else:
+			parent_id = self.__register(parent_path.node())
+
+		node_id = self.node_id(child_path.node())
+
+		if node_id is not None:
+			self.__index.reparent_node(node_id, parent_id)
+
+	def __on_attribute_changed(self, message, plug, other_plug, client_data=None):
+		# Connections are watched too, since checks such as skinning depend on the node's inputs
+		try:
+			assert message & (
+				om.MNodeMessage.kAttributeSet | om.MNodeMessage.kConnectionMade | om.MNodeMessage.kConnectionBroken
+			)
+		except AssertionError:
+			return
+
+		attribute_name = plug.partialName(useLongNames=True)
+
+		# The index keeps track of the intermediate objects itself, so it's given their new state
+		value = plug.asBool() if attribute_name == "intermediateObject" else None
+
+		self.__index.change_attribute(self.node_id(plug.node()), attribute_name, value)
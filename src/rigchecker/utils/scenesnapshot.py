@@ -0,0 +1,272 @@
+from . import backend
+from . import hierarchy
+from . import nodetypes
+from . import profiling
+from . import scheduler
+
+maya_useNewAPI = True
+
+
+class SceneSnapshot(object):
+	"""
+	Flat picture of the nodes in the scene taken in a single traversal. Every discovery generator and every check in an
+	inspection run reads from the same snapshot instead of querying the scene again.
+
+	Nodes are addressed by their index in the snapshot. For each index the snapshot holds the node's long name, its
+	short (leaf) name, its type and the index of its parent (-1 for world children and non DAG nodes). Backend node
+	references (MObjects in Maya) are resolved lazily, in bulk, only for the nodes that are actually used.
+	"""
+
+	def __init__(self, names, types, intermediates=(), scene_backend=None, built=True):
+		"""
+		@param built: When False, the snapshot is built later on, in steps, see iter_build.
+		"""
+
+		self.backend = backend.get_backend() if scene_backend is None else scene_backend
+		self.names = names
+		self.types = types
+		self.type_map = nodetypes.NodeTypeMap(names, types, indexed=False)
+		self.short_names = []
+
+		# A long name's parent is the long name up to its last separator. Non DAG nodes and world children end up
+		# with an empty parent name, which isn't in the index
+		self.parents = []
+
+		self.intermediates = frozenset()
+
+		self.__intermediate_names = intermediates
+		self.__name_index = {}
+		self.__refs = [None] * len(names)
+		self.__memo = {}
+
+		if built is True:
+			scheduler.run_pass(self.iter_build())
+
+	def iter_build(self, chunk_size=None):
+		"""
+		Resumable pass indexing the snapshot's names and types, chunk_size nodes per step, see scheduler.PassStep.
+		Parents are resolved in a second round, once every name is indexed.
+		"""
+
+		names = self.names
+		name_index = self.__name_index
+		total = 2 * len(names)
+
+		for start, stop in scheduler.chunks(len(names), chunk_size):
+			self.short_names.extend(n.rpartition("|")[2] for n in names[start:stop])
+			name_index.update((names[i], i) for i in range(start, stop))
+			self.type_map.index_types(start, stop)
+
+			yield scheduler.PassStep("take_snapshot", stop, total)
+
+		for start, stop in scheduler.chunks(len(names), chunk_size):
+			self.parents.extend(name_index.get(n.rpartition("|")[0], -1) for n in names[start:stop])
+
+			yield scheduler.PassStep("take_snapshot", len(names) + stop, total)
+
+		self.intermediates = frozenset(name_index[n] for n in self.__intermediate_names if n in name_index)
+		self.__intermediate_names = ()
+
+		yield self
+
+	def __len__(self):
+		return len(self.names)
+
+	def index(self, name):
+		"""
+		Returns the index of the node with the long name received as argument.
+
+		@return: The node's index
+		@rtype: int
+		"""
+
+		return self.__name_index[name]
+
+	def indices(self, no_intermediate=False):
+		if no_intermediate is False:
+			return list(range(len(self.names)))
+
+		return [i for i in range(len(self.names)) if i not in self.intermediates]
+
+	def indices_of_type(self, types, no_intermediate=False, derived=True):
+		"""
+		Returns the indices of all the nodes whose type is one of the types received as argument, or derives from one
+		of them, sorted in traversal order. Types are resolved in memory through the snapshot's type map.
+
+		@return: [int,...]
+		@rtype: list
+		"""
+
+		indices = self.type_map.indices_of_type(types, derived=derived)
+
+		if no_intermediate is True:
+			indices = [i for i in indices if i not in self.intermediates]
+
+		return sorted(indices)
+
+	def is_intermediate(self, index):
+		return index in self.intermediates
+
+	def memo(self, key, factory):
+		"""
+		Returns the data cached in the snapshot under the key received as argument. The data is computed by calling
+		factory the first time it is requested, so data derived from the snapshot is computed only once per run.
+		"""
+
+		try:
+			return self.__memo[key]
+		except KeyError:
+			self.__memo[key] = factory()
+
+			return self.__memo[key]
+
+	def iter_memo(self, key, steps):
+		"""
+		Resumable counterpart of memo: the data is computed by the resumable pass steps returns, whose progress is
+		yielded. Nothing is yielded if the data is cached already.
+
+		@return: (scheduler.PassStep,...)
+		@rtype: generator
+		"""
+
+		if key in self.__memo:
+			return
+
+		for step in steps():
+			if isinstance(step, scheduler.PassStep):
+				yield step
+			else:
+				self.__memo[key] = step
+
+	def hierarchy(self):
+		"""
+		Returns the index answering root, ancestor and descendant queries over the snapshot's hierarchy, shared by all
+		the hierarchy checks of the run.
+
+		@return: hierarchy.HierarchyIndex
+		@rtype: hierarchy.HierarchyIndex
+		"""
+
+		return self.memo("hierarchy", lambda: hierarchy.HierarchyIndex(self.parents))
+
+	def iter_hierarchy(self, chunk_size=None):
+		"""
+		Resumable counterpart of hierarchy, building the index's children lists chunk_size nodes per step.
+		"""
+
+		return self.iter_memo("hierarchy", lambda: hierarchy.HierarchyIndex(self.parents).iter_build(chunk_size))
+
+	def node(self, index):
+		"""
+		Returns the backend's reference to the node at the index received as argument. References are cached for the
+		snapshot's lifetime.
+
+		@return: The node's reference, an MObject in Maya
+		@rtype: object
+		"""
+
+		return self.nodes([index])[0]
+
+	def nodes(self, indices):
+		"""
+		Returns the backend's references to all the nodes at the indices received as argument. Nodes not resolved yet
+		are resolved in bulk.
+
+		@return: [object,...]
+		@rtype: list
+		"""
+
+		indices = list(indices)
+		unresolved = [i for i in indices if self.__refs[i] is None]
+
+		if unresolved:
+			for i, ref in zip(unresolved, self.backend.resolve([self.names[i] for i in unresolved])):
+				self.__refs[i] = ref
+
+		return [self.__refs[i] for i in indices]
+
+
+def take_snapshot(scene_backend=None):
+	"""
+	Traverses the scene once and returns a snapshot of all of its nodes.
+
+	@return: SceneSnapshot
+	@rtype: SceneSnapshot
+	"""
+
+	if scene_backend is None:
+		scene_backend = backend.get_backend()
+
+	with profiling.span("take_snapshot", "discovery") as snapshot_span:
+		names, types = scene_backend.list_nodes()
+		snapshot_span.nodes = len(names)
+
+		return SceneSnapshot(names, types, scene_backend.list_intermediates(), scene_backend)
+
+
+def iter_take_snapshot(scene_backend=None, chunk_size=None):
+	"""
+	Resumable counterpart of take_snapshot, see scheduler.PassStep. The scene is listed, then the snapshot built,
+	chunk_size nodes per step.
+
+	@return: (scheduler.PassStep,...), then the SceneSnapshot
+	@rtype: generator
+	"""
+
+	if scene_backend is None:
+		scene_backend = backend.get_backend()
+
+	names = []
+	types = []
+
+	for chunk_names, chunk_types in scene_backend.iter_list_nodes(chunk_size):
+		names.extend(chunk_names)
+		types.extend(chunk_types)
+
+		yield scheduler.PassStep("list_nodes", len(names), 0)
+
+	snapshot = SceneSnapshot(names, types, scene_backend.list_intermediates(), scene_backend, built=False)
+
+	for step in snapshot.iter_build(chunk_size):
+		yield step
+
+
+def take_node_snapshot(node, scene_backend=None):
+	"""
+	Returns a snapshot holding only the node received as argument, along with what checking it on its own reads: its
+	ancestors, its children, and the display layers any of them belongs to. Its cost depends on the node's depth, not
+	on the scene's size.
+
+	@return: SceneSnapshot
+	@rtype: SceneSnapshot
+	"""
+
+	if scene_backend is None:
+		scene_backend = backend.get_backend()
+
+	name = scene_backend.name_of(node)
+	names = [name]
+	parent = scene_backend.parent(name)
+
+	while parent is not None:
+		names.insert(0, parent)
+		parent = scene_backend.parent(parent)
+
+	names.extend(scene_backend.children(name))
+
+	dag_names = list(names)
+	intermediates = []
+
+	for n in dag_names:
+		try:
+			if scene_backend.get_attr(n, "intermediateObject"):
+				intermediates.append(n)
+
+			for layer_name in scene_backend.connections(n, "drawOverride", source=True, destination=False):
+				if layer_name not in names:
+					names.append(layer_name)
+		except(ValueError, RuntimeError):
+			# Not a DAG node
+			pass
+
+	return SceneSnapshot(names, [scene_backend.node_type(n) for n in names], intermediates, scene_backend)
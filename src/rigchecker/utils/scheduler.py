@@ -0,0 +1,132 @@
+from collections import namedtuple
+
+try:
+	from time import perf_counter as clock
+except ImportError:
+	# Python 2
+	from time import time as clock
+
+maya_useNewAPI = True
+
+# Time a slice may run for before handing control back to the caller, in milliseconds
+DEFAULT_SLICE_MS = 8
+
+# Nodes processed per step by the resumable passes doing little work per node (building the snapshot, classifying it...)
+PASS_CHUNK_SIZE = 4096
+
+# Progress of a resumable pass: a generator computing some data a step at a time, which yields a PassStep after each
+# step and the data itself last. Passes are run at once with run_pass
+PassStep = namedtuple("PassStep", ["name", "done", "total"])
+
+
+def run_pass(steps):
+	"""
+	Runs the resumable pass received as argument at once.
+
+	@return: The pass's result, the last value it yields
+	"""
+
+	result = None
+
+	for result in steps:
+		pass
+
+	return result
+
+
+def chunks(total, chunk_size=None):
+	"""
+	Returns a generator for the (start, stop) bounds splitting total items in chunks of chunk_size items, or in a
+	single chunk when chunk_size is None.
+
+	@rtype: generator
+	"""
+
+	chunk_size = chunk_size or total or 1
+
+	for start in range(0, total, chunk_size):
+		yield start, min(total, start + chunk_size)
+
+
+class SlicedRun(object):
+	"""
+	Runs a resumable generator in time slices. Each call to run_slice advances the generator until the slice's time
+	budget is spent, and returns what it yielded meanwhile, so the caller (a QTimer, Maya's idle events...) can keep
+	its UI responsive in between slices. The run can be cancelled at any time between slices.
+	"""
+
+	def __init__(self, steps, slice_ms=DEFAULT_SLICE_MS):
+		self.slice_ms = slice_ms
+
+		self.finished = False
+		self.cancelled = False
+
+		self.slices = 0
+		self.busy_time = 0.0
+
+		self.__steps = iter(steps)
+
+	@property
+	def done(self):
+		return self.finished or self.cancelled
+
+	def run_slice(self):
+		"""
+		Advances the run for up to slice_ms milliseconds. A single step can't be interrupted, so a slice lasts at least
+		as long as the step it's running.
+
+		@return: Everything the generator yielded during the slice
+		@rtype: list
+		"""
+
+		if self.done is True:
+			return []
+
+		budget = self.slice_ms / 1000.0
+		start = clock()
+		events = []
+
+		while True:
+			try:
+				events.append(next(self.__steps))
+			except StopIteration:
+				self.finished = True
+				break
+
+			if clock() - start >= budget:
+				break
+
+		self.slices += 1
+		self.busy_time += clock() - start
+
+		return events
+
+	def run(self):
+		"""
+		Runs the rest of the generator without slicing it.
+
+		@return: Everything the generator yielded
+		@rtype: list
+		"""
+
+		events = []
+
+		while self.done is False:
+			events.extend(self.run_slice())
+
+		return events
+
+	def cancel(self):
+		"""
+		Stops the run. The generator is closed, so it can release whatever it holds.
+		"""
+
+		if self.done is True:
+			return
+
+		self.cancelled = True
+
+		try:
+			self.__steps.close()
+		except AttributeError:
+			pass
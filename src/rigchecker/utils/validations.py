@@ -1,26 +1,445 @@
-def name_structure(node, name_expression=""):
-	pass
+import re
 
+from collections import OrderedDict
 
-def node_type(node, node_type=""):
-	pass
+from . import channels
+from . import dataplan
+from . import inspect
+from . import profiling
+from . import scenesnapshot
+from . import visibility
+from .. import getconf
 
+maya_useNewAPI = True
 
-def node_visibility(node, visible=1):
-	pass
+VALIDATION_PLAN = None
+VALIDATION_PLAN_GENERATION = None
 
 
-def name_suffix(node, suffix=""):
-	pass
+class Rule(object):
+	"""
+	A validation compiled from its configuration: its parameters are bound, and its expressions compiled, once. The
+	rule evaluates all the nodes of a category at once through evaluate, which receives the category's CategoryData
+	and returns a list of booleans aligned with its nodes.
+	"""
 
+	def __init__(self, rule_type, params, evaluate, attributes=()):
+		self.rule_type = rule_type
+		self.params = params
+		self.evaluate = evaluate
 
-def node_location(node, parent_path="", direct_child=0):
-	pass
+		# Attributes the rule reads, fetched in bulk along with those of every other rule of the same category
+		self.attributes = tuple(attributes)
 
 
-def attribute_value(node, attribute_name="", attribute_value=""):
-	pass
+class CategoryData(object):
+	"""
+	Data the rules of a category read, fetched at most once for all of them. Attributes are fetched in a single bulk
+	query holding every attribute any rule of the category reads, while the data shared by all the categories (the
+	hierarchy and visibility) is read from the snapshot, which computes it once per run.
+	"""
 
+	def __init__(self, snapshot, indices, attributes=()):
+		self.snapshot = snapshot
+		self.indices = indices
+		self.short_names = [snapshot.short_names[i] for i in indices]
 
-def node_zeroed(node):
-	pass
+		self.__pending_attributes = list(OrderedDict.fromkeys(attributes))
+		self.__attributes = {}
+
+	def __len__(self):
+		return len(self.indices)
+
+	def attribute(self, attribute_name):
+		"""
+		Returns the value of the attribute received as argument for each node, or None for the nodes without it.
+
+		@rtype: list
+		"""
+
+		try:
+			return self.__attributes[attribute_name]
+		except KeyError:
+			pass
+
+		attribute_names = [attribute_name] + [a for a in self.__pending_attributes if a != attribute_name]
+		self.__pending_attributes = []
+
+		data_planner = dataplan.get_data_planner(self.snapshot)
+
+		try:
+			view = data_planner.view(self.indices, dataplan.attribute_columns(attribute_names))
+		except(ValueError, RuntimeError):
+			# Some node lacks some attribute. Therefore, fall back to reading them node by node
+			for a in attribute_names:
+				column = dataplan.ATTRIBUTE_PREFIX + a
+				values = []
+
+				for i in self.indices:
+					try:
+						values.append(data_planner.view([i], [column])[column][0])
+					except(ValueError, RuntimeError):
+						values.append(None)
+
+				self.__attributes[a] = values
+		else:
+			for a in attribute_names:
+				self.__attributes[a] = list(view[dataplan.ATTRIBUTE_PREFIX + a])
+
+		return self.__attributes[attribute_name]
+
+	def visibility(self):
+		scene_visibility = visibility.get_visibility(self.snapshot)
+
+		return [scene_visibility[i] for i in self.indices]
+
+	def hierarchy(self):
+		return self.snapshot.hierarchy()
+
+
+# ##############################
+# Rules
+# ##############################
+
+
+def _compile_name_structure(params):
+	try:
+		expression = re.compile(params.get("name_expression") or "")
+	except re.error:
+		raise ValueError("Invalid name expression %s." % params.get("name_expression"))
+
+	if not expression.pattern:
+		return None
+
+	match = expression.match
+
+	return lambda data: [match(n) is not None for n in data.short_names]
+
+
+def _compile_name_suffix(params):
+	suffix = params.get("suffix") or ""
+
+	if not suffix:
+		return None
+
+	return lambda data: [n.endswith(suffix) for n in data.short_names]
+
+
+def _compile_node_type(params):
+	node_type = params.get("node_type") or ""
+
+	if not node_type:
+		return None
+
+	def evaluate(data):
+		snapshot = data.snapshot
+		scene_hierarchy = data.hierarchy()
+		accepted_types = snapshot.backend.expand_types(node_type)
+		shape_types = snapshot.backend.expand_types("shape")
+		results = []
+
+		for i in data.indices:
+			if snapshot.types[i] in accepted_types:
+				results.append(True)
+				continue
+
+			# Transforms are checked through their shapes
+			shape_indices = [c for c in scene_hierarchy.children(i) if snapshot.types[c] in shape_types]
+			results.append(bool(shape_indices) and all(snapshot.types[c] in accepted_types for c in shape_indices))
+
+		return results
+
+	return evaluate
+
+
+def _compile_node_visibility(params):
+	visible = bool(int(params.get("visible", 1)))
+
+	return lambda data: [v is visible for v in data.visibility()]
+
+
+def _compile_node_location(params):
+	parent_path = (params.get("parent_path") or "").rstrip("|")
+	direct_child = bool(int(params.get("direct_child", 0)))
+
+	if not parent_path:
+		return None
+
+	def evaluate(data):
+		snapshot = data.snapshot
+		scene_hierarchy = data.hierarchy()
+
+		# Long paths are matched against the long name, anything else against the short name
+		if "|" in parent_path:
+			names = snapshot.names
+			expected = parent_path if parent_path.startswith("|") else "|" + parent_path
+		else:
+			names = snapshot.short_names
+			expected = parent_path
+
+		if direct_child is True:
+			parents = scene_hierarchy.parents
+
+			return [parents[i] != -1 and names[parents[i]] == expected for i in data.indices]
+
+		return [
+			scene_hierarchy.nearest_ancestor(i, ("named", expected), lambda a: names[a] == expected) != -1
+			for i in data.indices
+		]
+
+	return evaluate
+
+
+def _compile_attribute_value(params):
+	attribute_name = params.get("attribute_name") or ""
+	expected = params.get("attribute_value")
+
+	if not attribute_name or expected in (None, ""):
+		return None
+
+	try:
+		expected = float(expected)
+	except(TypeError, ValueError):
+		expected = str(expected)
+
+	def matches(value):
+		if value is None:
+			return False
+
+		# Strings are compared as they are, and against the field name of enums
+		if isinstance(expected, str):
+			return str(value) == expected or getattr(value, "field_name", None) == expected
+
+		try:
+			return abs(float(value) - expected) <= channels.DEFAULT_TOLERANCE
+		except(TypeError, ValueError):
+			return False
+
+	return lambda data: [matches(v) for v in data.attribute(attribute_name)], (attribute_name,)
+
+
+def _compile_node_zeroed(params):
+	tolerance = float(params.get("tolerance", channels.DEFAULT_TOLERANCE))
+
+	def evaluate(data):
+		return channels.are_zeroed(dataplan.get_data_planner(data.snapshot), data.indices, tolerance)
+
+	return evaluate
+
+
+RULE_COMPILERS = {
+	"name_structure": _compile_name_structure,
+	"name_suffix": _compile_name_suffix,
+	"node_type": _compile_node_type,
+	"node_visibility": _compile_node_visibility,
+	"node_location": _compile_node_location,
+	"storage": _compile_node_location,
+	"attribute_value": _compile_attribute_value,
+	"node_zeroed": _compile_node_zeroed
+}
+
+
+def compile_rule(rule_type, params=None):
+	"""
+	Compiles the validation received as argument.
+
+	@return: The compiled rule, or None if its parameters make it a no-op (an empty expression, suffix...)
+	@rtype: Rule
+	"""
+
+	params = dict(params or {})
+
+	try:
+		compiled = RULE_COMPILERS[rule_type](params)
+	except KeyError:
+		raise ValueError("Unsupported validation type %s." % rule_type)
+
+	if compiled is None:
+		return None
+
+	try:
+		evaluate, attributes = compiled
+	except TypeError:
+		evaluate, attributes = compiled, ()
+
+	return Rule(rule_type, params, evaluate, attributes)
+
+
+# ##############################
+# Plan
+# ##############################
+
+
+def get_category_indices(snapshot, category):
+	"""
+	Returns the indices of the nodes a category of validations applies to: the nodes discovered for it when it's a
+	discovery category, the nodes of that type otherwise.
+
+	@return: [int,...]
+	@rtype: list
+	"""
+
+	if category in inspect.get_discovery_specs():
+		return inspect.classify_scene(snapshot).indices(category)
+
+	try:
+		return snapshot.indices_of_type(category)
+	except(ValueError, RuntimeError):
+		# Not a node type either
+		return []
+
+
+class ValidationPlan(object):
+	"""
+	Execution plan for the configuration's validations block. Every validation is compiled once into a Rule, rules
+	are grouped by category, and each category's nodes are evaluated by all of its rules in batches, sharing the data
+	they read. Nodes come from the snapshot's classification, so no validation ever scans the scene on its own.
+	"""
+
+	def __init__(self, validations_conf):
+		self.categories = OrderedDict()
+		self.skipped = []
+
+		for category, validations in validations_conf.items():
+			rules = []
+
+			for v in validations:
+				rule = compile_rule(v.get("type"), v.get("params"))
+
+				if rule is None:
+					self.skipped.append((category, v.get("type")))
+				else:
+					rules.append(rule)
+
+			if rules:
+				self.categories[category] = rules
+
+	def explain(self):
+		"""
+		Returns the description of the plan: the rules run for each category and the attributes fetched for them.
+
+		@rtype: str
+		"""
+
+		lines = []
+
+		for category, rules in self.categories.items():
+			attributes = sorted(set(a for r in rules for a in r.attributes))
+			lines.append("%s: %s%s" % (
+				category, ", ".join(r.rule_type for r in rules),
+				" [fetch: %s]" % ", ".join(attributes) if attributes else ""
+			))
+
+		for category, rule_type in self.skipped:
+			lines.append("%s: %s skipped, no parameters set" % (category, rule_type))
+
+		return "\n".join(lines)
+
+	def run(self, snapshot=None):
+		"""
+		Runs every validation over the nodes of its category.
+
+		@return: The short names of the nodes failing each validation, keyed by "category:validation type"
+		@rtype: OrderedDict
+		"""
+
+		if snapshot is None:
+			snapshot = scenesnapshot.take_snapshot()
+
+		results = OrderedDict()
+
+		for category, rules in self.categories.items():
+			data = CategoryData(
+				snapshot, get_category_indices(snapshot, category), [a for r in rules for a in r.attributes]
+			)
+
+			for rule in rules:
+				key = "%s:%s" % (category, rule.rule_type)
+				k = 1
+
+				while key in results:
+					k += 1
+					key = "%s:%s%i" % (category, rule.rule_type, k)
+
+				with profiling.span(key, "validation", len(data)):
+					results[key] = [n for n, r in zip(data.short_names, rule.evaluate(data) if len(data) else []) if not r]
+
+		return results
+
+
+def get_validation_plan():
+	"""
+	Returns the plan compiled from the configuration's validations block, compiled again only when the configuration
+	changed.
+
+	@return: ValidationPlan
+	@rtype: ValidationPlan
+	"""
+
+	global VALIDATION_PLAN, VALIDATION_PLAN_GENERATION
+
+	generation = getconf.get_resolved_conf().generation
+
+	if VALIDATION_PLAN is None or VALIDATION_PLAN_GENERATION != generation:
+		VALIDATION_PLAN = ValidationPlan(getconf.get_validations())
+		VALIDATION_PLAN_GENERATION = generation
+
+	return VALIDATION_PLAN
+
+
+def release_validation_plan():
+	global VALIDATION_PLAN
+
+	VALIDATION_PLAN = None
+
+
+def run_validations(snapshot=None):
+	return get_validation_plan().run(snapshot)
+
+
+# ##############################
+# Single node validations
+# ##############################
+
+
+def _validate_node(rule_type, node, params, snapshot=None):
+	rule = compile_rule(rule_type, params)
+
+	if rule is None:
+		return True
+
+	if snapshot is None:
+		# Only what the node's validation reads is taken, so validating nodes one by one doesn't scan the scene each time
+		snapshot = scenesnapshot.take_node_snapshot(node)
+
+	return rule.evaluate(CategoryData(snapshot, [snapshot.index(snapshot.backend.name_of(node))], rule.attributes))[0]
+
+
+def name_structure(node, name_expression="", snapshot=None):
+	return _validate_node("name_structure", node, {"name_expression": name_expression}, snapshot)
+
+
+def node_type(node, node_type="", snapshot=None):
+	return _validate_node("node_type", node, {"node_type": node_type}, snapshot)
+
+
+def node_visibility(node, visible=1, snapshot=None):
+	return _validate_node("node_visibility", node, {"visible": visible}, snapshot)
+
+
+def name_suffix(node, suffix="", snapshot=None):
+	return _validate_node("name_suffix", node, {"suffix": suffix}, snapshot)
+
+
+def node_location(node, parent_path="", direct_child=0, snapshot=None):
+	return _validate_node("node_location", node, {"parent_path": parent_path, "direct_child": direct_child}, snapshot)
+
+
+def attribute_value(node, attribute_name="", attribute_value="", snapshot=None):
+	return _validate_node(
+		"attribute_value", node, {"attribute_name": attribute_name, "attribute_value": attribute_value}, snapshot
+	)
+
+
+def node_zeroed(node, snapshot=None):
+	return _validate_node("node_zeroed", node, {}, snapshot)
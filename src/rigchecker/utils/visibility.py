@@ -0,0 +1,132 @@
+from . import dataplan
+from . import scheduler
+
+maya_useNewAPI = True
+
+VISIBILITY_ATTRIBUTES = ("visibility", "lodVisibility", "overrideEnabled", "overrideVisibility")
+
+
+def get_layer_hidden_indices(snapshot):
+	"""
+	Returns the indices of all the nodes in a hidden display layer. Layer membership is read from the connections
+	between the layers' drawInfo and their members' drawOverride attributes.
+
+	@return: {int,...}
+	@rtype: set
+	"""
+
+	scene_backend = snapshot.backend
+	layer_indices = snapshot.indices_of_type("displayLayer")
+	hidden = set()
+
+	if not layer_indices:
+		return hidden
+
+	view = dataplan.get_data_planner(snapshot).view(layer_indices, ["name", "attr:visibility"])
+
+	for layer_name, layer_visibility in view.rows(["name", "attr:visibility"]):
+		if layer_visibility:
+			continue
+
+		for member_name in scene_backend.connections(layer_name, "drawInfo", source=False, destination=True):
+			try:
+				hidden.add(snapshot.index(member_name))
+			except KeyError:
+				pass
+
+	return hidden
+
+
+def compute_visibility(snapshot):
+	"""
+	Computes the effective visibility of every DAG node in the snapshot in a single top-down pass. A node is visible
+	when its parent is, and its own visibility, lodVisibility and drawing overrides allow it, it isn't an intermediate
+	object and it doesn't belong to a hidden display layer. Visibility attributes are read in one bulk query, through
+	the run's data planner.
+
+	@return: For each index in the snapshot, whether the node is visible. None for non DAG nodes
+	@rtype: list
+	"""
+
+	return scheduler.run_pass(iter_compute_visibility(snapshot))
+
+
+def iter_compute_visibility(snapshot, chunk_size=None):
+	"""
+	Resumable counterpart of compute_visibility. The attributes of chunk_size nodes are read, and then chunk_size nodes
+	evaluated top-down, per step, see scheduler.PassStep.
+
+	@return: (scheduler.PassStep,...), then the visibility of every node
+	@rtype: generator
+	"""
+
+	scene_hierarchy = snapshot.hierarchy()
+	parents = scene_hierarchy.parents
+	dag_indices = snapshot.indices_of_type("dagNode")
+	visible = [None] * len(snapshot)
+
+	if not dag_indices:
+		yield visible
+		return
+
+	layer_hidden = get_layer_hidden_indices(snapshot)
+	local_visible = {}
+	total = 2 * len(dag_indices)
+
+	data_planner = dataplan.get_data_planner(snapshot)
+	visibility_columns = dataplan.attribute_columns(VISIBILITY_ATTRIBUTES)
+
+	for start, stop in scheduler.chunks(len(dag_indices), chunk_size):
+		chunk = dag_indices[start:stop]
+		rows = data_planner.view(chunk, visibility_columns).rows(visibility_columns)
+
+		for i, (v, lod_v, override_enabled, override_v) in zip(chunk, rows):
+			local_visible[i] = (
+				bool(v) and bool(lod_v) and (not override_enabled or bool(override_v)) and
+				not snapshot.is_intermediate(i) and i not in layer_hidden
+			)
+
+		yield scheduler.PassStep("visibility", stop, total)
+
+	# Each node's visibility derives from its parent's, which is only evaluated once for all of its children
+	pending = [i for i in dag_indices if parents[i] == -1 or parents[i] not in local_visible]
+	done = 0
+
+	for i in pending:
+		visible[i] = local_visible[i]
+
+	while pending:
+		i = pending.pop()
+		done += 1
+
+		for c in scene_hierarchy.children(i):
+			if c in local_visible:
+				visible[c] = visible[i] and local_visible[c]
+				pending.append(c)
+
+		if chunk_size and done % chunk_size == 0:
+			yield scheduler.PassStep("visibility", len(dag_indices) + done, total)
+
+	yield visible
+
+
+def get_visibility(snapshot):
+	"""
+	Returns the effective visibility of every node in the snapshot received as argument, computed once per snapshot.
+	See compute_visibility.
+
+	@rtype: list
+	"""
+
+	return snapshot.memo("visibility", lambda: compute_visibility(snapshot))
+
+
+def iter_visibility(snapshot, chunk_size=None):
+	"""
+	Resumable counterpart of get_visibility, see iter_compute_visibility.
+
+	@return: (scheduler.PassStep,...)
+	@rtype: generator
+	"""
+
+	return snapshot.iter_memo("visibility", lambda: iter_compute_visibility(snapshot, chunk_size))
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The package isn't installed, it's loaded from the source tree
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,62 @@
+import unittest
+
+from rigchecker.utils import backend
+
+
+class DownstreamTest(unittest.TestCase):
+	"""
+	Walks geometry downstream from skin clusters in an in-memory scene, the way the skinned geos are found.
+	"""
+
+	def setUp(self):
+		self.scene = backend.MemoryBackend()
+
+		self.create_mesh("body_geo")
+		self.create_mesh("body_blendShape_target")
+		self.create_mesh("body_wrapped")
+		self.create_mesh("arm_geo")
+
+		self.scene.create_node("skinCluster1", "skinCluster")
+		self.scene.create_node("tweak1", "tweak")
+		self.scene.create_node("blendShape1", "blendShape")
+		self.scene.create_node("wrap1", "wrap")
+		self.scene.create_node("skinCluster2", "skinCluster")
+
+		# The deformer chain of the body ends in its mesh, which drives a blend shape target and a wrapped mesh
+		self.scene.connect_attr("skinCluster1.outputGeometry[0]", "tweak1.input[0]")
+		self.scene.connect_attr("tweak1.outputGeometry[0]", "body_geoShape.inMesh")
+		self.scene.connect_attr("body_geoShape.worldMesh[0]", "blendShape1.inputTarget[0]")
+		self.scene.connect_attr("blendShape1.outputGeometry[0]", "body_blendShape_targetShape.inMesh")
+		self.scene.connect_attr("body_geoShape.worldMesh[0]", "wrap1.driverPoints[0]")
+		self.scene.connect_attr("wrap1.outputGeometry[0]", "body_wrappedShape.inMesh")
+
+		# Connections geometry doesn't flow through aren't walked
+		self.scene.connect_attr("skinCluster2.message", "body_wrapped.translateX")
+		self.scene.connect_attr("skinCluster2.outputGeometry[0]", "arm_geoShape.inMesh")
+
+	def create_mesh(self, name):
+		self.scene.create_node(name + "Shape", "mesh", self.scene.create_node(name, "transform"))
+
+	def test_skinned_meshes(self):
+		self.assertEqual(
+			self.scene.downstream(["skinCluster1", "skinCluster2"], "mesh", geometry=True),
+			set(["|body_geo|body_geoShape", "|arm_geo|arm_geoShape"])
+		)
+
+	def test_shared_visited(self):
+		visited = set()
+
+		self.assertEqual(
+			self.scene.downstream(["skinCluster1"], "mesh", visited, geometry=True), set(["|body_geo|body_geoShape"])
+		)
+		self.assertEqual(self.scene.downstream(["skinCluster1"], "mesh", visited, geometry=True), set())
+		self.assertEqual(
+			self.scene.downstream(["skinCluster2"], "mesh", visited, geometry=True), set(["|arm_geo|arm_geoShape"])
+		)
+
+	def test_whole_graph(self):
+		self.assertIn("|body_wrapped|body_wrappedShape", self.scene.downstream(["skinCluster1"], "mesh"))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,84 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from rigchecker import batch
+from rigchecker.utils import backend, inspectutils, validations
+
+RIG_MA = u"""createNode transform -n "arm_Controler";
+	setAttr ".tx" 1;
+createNode nurbsCurve -n "arm_ControlerShape" -p "arm_Controler";
+"""
+
+AMBIGUOUS_MA = u"""createNode transform -n "a";
+createNode transform -n "ctrl" -p "a";
+createNode transform -n "b";
+createNode transform -n "ctrl" -p "b";
+setAttr "ctrl.tx" 1;
+"""
+
+
+class BrokenValidationPlan(object):
+	def run(self, snapshot):
+		return {}["rule"]
+
+
+class CheckSceneFileTest(unittest.TestCase):
+	"""
+	Checks scene files in the test's own process, with the worker set up by hand, so neither the configuration nor
+	Maya are loaded.
+	"""
+
+	def setUp(self):
+		self.temp_dir_path = tempfile.mkdtemp(prefix="rigchecker_test")
+		self.previous_backend = backend.BACKEND
+		self.previous_worker = dict(batch.WORKER)
+
+		batch.WORKER.clear()
+		batch.WORKER.update(inspectutils=inspectutils, validation_plan=validations.ValidationPlan({}), maya=False)
+
+	def tearDown(self):
+		batch.WORKER.clear()
+		batch.WORKER.update(self.previous_worker)
+		backend.set_backend(self.previous_backend)
+
+		shutil.rmtree(self.temp_dir_path, ignore_errors=True)
+
+	def write(self, file_name, text):
+		file_path = os.path.join(self.temp_dir_path, file_name)
+
+		with io.open(file_path, "w", encoding="utf-8") as scene_file:
+			scene_file.write(text)
+
+		return file_path
+
+	def test_checked(self):
+		result = batch.check_scene_file(self.write("rig.ma", RIG_MA))
+
+		self.assertIs(result["checks"]["all_controls_are_zeroed"], False)
+		self.assertIs(result["passed"], False)
+		self.assertNotIn("error", result)
+
+	def test_scene_errors(self):
+		for file_path in (os.path.join(self.temp_dir_path, "missing.ma"), self.write("ambiguous.ma", AMBIGUOUS_MA)):
+			result = batch.check_scene_file(file_path)
+
+			self.assertIs(result["passed"], False)
+			self.assertIn("error", result)
+			self.assertNotIn("internal_error", result)
+
+	def test_internal_error(self):
+		batch.WORKER["validation_plan"] = BrokenValidationPlan()
+
+		result = batch.check_scene_file(self.write("rig.ma", RIG_MA))
+
+		self.assertIs(result["passed"], False)
+		self.assertNotIn("error", result)
+		self.assertEqual(result["internal_error"], "KeyError: 'rule'")
+		self.assertIn('return {}["rule"]', result["traceback"])
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+
+from rigchecker.utils import backend, channels, dataplan, inspectutils, scenesnapshot
+
+
+class ZeroedMasksTest(unittest.TestCase):
+	"""
+	Reads the channels of controls in an in-memory scene and makes sure only the unlocked channels off their zeroed
+	value by more than the tolerance fail.
+	"""
+
+	def setUp(self):
+		self.previous_backend = backend.BACKEND
+		self.scene = backend.MemoryBackend()
+		backend.set_backend(self.scene)
+
+		self.zeroed = self.add_control("zeroed")
+		self.moved = self.add_control("moved")
+		self.scaled = self.add_control("scaled")
+		self.locked = self.add_control("locked")
+		self.nearly = self.add_control("nearly")
+
+		self.scene.set_attr(self.moved, "translateX", 1.0)
+		self.scene.set_attr(self.moved, "rotateZ", -45.0)
+		self.scene.set_attr(self.scaled, "scaleY", 2.0)
+		self.scene.set_attr(self.locked, "translateY", 3.0, lock=True)
+		self.scene.set_attr(self.nearly, "translateZ", 1e-3)
+
+	def tearDown(self):
+		backend.set_backend(self.previous_backend)
+
+	def add_control(self, name):
+		control = self.scene.create_node(name + "_Controler", "transform")
+		self.scene.create_node(name + "_ControlerShape", "nurbsCurve", control)
+
+		return control
+
+	def test_masks(self):
+		names = [self.zeroed, self.moved, self.scaled, self.locked, self.nearly]
+		masks = channels.zeroed_masks(channels.read_channels(names))
+
+		self.assertEqual(masks.as_dict(), {
+			self.moved: ["translateX", "rotateZ"], self.scaled: ["scaleY"], self.nearly: ["translateZ"]
+		})
+		self.assertEqual(masks.failed_names(), [self.moved, self.scaled, self.nearly])
+		self.assertEqual([masks.failed(k) for k in range(len(masks))], [False, True, True, False, True])
+
+	def test_tolerance(self):
+		table = channels.read_channels([self.nearly, self.moved])
+
+		self.assertEqual(channels.zeroed_masks(table, tolerance=1e-2).failed_names(), [self.moved])
+		self.assertEqual(channels.zeroed_masks(table, tolerance=1e-4).failed_names(), [self.nearly, self.moved])
+
+	def test_controls_zeroed_masks(self):
+		snapshot = scenesnapshot.take_snapshot()
+
+		# Controls discovered by their shape are checked through their transform
+		masks = inspectutils.get_controls_zeroed_masks(snapshot, tolerance=1e-2)
+
+		self.assertEqual(sorted(masks.failed_names()), [self.moved, self.scaled])
+		self.assertIs(inspectutils.all_controls_are_zeroed(snapshot), False)
+
+	def test_are_zeroed(self):
+		skin_cluster = self.scene.create_node("skinCluster1", "skinCluster")
+		snapshot = scenesnapshot.take_snapshot()
+
+		indices = [snapshot.index(n) for n in (self.moved + "|moved_ControlerShape", self.zeroed, skin_cluster)]
+
+		# Nodes with no transform have no channels to check
+		self.assertEqual(channels.are_zeroed(dataplan.get_data_planner(snapshot), indices), [False, True, True])
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,372 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from collections import OrderedDict
+
+from rigchecker import getconf
+
+DEFAULT_CONF = OrderedDict([
+	("name", "Default"),
+	("find", OrderedDict([
+		("controls", OrderedDict([
+			("suffix", "Controler"), ("types", ["nurbsCurve"]), ("exp", ""),
+			("discovery_methods", ["suffix", "type", "expression"]), ("selected_discovery_methods", ["suffix"])
+		])),
+		("geo", OrderedDict([
+			("suffix", "geo"), ("types", ["mesh"]), ("selected_discovery_methods", ["type"])
+		]))
+	])),
+	("forbidden", []),
+	("validations", OrderedDict([
+		("controls", [OrderedDict([("type", "node_zeroed"), ("params", OrderedDict([("tolerance", 0.001)]))])])
+	]))
+])
+
+STUDIO_PROFILE = OrderedDict([("studio", "Studio"), ("controls_suffix", "CTL"), ("forbidden_types", ["camera"])])
+
+
+class ConfTestCase(unittest.TestCase):
+	"""
+	Redirects the default configuration, the user's configuration and the profiles to a temporary directory, so the
+	configuration files shipped with the tool and the user's own are left untouched.
+	"""
+
+	def setUp(self):
+		self.temp_dir_path = tempfile.mkdtemp(prefix="rigchecker_test")
+		self.conf_file_path = os.path.join(self.temp_dir_path, "config.json")
+		self.def_conf_file_path = os.path.join(self.temp_dir_path, "default.json")
+		self.profiles_dir_path = os.path.join(self.temp_dir_path, "profiles")
+
+		self.write(self.def_conf_file_path, DEFAULT_CONF)
+		self.write(os.path.join(self.profiles_dir_path, "studio", "profile.json"), STUDIO_PROFILE)
+
+		self.functions = (getconf.get_conf_file_path, getconf.get_def_conf_file_path, getconf.get_profiles_dir_path)
+		self.stat_window = getconf.CONF_CACHE.stat_window
+
+		getconf.get_conf_file_path = lambda: self.conf_file_path
+		getconf.get_def_conf_file_path = lambda: self.def_conf_file_path
+		getconf.get_profiles_dir_path = lambda: self.profiles_dir_path
+
+		# Files written by the tests are read back at once
+		getconf.CONF_CACHE.stat_window = 0
+		self.reset_conf()
+
+	def tearDown(self):
+		getconf.get_conf_file_path, getconf.get_def_conf_file_path, getconf.get_profiles_dir_path = self.functions
+		getconf.CONF_CACHE.stat_window = self.stat_window
+		self.reset_conf()
+
+		shutil.rmtree(self.temp_dir_path, ignore_errors=True)
+
+	def reset_conf(self):
+		getconf.ACTIVE_PROFILE = None
+		getconf.LAYERED_CONFS.clear()
+		getconf.CONF_CACHE.invalidate()
+		getconf.invalidate_conf()
+
+	def write(self, file_path, conf):
+		if not os.path.isdir(os.path.dirname(file_path)):
+			os.makedirs(os.path.dirname(file_path))
+
+		with open(file_path, "w") as conf_file:
+			json.dump(conf, conf_file)
+
+	def read(self, file_path):
+		with open(file_path, "r") as conf_file:
+			return json.load(conf_file, object_pairs_hook=OrderedDict)
+
+
+class LayeredConfTest(ConfTestCase):
+	def test_profile_layering(self):
+		self.write(self.conf_file_path, OrderedDict([("profile", "studio")]))
+
+		conf = getconf.get_conf()
+
+		self.assertEqual(conf["name"], "Studio")
+		self.assertEqual(conf["find"]["controls"]["suffix"], "CTL")
+		self.assertEqual(conf["find"]["controls"]["types"], ["nurbsCurve"])
+		self.assertEqual(conf["forbidden"], ["camera"])
+
+	def test_provenance(self):
+		self.write(self.conf_file_path, OrderedDict([
+			("profile", "studio"), ("find", OrderedDict([("geo", OrderedDict([("suffix", "GEO")]))]))
+		]))
+
+		self.assertEqual(getconf.get_provenance("find.controls.suffix"), "profile:studio")
+		self.assertEqual(getconf.get_provenance("find.controls.types"), "default")
+		self.assertEqual(getconf.get_provenance("find.geo.suffix"), "user")
+		self.assertEqual(getconf.get_provenance("find.geo.types"), "default")
+		self.assertIsNone(getconf.get_provenance("find.joints.suffix"))
+
+	def test_switch_profile(self):
+		self.assertEqual(getconf.get_conf()["find"]["controls"]["suffix"], "Controler")
+
+		getconf.set_active_profile("studio")
+		self.assertEqual(getconf.get_conf()["find"]["controls"]["suffix"], "CTL")
+
+		getconf.set_active_profile("")
+		self.assertEqual(getconf.get_conf()["find"]["controls"]["suffix"], "Controler")
+
+		with self.assertRaises(ValueError):
+			getconf.set_active_profile("missing")
+
+
+class SaveConfTest(ConfTestCase):
+	def test_only_overrides_written(self):
+		self.write(self.conf_file_path, OrderedDict([("profile", "studio")]))
+
+		# The UI saves the configuration in effect, whole
+		conf = json.loads(json.dumps(getconf.get_conf()), object_pairs_hook=OrderedDict)
+		conf["find"]["geo"]["suffix"] = "GEO"
+		getconf.save_conf(conf)
+
+		self.assertEqual(self.read(self.conf_file_path), OrderedDict([
+			("profile", "studio"), ("find", OrderedDict([("geo", OrderedDict([("suffix", "GEO")]))]))
+		]))
+		self.assertEqual(getconf.get_provenance("find.controls.suffix"), "profile:studio")
+
+	def test_lower_layers_show_through(self):
+		self.write(self.conf_file_path, OrderedDict([("profile", "studio")]))
+		getconf.save_conf(json.loads(json.dumps(getconf.get_conf()), object_pairs_hook=OrderedDict))
+
+		self.write(
+			os.path.join(self.profiles_dir_path, "studio", "profile.json"),
+			OrderedDict(STUDIO_PROFILE, controls_suffix="CTRL")
+		)
+
+		self.assertEqual(getconf.get_conf()["find"]["controls"]["suffix"], "CTRL")
+
+	def test_override_dropped(self):
+		self.write(self.conf_file_path, OrderedDict([("forbidden", ["light"])]))
+
+		getconf.save_conf(OrderedDict([("forbidden", [])]))
+
+		self.assertEqual(self.read(self.conf_file_path), OrderedDict())
+		self.assertEqual(getconf.get_provenance("forbidden"), "default")
+
+	def test_unchanged_not_written(self):
+		self.write(self.conf_file_path, OrderedDict([("name", "Mine")]))
+		modified_time = os.stat(self.conf_file_path).st_mtime
+
+		getconf.save_conf(OrderedDict([("name", "Mine"), ("forbidden", [])]))
+
+		self.assertEqual(os.stat(self.conf_file_path).st_mtime, modified_time)
+
+
+class WriteConfTest(ConfTestCase):
+	def test_write_conf_file(self):
+		self.write(self.conf_file_path, OrderedDict([("name", "Previous")]))
+		os.chmod(self.conf_file_path, 0o640)
+
+		getconf.write_conf_file(self.conf_file_path, OrderedDict([("name", "Mine")]))
+
+		self.assertEqual(self.read(self.conf_file_path), OrderedDict([("name", "Mine")]))
+		self.assertEqual(os.stat(self.conf_file_path).st_mode & 0o777, 0o640)
+		self.assertEqual(sorted(os.listdir(self.temp_dir_path)), ["config.json", "default.json", "profiles"])
+
+	def test_failed_write(self):
+		self.write(self.conf_file_path, OrderedDict([("name", "Previous")]))
+
+		# Sets can't be serialized, so the write fails midway
+		with self.assertRaises(TypeError):
+			getconf.write_conf_file(self.conf_file_path, OrderedDict([("name", "Mine"), ("forbidden", set())]))
+
+		self.assertEqual(self.read(self.conf_file_path), OrderedDict([("name", "Previous")]))
+		self.assertEqual(sorted(os.listdir(self.temp_dir_path)), ["config.json", "default.json", "profiles"])
+
+	def test_sections_not_shared(self):
+		self.write(self.conf_file_path, OrderedDict([("name", "Mine")]))
+		previous_conf = getconf.get_conf()
+
+		getconf.save_conf(OrderedDict([("name", "Other")]))
+		conf = getconf.get_conf()
+
+		# Only the name was merged again, the rest was copied from the previous resolution
+		self.assertEqual(conf["name"], "Other")
+		self.assertEqual(conf["find"], previous_conf["find"])
+
+		previous_conf["find"]["controls"]["suffix"] = "Modified"
+		self.assertEqual(getconf.get_conf()["find"]["controls"]["suffix"], "Controler")
+
+
+class ConfCacheTest(ConfTestCase):
+	def setUp(self):
+		super(ConfCacheTest, self).setUp()
+
+		self.loaded = []
+		self.cache = getconf.ConfCache(stat_window=0)
+
+	def load(self, file_path):
+		self.loaded.append(file_path)
+
+		return self.read(file_path)
+
+	def test_unchanged_not_parsed(self):
+		self.write(self.conf_file_path, OrderedDict([("name", "Mine")]))
+
+		self.assertEqual(self.cache.get(self.conf_file_path, self.load), OrderedDict([("name", "Mine")]))
+		self.assertEqual(self.cache.get(self.conf_file_path, self.load), OrderedDict([("name", "Mine")]))
+		self.assertEqual(len(self.loaded), 1)
+		self.assertEqual(self.cache.generation(self.conf_file_path), 1)
+
+	def test_size_changed(self):
+		self.write(self.conf_file_path, OrderedDict([("name", "Mine")]))
+		self.cache.get(self.conf_file_path, self.load)
+		modified_time = os.stat(self.conf_file_path).st_mtime
+
+		# Written within the file system's time resolution, only the size tells the file changed
+		self.write(self.conf_file_path, OrderedDict([("name", "Another")]))
+		os.utime(self.conf_file_path, (modified_time, modified_time))
+
+		self.assertEqual(self.cache.get(self.conf_file_path, self.load), OrderedDict([("name", "Another")]))
+		self.assertEqual(self.cache.generation(self.conf_file_path), 2)
+
+	def test_modification_time_changed(self):
+		self.write(self.conf_file_path, OrderedDict([("name", "Mine")]))
+		self.cache.get(self.conf_file_path, self.load)
+		modified_time = os.stat(self.conf_file_path).st_mtime
+
+		# Same size, touched later
+		self.write(self.conf_file_path, OrderedDict([("name", "Mind")]))
+		os.utime(self.conf_file_path, (modified_time + 10, modified_time + 10))
+
+		self.assertEqual(self.cache.get(self.conf_file_path, self.load), OrderedDict([("name", "Mind")]))
+		self.assertEqual(len(self.loaded), 2)
+
+	def test_stat_window(self):
+		self.cache.stat_window = 60
+		self.write(self.conf_file_path, OrderedDict([("name", "Mine")]))
+		self.cache.get(self.conf_file_path, self.load)
+
+		# Changes go unnoticed until the window expires, or the file is invalidated
+		self.write(self.conf_file_path, OrderedDict([("name", "Another")]))
+		self.assertEqual(self.cache.get(self.conf_file_path, self.load), OrderedDict([("name", "Mine")]))
+
+		self.cache.invalidate(self.conf_file_path)
+		self.assertEqual(self.cache.get(self.conf_file_path, self.load), OrderedDict([("name", "Another")]))
+
+	def test_missing_file(self):
+		self.assertIsNone(self.cache.get(self.conf_file_path, self.load))
+
+		self.write(self.conf_file_path, OrderedDict([("name", "Mine")]))
+		self.assertEqual(self.cache.get(self.conf_file_path, self.load), OrderedDict([("name", "Mine")]))
+
+	def test_external_edit(self):
+		self.write(self.conf_file_path, OrderedDict([("name", "Mine")]))
+		self.assertEqual(getconf.get_conf()["name"], "Mine")
+
+		# Edited by another session
+		self.write(self.conf_file_path, OrderedDict([("name", "Another session's")]))
+		self.assertEqual(getconf.get_conf()["name"], "Another session's")
+
+
+class ResolvedConfTest(ConfTestCase):
+	def test_read_only(self):
+		resolved_conf = getconf.get_resolved_conf()
+		find_spec = resolved_conf.find_spec("controls")
+
+		with self.assertRaises(AttributeError):
+			resolved_conf.name = "Mine"
+
+		with self.assertRaises(AttributeError):
+			find_spec.suffix = "CTL"
+
+		with self.assertRaises(AttributeError):
+			find_spec.undeclared = True
+
+		# Lists are frozen, so the configuration can't be changed through them either
+		self.assertEqual(find_spec.type_names, ("nurbsCurve",))
+		self.assertEqual(find_spec.types, frozenset(["nurbsCurve"]))
+		self.assertEqual(find_spec.selected_discovery_methods, ("suffix",))
+		self.assertEqual(resolved_conf.forbidden, ())
+
+	def test_defaults(self):
+		self.write(self.conf_file_path, OrderedDict([
+			("find", OrderedDict([("controls", OrderedDict([("suffix", "CTL"), ("exp", "(unclosed")]))]))
+		]))
+
+		find_spec = getconf.get_find_spec("controls")
+
+		# Values missing from the user's configuration are read from the default one
+		self.assertEqual(find_spec.suffix, "CTL")
+		self.assertEqual(find_spec.type_names, ("nurbsCurve",))
+		self.assertIsNone(find_spec.expression)
+
+		# Categories found in neither configuration get an empty spec, the same one every time
+		self.assertEqual(getconf.get_find_spec("joints").suffix, "")
+		self.assertIs(getconf.get_find_spec("joints"), getconf.get_find_spec("joints"))
+
+	def test_resolved_again(self):
+		resolved_conf = getconf.get_resolved_conf()
+		self.assertIs(getconf.get_resolved_conf(), resolved_conf)
+
+		self.write(self.conf_file_path, OrderedDict([("name", "Mine")]))
+
+		self.assertIsNot(getconf.get_resolved_conf(), resolved_conf)
+		self.assertEqual(getconf.get_resolved_conf().name, "Mine")
+		self.assertEqual(resolved_conf.name, "Default")
+
+
+class DiscoveryRegistryTest(ConfTestCase):
+	def setUp(self):
+		super(DiscoveryRegistryTest, self).setUp()
+
+		self.registry = getconf.DiscoveryRegistry()
+		self.notified = []
+		self.registry.add_listener(self.listener)
+
+	def listener(self, changed):
+		self.notified.append(changed)
+
+	def write_find(self, controls, geo=None):
+		find = OrderedDict([("controls", controls)])
+
+		if geo is not None:
+			find["geo"] = geo
+
+		self.write(self.conf_file_path, OrderedDict([("find", find)]))
+
+	def test_only_changed_categories(self):
+		controls_spec = self.registry.get("controls")
+		geo_spec = self.registry.get("geo")
+		self.assertEqual(controls_spec.suffix, "Controler")
+
+		self.write_find(OrderedDict([("suffix", "CTL")]))
+
+		self.assertEqual(self.registry.sync(), frozenset(["controls"]))
+		self.assertEqual(self.notified, [frozenset(["controls"])])
+		self.assertEqual(self.registry.get("controls").suffix, "CTL")
+		self.assertIs(self.registry.get("geo"), geo_spec)
+
+	def test_unselected_methods_ignored(self):
+		controls_spec = self.registry.get("controls")
+
+		# Controls are only discovered by their suffix
+		self.write_find(OrderedDict([("types", ["transform"])]), OrderedDict([("suffix", "GEO")]))
+
+		self.assertEqual(self.registry.sync(), frozenset())
+		self.assertEqual(self.notified, [])
+		self.assertIs(self.registry.get("controls"), controls_spec)
+
+	def test_listeners(self):
+		self.registry.get("controls")
+
+		# Registering a listener with the same module and name again replaces it
+		self.registry.add_listener(self.listener)
+		self.write_find(OrderedDict([("suffix", "CTL")]))
+		self.registry.sync()
+
+		self.assertEqual(self.notified, [frozenset(["controls"])])
+
+		self.registry.remove_listener(self.listener)
+		self.write_find(OrderedDict([("suffix", "CTRL")]))
+
+		self.assertEqual(self.registry.sync(), frozenset(["controls"]))
+		self.assertEqual(self.notified, [frozenset(["controls"])])
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,24 @@
+import unittest
+
+from rigchecker.benchmarks import synthrig
+from rigchecker.utils import backend, calltrace, inspectutils
+
+
+class BulkCallsTest(unittest.TestCase):
+	"""
+	Traces the calls every check issues on synthetic rigs of growing size, and makes sure none of them is issued once
+	per node.
+	"""
+
+	def setUp(self):
+		self.previous_backend = backend.BACKEND
+
+	def tearDown(self):
+		backend.set_backend(self.previous_backend)
+
+	def test_no_per_node_calls(self):
+		calltrace.assert_no_per_node_calls(lambda: inspectutils.run_all_checks(), synthrig.build_rig_of_size)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,63 @@
+import io
+import unittest
+
+from rigchecker.utils import backend, mareader
+
+PARTIAL_PATHS_MA = u"""createNode transform -n "rig_grp";
+createNode transform -n "grp" -p "rig_grp";
+createNode transform -n "ctrl" -p "grp";
+createNode nurbsCurve -n "ctrlShape" -p "grp|ctrl";
+createNode transform -n "other";
+createNode transform -n "ctrl" -p "other";
+createNode transform -n "jnt_grp";
+connectAttr "grp|ctrl.tx" "other|ctrl.tx";
+parent "other|ctrl" "jnt_grp";
+setAttr "grp|ctrl.tx" 3;
+"""
+
+NEGATIVE_VALUES_MA = u"""createNode transform -n "arm_Controler";
+	setAttr ".t" -type "double3" -1 0 -2.5 ;
+	setAttr ".rx" -45;
+	setAttr -k off ".ry" -30;
+	setAttr ".s" -type "double3" -1 1 1 ;
+"""
+
+
+def read(text):
+	reader = mareader.MaReader()
+
+	for line in io.StringIO(text):
+		reader.feed(line)
+
+	return reader
+
+
+class MaReaderTest(unittest.TestCase):
+	def test_partial_paths(self):
+		reader = read(PARTIAL_PATHS_MA)
+		scene = reader.scene
+
+		self.assertEqual(reader.skipped_statements, 0)
+		self.assertEqual(scene.parent("|rig_grp|grp|ctrl|ctrlShape"), "|rig_grp|grp|ctrl")
+		self.assertEqual(scene.parent("|jnt_grp|ctrl"), "|jnt_grp")
+		self.assertEqual(scene.connections("|rig_grp|grp|ctrl"), ["|jnt_grp|ctrl"])
+		self.assertEqual(scene.get_attr("|rig_grp|grp|ctrl", "translateX"), 3.0)
+
+	def test_negative_values(self):
+		reader = read(NEGATIVE_VALUES_MA)
+		scene = reader.scene
+		values = [
+			scene.get_attr("|arm_Controler", a)
+			for a in ("translateX", "translateY", "translateZ", "rotateX", "rotateY", "scaleX", "scaleY", "scaleZ")
+		]
+
+		self.assertEqual(reader.skipped_statements, 0)
+		self.assertEqual(values, [-1.0, 0.0, -2.5, -45.0, -30.0, -1.0, 1.0, 1.0])
+
+	def test_ambiguous_name(self):
+		with self.assertRaises(backend.AmbiguousNameError):
+			read(PARTIAL_PATHS_MA + u'setAttr "ctrl.tx" 1;\n')
+
+
+if __name__ == "__main__":
+	unittest.main()
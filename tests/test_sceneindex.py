@@ -0,0 +1,109 @@
+import unittest
+
+from rigchecker.utils import backend, classifier, inspect, inspectutils, sceneindex
+
+
+class SceneIndexTest(unittest.TestCase):
+	"""
+	Drives a scene index with a FakeEventSource mirroring changes made to an in-memory scene, and makes sure the
+	results reused by run_indexed_checks match a fresh evaluation.
+	"""
+
+	def setUp(self):
+		self.previous_backend = backend.BACKEND
+		self.scene = backend.MemoryBackend()
+		backend.set_backend(self.scene)
+
+		self.source = sceneindex.FakeEventSource()
+		self.ids = {}
+
+		self.add_node("geo_grp", "transform")
+		self.add_node("body_geo", "transform", "geo_grp")
+		self.add_node("body_geoShape", "mesh", "body_geo")
+		self.add_node("arm_Controler", "transform")
+		self.add_node("arm_ControlerShape", "nurbsCurve", "arm_Controler")
+
+		self.index = sceneindex.SceneIndex(
+			classifier.DiscoveryClassifier(inspect.get_discovery_specs(), inspect.NO_INTERMEDIATE_TITLES), self.source
+		)
+
+	def tearDown(self):
+		self.index.disconnect()
+		backend.set_backend(self.previous_backend)
+
+	def add_node(self, name, node_type, parent=None):
+		# Nodes created before the index connects populate it, the others are emitted as they're added
+		self.scene.create_node(name, node_type, None if parent is None else self.scene_name(parent))
+		self.ids[name] = node_id = len(self.ids)
+		parent_id = None if parent is None else self.ids[parent]
+
+		if self.source.indices:
+			self.source.emit_node_added(node_id, name, node_type, parent_id)
+		else:
+			self.source.nodes.append((node_id, name, node_type, parent_id))
+
+	def scene_name(self, name):
+		return next(n for n in self.scene.names if n.rpartition("|")[2] == name)
+
+	def failed(self, check_name):
+		return inspectutils.run_indexed_checks(self.index)[check_name]
+
+	def test_unchanged_nodes_reuse_results(self):
+		self.assertEqual(self.failed("geo_is_not_constrained"), [])
+		self.assertEqual(self.failed("geo_is_not_constrained"), [])
+		self.assertEqual(self.index.last_run_stats["geo_is_not_constrained"], {"evaluated": 0, "reused": 1})
+
+	def test_constraint_connected_to_transform(self):
+		self.assertEqual(self.failed("geo_is_not_constrained"), [])
+
+		self.add_node("body_geo_parentConstraint1", "parentConstraint")
+		self.scene.connect_attr("body_geo_parentConstraint1.constraintTranslateX", "|geo_grp|body_geo.translateX")
+		self.source.emit_attribute_changed(self.ids["body_geo"], "translateX")
+
+		self.assertEqual(self.failed("geo_is_not_constrained"), ["|geo_grp|body_geo|body_geoShape"])
+		self.assertFalse(inspectutils.geo_is_not_constrained("|geo_grp|body_geo|body_geoShape"))
+
+	def test_constraint_parented_under_transform(self):
+		self.assertEqual(self.failed("geo_is_not_constrained"), [])
+
+		self.add_node("body_geo_parentConstraint1", "parentConstraint", "body_geo")
+
+		self.assertEqual(self.failed("geo_is_not_constrained"), ["|geo_grp|body_geo|body_geoShape"])
+
+	def test_shape_added_under_grandparent(self):
+		self.assertEqual(self.failed("geo_is_outside_control"), [])
+
+		# The geo's parent holding a shape isn't a group anymore
+		self.add_node("geo_grpShape", "nurbsCurve", "geo_grp")
+
+		self.assertEqual(self.failed("geo_is_outside_control"), ["|geo_grp|body_geo|body_geoShape"])
+
+	def test_branch_reparented_under_control(self):
+		self.assertEqual(self.failed("geo_is_outside_control"), [])
+
+		self.scene.reparent("|geo_grp|body_geo", "|arm_Controler")
+		self.source.emit_node_reparented(self.ids["body_geo"], self.ids["arm_Controler"])
+
+		self.assertEqual(self.failed("geo_is_outside_control"), ["|arm_Controler|body_geo|body_geoShape"])
+
+	def test_long_names(self):
+		self.assertEqual(self.index.long_name(self.ids["arm_Controler"]), "|arm_Controler")
+		self.assertEqual(self.index.long_name(self.ids["body_geoShape"]), "|geo_grp|body_geo|body_geoShape")
+
+		# Nodes outside of the DAG have no path
+		self.source.emit_node_added(len(self.ids), "skinCluster1", "skinCluster", dag=False)
+		self.assertEqual(self.index.long_name(len(self.ids)), "skinCluster1")
+
+	def test_intermediate_toggled(self):
+		shape_id = self.ids["body_geoShape"]
+		self.assertIn(shape_id, self.index.members("geo"))
+
+		self.source.emit_attribute_changed(shape_id, "intermediateObject", True)
+		self.assertNotIn(shape_id, self.index.members("geo"))
+
+		self.source.emit_attribute_changed(shape_id, "intermediateObject", False)
+		self.assertIn(shape_id, self.index.members("geo"))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from rigchecker.utils import backend, inspectutils, scenesnapshot, scheduler
+
+
+class SteppedChecksTest(unittest.TestCase):
+	"""
+	Runs every check as a resumable generator on an in-memory rig, in steps small enough for the whole-scene passes to
+	be split as well, and makes sure the results match running them at once.
+	"""
+
+	def setUp(self):
+		self.previous_backend = backend.BACKEND
+		self.scene = backend.MemoryBackend()
+		backend.set_backend(self.scene)
+
+		geo_grp = self.scene.create_node("geo_grp", "transform")
+
+		for k in range(40):
+			offset_grp = self.scene.create_node("c%i_offset_grp" % k, "transform")
+			control = self.scene.create_node("c%i_Controler" % k, "transform", offset_grp)
+			self.scene.create_node("c%i_ControlerShape" % k, "nurbsCurve", control)
+
+			geo = self.scene.create_node("m%i_geo" % k, "transform", control if k % 5 == 0 else geo_grp)
+			geo_shape = self.scene.create_node("m%i_geoShape" % k, "mesh", geo)
+
+			if k % 3 == 0:
+				skin_cluster = self.scene.create_node("skinCluster%i" % k, "skinCluster")
+				self.scene.connect_attr(skin_cluster + ".outputGeometry", geo_shape + ".inMesh")
+
+			if k % 7 == 0:
+				self.scene.create_node("m%i_parentConstraint" % k, "parentConstraint", geo)
+
+			if k % 4 == 0:
+				self.scene.set_attr(control, "translateX", 1.0)
+
+			self.scene.create_node("j%i_jnt" % k, "joint")
+
+	def tearDown(self):
+		backend.set_backend(self.previous_backend)
+
+	def test_stepped_results_match(self):
+		expected = inspectutils.run_all_checks(scenesnapshot.take_snapshot())
+		steps = list(inspectutils.iter_all_checks(chunk_size=8, pass_chunk_size=16))
+
+		pass_steps = [s for s in steps if isinstance(s, scheduler.PassStep)]
+		check_steps = [s for s in steps if not isinstance(s, scheduler.PassStep)]
+
+		for name in ("take_snapshot", "hierarchy", "classify_scene", "visibility"):
+			self.assertGreater(len([s for s in pass_steps if s.name == name]), 1, name)
+
+		self.assertEqual(dict((s.check, s.result) for s in check_steps if s.finished), dict(expected))
+
+	def test_failed_nodes_listed_once(self):
+		for step in inspectutils.iter_all_checks(chunk_size=8):
+			if not isinstance(step, scheduler.PassStep):
+				self.assertIsInstance(step.failed, int)
+
+				if step.finished is False:
+					self.assertIsNone(step.result)
+
+
+if __name__ == "__main__":
+	unittest.main()
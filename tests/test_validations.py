@@ -0,0 +1,100 @@
+import unittest
+
+from collections import OrderedDict
+
+from rigchecker.utils import backend, scenesnapshot, validations
+
+VALIDATIONS_CONF = OrderedDict([
+	("joint", [
+		OrderedDict([("type", "name_suffix"), ("params", OrderedDict([("suffix", "_jnt")]))]),
+		OrderedDict([("type", "name_structure"), ("params", OrderedDict([("name_expression", "")]))]),
+		OrderedDict([("type", "attribute_value"), ("params", OrderedDict([
+			("attribute_name", "radius"), ("attribute_value", "1")
+		]))]),
+		OrderedDict([("type", "name_suffix"), ("params", OrderedDict([("suffix", "t")]))])
+	]),
+	("transform", [
+		OrderedDict([("type", "node_location"), ("params", OrderedDict([
+			("parent_path", "rig_grp|jnt_grp"), ("direct_child", 1)
+		]))])
+	]),
+	("camera", [
+		OrderedDict([("type", "name_suffix"), ("params", OrderedDict([("suffix", "")]))])
+	])
+])
+
+
+class CompileRuleTest(unittest.TestCase):
+	def test_no_op(self):
+		self.assertIsNone(validations.compile_rule("name_suffix", {"suffix": ""}))
+		self.assertIsNone(validations.compile_rule("name_structure", {}))
+		self.assertIsNone(validations.compile_rule("attribute_value", {"attribute_name": "radius"}))
+		self.assertIsNone(validations.compile_rule("node_location", {"parent_path": "|"}))
+
+	def test_invalid(self):
+		with self.assertRaises(ValueError):
+			validations.compile_rule("unknown")
+
+		with self.assertRaises(ValueError):
+			validations.compile_rule("name_structure", {"name_expression": "(unclosed"})
+
+	def test_compiled(self):
+		rule = validations.compile_rule("attribute_value", {"attribute_name": "radius", "attribute_value": "1"})
+
+		self.assertEqual(rule.rule_type, "attribute_value")
+		self.assertEqual(rule.attributes, ("radius",))
+		self.assertEqual(validations.compile_rule("name_suffix", {"suffix": "_jnt"}).attributes, ())
+
+
+class ValidationPlanTest(unittest.TestCase):
+	"""
+	Compiles a validations block into a plan and runs it on an in-memory scene.
+	"""
+
+	def setUp(self):
+		self.previous_backend = backend.BACKEND
+		self.scene = backend.MemoryBackend()
+		backend.set_backend(self.scene)
+
+		rig_grp = self.scene.create_node("rig_grp", "transform")
+		jnt_grp = self.scene.create_node("jnt_grp", "transform", rig_grp)
+		root_jnt = self.scene.create_node("root_jnt", "joint", jnt_grp)
+		self.scene.create_node("spine_joint", "joint", root_jnt)
+
+		self.scene.set_attr(root_jnt, "radius", 1.0)
+		self.scene.set_attr("|rig_grp|jnt_grp|root_jnt|spine_joint", "radius", 2.0)
+
+		self.plan = validations.ValidationPlan(VALIDATIONS_CONF)
+
+	def tearDown(self):
+		backend.set_backend(self.previous_backend)
+
+	def test_compiled(self):
+		self.assertEqual(list(self.plan.categories), ["joint", "transform"])
+		self.assertEqual(
+			[r.rule_type for r in self.plan.categories["joint"]], ["name_suffix", "attribute_value", "name_suffix"]
+		)
+		self.assertEqual(self.plan.skipped, [("joint", "name_structure"), ("camera", "name_suffix")])
+
+	def test_explain(self):
+		self.assertEqual(self.plan.explain().split("\n"), [
+			"joint: name_suffix, attribute_value, name_suffix [fetch: radius]",
+			"transform: node_location",
+			"joint: name_structure skipped, no parameters set",
+			"camera: name_suffix skipped, no parameters set"
+		])
+
+	def test_run(self):
+		results = self.plan.run(scenesnapshot.take_snapshot())
+
+		# Joints are transforms as well, and rules of the same type get numbered keys
+		self.assertEqual(results, OrderedDict([
+			("joint:name_suffix", ["spine_joint"]),
+			("joint:attribute_value", ["spine_joint"]),
+			("joint:name_suffix2", []),
+			("transform:node_location", ["rig_grp", "jnt_grp", "spine_joint"])
+		]))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+
+from rigchecker.utils import backend, scenesnapshot, scheduler, visibility
+
+
+class VisibilityTest(unittest.TestCase):
+	"""
+	Computes the effective visibility of the nodes of an in-memory scene, inherited from their parents and hidden by
+	their own attributes, drawing overrides, intermediate state and display layers.
+	"""
+
+	def setUp(self):
+		self.previous_backend = backend.BACKEND
+		self.scene = backend.MemoryBackend()
+		backend.set_backend(self.scene)
+
+		self.visible_grp = self.scene.create_node("visible_grp", "transform")
+		self.visible_geo = self.scene.create_node("visible_geo", "transform", self.visible_grp)
+
+		self.hidden_grp = self.scene.create_node("hidden_grp", "transform")
+		self.hidden_geo = self.scene.create_node("hidden_geo", "transform", self.hidden_grp)
+		self.hidden_geo_shape = self.scene.create_node("hidden_geoShape", "mesh", self.hidden_geo)
+		self.scene.set_attr(self.hidden_grp, "visibility", False)
+
+		self.lod_hidden = self.scene.create_node("lod_hidden", "transform")
+		self.scene.set_attr(self.lod_hidden, "lodVisibility", False)
+
+		self.overridden = self.scene.create_node("overridden", "transform")
+		self.scene.set_attr(self.overridden, "overrideEnabled", True)
+		self.scene.set_attr(self.overridden, "overrideVisibility", False)
+
+		# The override visibility only applies when overrides are enabled
+		self.not_overridden = self.scene.create_node("not_overridden", "transform")
+		self.scene.set_attr(self.not_overridden, "overrideVisibility", False)
+
+		self.intermediate = self.scene.create_node("orig_geoShape", "mesh", self.visible_geo, intermediate=True)
+
+		self.skin_cluster = self.scene.create_node("skinCluster1", "skinCluster")
+
+	def tearDown(self):
+		backend.set_backend(self.previous_backend)
+
+	def add_layer(self, name, visible, members):
+		layer = self.scene.create_node(name, "displayLayer")
+		self.scene.set_attr(layer, "visibility", visible)
+
+		for m in members:
+			self.scene.connect_attr(layer + ".drawInfo", m + ".drawOverride")
+
+	def visible(self, snapshot=None):
+		if snapshot is None:
+			snapshot = scenesnapshot.take_snapshot()
+
+		return dict(zip(snapshot.names, visibility.compute_visibility(snapshot)))
+
+	def test_top_down(self):
+		visible = self.visible()
+
+		self.assertEqual(
+			[n for n in self.scene.names if visible[n] is True],
+			[self.visible_grp, self.visible_geo, self.not_overridden]
+		)
+		self.assertEqual(
+			[n for n in self.scene.names if visible[n] is False],
+			[
+				self.hidden_grp, self.hidden_geo, self.hidden_geo_shape, self.lod_hidden, self.overridden,
+				self.intermediate
+			]
+		)
+		self.assertIsNone(visible[self.skin_cluster])
+
+	def test_display_layers(self):
+		self.add_layer("hidden_layer", False, [self.visible_geo])
+		self.add_layer("visible_layer", True, [self.not_overridden])
+
+		visible = self.visible()
+
+		self.assertIs(visible[self.visible_grp], True)
+		self.assertIs(visible[self.visible_geo], False)
+		self.assertIs(visible[self.not_overridden], True)
+
+	def test_stepped(self):
+		self.add_layer("hidden_layer", False, [self.visible_geo])
+		snapshot = scenesnapshot.take_snapshot()
+
+		steps = list(visibility.iter_compute_visibility(snapshot, chunk_size=2))
+
+		self.assertGreater(len([s for s in steps[:-1] if isinstance(s, scheduler.PassStep)]), 2)
+		self.assertEqual(steps[-1], visibility.compute_visibility(snapshot))
+
+
+if __name__ == "__main__":
+	unittest.main()